@@ -8,14 +8,19 @@ db = SQLAlchemy()
 bcrypt = Bcrypt()
 jwt = JWTManager()
 
-def create_app():
+def create_app(config_name=None, config=None):
+    """Создаёт приложение.
+
+    ``config`` — словарь настроек поверх профиля и окружения; применяется
+    до инициализации расширений, так что действует и на движок БД.
+    """
     app = Flask(__name__, instance_relative_config=True)
 
-    # Конфигурация
-    app.config['SECRET_KEY'] = 'your-secret-key'
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(app.instance_path, 'finance.db')}"
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['JWT_SECRET_KEY'] = 'your-jwt-secret-key'
+    # Конфигурация: профиль, instance/config.py, переменные окружения FINANCE_*, config
+    from app.config import load_config, apply_sqlite_pragmas
+    load_config(app, config_name, config)
+    if not app.config['SQLALCHEMY_DATABASE_URI']:
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(app.instance_path, 'finance.db')}"
 
     os.makedirs(app.instance_path, exist_ok=True)
 
@@ -24,6 +29,27 @@ def create_app():
     bcrypt.init_app(app)
     jwt.init_app(app)
 
+    from app.metrics import metrics
+    metrics.init_app(app)
+
+    from app.cache import cache
+    cache.init_app(app)
+
+    from app import compression
+    compression.init_app(app)
+
+    from app.passwords import hasher
+    hasher.init_app(app)
+
+    from app import instrumentation
+    instrumentation.init_app(app)
+
+    from app.profiling import profiler
+    profiler.init_app(app)
+
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+
     # Blueprints
     from app.routes.auth_routes import auth_bp
     from app.routes.dashboard_routes import dashboard_bp
@@ -33,6 +59,10 @@ def create_app():
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(api_bp)
 
+    # CLI-команды обслуживания БД
+    from app.commands import register_commands
+    register_commands(app)
+
     # Главная страница — login
     @app.route('/')
     def index():
@@ -47,9 +77,11 @@ def create_app():
     def internal_error(e):
         return jsonify({'error': 'Internal Server Error'}), 500
 
-    # Создаём таблицы
-    with app.app_context():
-        db.create_all()
+    # Создаём таблицы и доводим схему существующей БД до актуальной
+    if app.config['AUTO_UPGRADE_SCHEMA']:
+        from app.schema import upgrade_schema
+        with app.app_context():
+            upgrade_schema()
 
     return app
 
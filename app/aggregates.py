@@ -0,0 +1,326 @@
+# aggregates.py
+"""Инкрементально поддерживаемые агрегаты по транзакциям.
+
+Перед каждым flush сессии изменения транзакций (добавление, правка,
+удаление) превращаются в дельты и применяются к агрегатам в той же
+транзакции БД, поэтому агрегаты не расходятся с данными даже при ошибке
+коммита. Пути записи в обход ORM (массовые INSERT) передают свои дельты
+в ``apply_deltas`` явно. Функции ``rebuild_*`` пересчитывают агрегаты с
+нуля и используются миграцией схемы и CLI-командами сверки; после них
+версия данных увеличивается (``bump_rebuilt_data_versions``), чтобы
+ETag и кэш ответов не отдавали значения, посчитанные до пересчёта.
+
+Бюджеты (``Budget``) хранят расходы только текущего периода: дельта
+учитывается, если её дата попадает в текущую неделю или месяц. Бюджет,
+чей период закончился, переводится на новый первой такой записью, а до
+неё чтение (``budget_status_columns``) считает траты по транзакциям, не
+изменяя БД. Дельты применяются до записи самих транзакций.
+
+Тот же хук увеличивает ``User.data_version`` у пользователей, чьи
+транзакции, категории или профиль изменились; по версии строятся ETag
+ответов дашборда.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, inspect, func, case, select, update, delete, and_, or_, bindparam
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from .models import User, Category, Transaction, UserTotals, MonthlyRollup, Budget
+
+# Вклад транзакции в агрегаты; count = +1 для добавления, -1 для удаления
+TransactionDelta = namedtuple('TransactionDelta', 'user_id category_id type date amount_cents count')
+
+_TRACKED_FIELDS = ('user_id', 'category_id', 'type', 'date', 'amount_cents')
+
+
+def _delta(values, count):
+    return TransactionDelta(*(values[field] for field in _TRACKED_FIELDS), count=count)
+
+
+def _values(state, old):
+    """Старые (как в БД) или новые значения отслеживаемых полей транзакции"""
+    values = {}
+    for field in _TRACKED_FIELDS:
+        history = state.attrs[field].load_history()
+        if old:
+            values[field] = (history.deleted or history.unchanged or [None])[0]
+        else:
+            values[field] = (history.added or history.unchanged or [None])[0]
+    return values
+
+
+def _transaction_deltas(session):
+    """Дельты агрегатов для транзакций, ожидающих записи в текущем flush"""
+    deltas = []
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            # Дата нужна агрегатам до INSERT, поэтому default колонки применяем сами
+            if obj.date is None:
+                obj.date = datetime.now(timezone.utc)
+            deltas.append(_delta(_values(inspect(obj), old=False), 1))
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            deltas.append(_delta(_values(inspect(obj), old=True), -1))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in _TRACKED_FIELDS):
+            deltas.append(_delta(_values(state, old=True), -1))
+            deltas.append(_delta(_values(state, old=False), 1))
+
+    return [d for d in deltas if d.user_id is not None]
+
+
+def _apply_user_totals(conn, deltas):
+    """Прибавляет дельты к суммам и количеству транзакций пользователей"""
+    totals = {}
+    for d in deltas:
+        income, expense, count = totals.get(d.user_id, (0, 0, 0))
+        amount = d.amount_cents * d.count
+        if d.type == 'income':
+            income += amount
+        elif d.type == 'expense':
+            expense += amount
+        totals[d.user_id] = (income, expense, count + d.count)
+
+    for user_id, (income, expense, count) in totals.items():
+        stmt = insert(UserTotals).values(
+            user_id=user_id, income_cents=income, expense_cents=expense, transaction_count=count
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserTotals.user_id],
+            set_={
+                'income_cents': UserTotals.income_cents + stmt.excluded.income_cents,
+                'expense_cents': UserTotals.expense_cents + stmt.excluded.expense_cents,
+                'transaction_count': UserTotals.transaction_count + stmt.excluded.transaction_count,
+            }
+        )
+        conn.execute(stmt)
+
+
+def month_key(date):
+    """Ключ месяца для MonthlyRollup: первый день месяца в виде ГГГГ-ММ-01"""
+    return date.strftime('%Y-%m-01')
+
+
+def _apply_monthly_rollup(conn, deltas):
+    """Прибавляет дельты к помесячным суммам по категориям"""
+    rollup = {}
+    for d in deltas:
+        key = (d.user_id, d.category_id or 0, month_key(d.date), d.type)
+        total, count = rollup.get(key, (0, 0))
+        rollup[key] = (total + d.amount_cents * d.count, count + d.count)
+
+    # Все ключи одним executemany, а не запросом на ключ
+    stmt = insert(MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MonthlyRollup.user_id, MonthlyRollup.category_id,
+                        MonthlyRollup.month, MonthlyRollup.type],
+        set_={
+            'total_cents': MonthlyRollup.total_cents + stmt.excluded.total_cents,
+            'count': MonthlyRollup.count + stmt.excluded.count,
+        }
+    )
+    conn.execute(stmt, [
+        {'user_id': user_id, 'category_id': category_id, 'month': month,
+         'type': transaction_type, 'total_cents': total, 'count': count}
+        for (user_id, category_id, month, transaction_type), (total, count) in rollup.items()
+    ])
+
+    # Месяцы, где транзакций не осталось, удаляем, чтобы таблица не разрасталась
+    conn.execute(delete(MonthlyRollup).where(
+        MonthlyRollup.count <= 0,
+        or_(*(and_(MonthlyRollup.user_id == user_id, MonthlyRollup.category_id == category_id,
+                   MonthlyRollup.month == month, MonthlyRollup.type == transaction_type)
+              for user_id, category_id, month, transaction_type in rollup))
+    ))
+
+
+BUDGET_PERIODS = ('week', 'month')
+
+
+def period_start(period, date):
+    """Начало бюджетного периода, содержащего date: ГГГГ-ММ-ДД (неделя — с понедельника)"""
+    if period == 'week':
+        return (date - timedelta(days=date.weekday())).strftime('%Y-%m-%d')
+    return month_key(date)
+
+
+def current_periods():
+    """Начала текущих бюджетных периодов: {'week': ..., 'month': ...}"""
+    now = datetime.now(timezone.utc)
+    return {period: period_start(period, now) for period in BUDGET_PERIODS}
+
+
+def _budget_period_bounds(current):
+    """SQL-выражения начала и конца текущего периода бюджета (по Budget.period)"""
+    start = case(current, value=Budget.period)
+    end = func.date(start, case({'week': '+7 days'}, value=Budget.period, else_='+1 month'))
+    return start, end
+
+
+def _budget_spent_between(start, end):
+    """Расходы категории бюджета за [start, end) по таблице транзакций"""
+    return select(func.coalesce(func.sum(Transaction.amount_cents), 0)).where(
+        Transaction.user_id == Budget.user_id,
+        Transaction.category_id == Budget.category_id,
+        Transaction.type == 'expense',
+        Transaction.date >= start,
+        Transaction.date < end
+    ).scalar_subquery()
+
+
+def budget_status_columns(current=None):
+    """Колонки (period_start, spent_cents) бюджета за текущий период без записи в БД.
+
+    Для бюджета, уже переведённого на текущий период, — сохранённые траты;
+    для оставшегося в прошлом периоде — сумма расходов по транзакциям.
+    """
+    start, end = _budget_period_bounds(current or current_periods())
+    spent = case((Budget.period_start == start, Budget.spent_cents), else_=_budget_spent_between(start, end))
+    return start.label('period_start'), spent.label('spent_cents')
+
+
+def _apply_budgets(conn, deltas):
+    """Прибавляет расходы текущего периода к тратам бюджетов их категорий.
+
+    Бюджет, оставшийся в прошлом периоде, переводится на текущий: его траты
+    пересчитываются по транзакциям, ещё не изменённым этим flush, и к ним
+    прибавляется дельта.
+    """
+    current = current_periods()
+    spent = {}
+    for d in deltas:
+        if d.type != 'expense' or d.category_id is None:
+            continue
+        for period, start in current.items():
+            if period_start(period, d.date) == start:
+                key = (d.user_id, d.category_id, period)
+                spent[key] = spent.get(key, 0) + d.amount_cents * d.count
+
+    params = [
+        {'b_user_id': user_id, 'b_category_id': category_id, 'b_period': period, 'b_amount': amount}
+        for (user_id, category_id, period), amount in spent.items() if amount
+    ]
+    if params:
+        start, current_spent = budget_status_columns(current)
+        conn.execute(update(Budget).where(
+            Budget.user_id == bindparam('b_user_id'), Budget.category_id == bindparam('b_category_id'),
+            Budget.period == bindparam('b_period')
+        ).values(
+            period_start=start.element, spent_cents=current_spent.element + bindparam('b_amount')
+        ), params)
+
+
+def bump_data_versions(conn, user_ids):
+    """Увеличивает версию данных пользователей"""
+    if user_ids:
+        conn.execute(update(User).where(User.id.in_(user_ids)).values(data_version=User.data_version + 1))
+
+
+def bump_rebuilt_data_versions(conn, user_id=None):
+    """Увеличивает версию данных после пересчёта агрегатов: одного пользователя или всех"""
+    stmt = update(User).values(data_version=User.data_version + 1)
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    conn.execute(stmt)
+
+
+def _changed_owner_ids(session):
+    """Пользователи, чьи категории или профиль меняются в текущем flush"""
+    user_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Category):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, User) and obj not in session.new and session.is_modified(obj):
+            user_ids.add(obj.id)
+    return user_ids - {None}
+
+
+def apply_deltas(conn, deltas):
+    """Применяет дельты транзакций ко всем агрегатам и версиям данных"""
+    if deltas:
+        _apply_user_totals(conn, deltas)
+        _apply_monthly_rollup(conn, deltas)
+        _apply_budgets(conn, deltas)
+        bump_data_versions(conn, {d.user_id for d in deltas})
+
+
+@event.listens_for(Session, 'before_flush')
+def _update_aggregates(session, flush_context, instances):
+    deltas = _transaction_deltas(session)
+    user_ids = _changed_owner_ids(session) - {d.user_id for d in deltas}
+    if deltas or user_ids:
+        conn = session.connection()
+        apply_deltas(conn, deltas)
+        bump_data_versions(conn, user_ids)
+
+
+def sum_by_type(transaction_type, source=Transaction):
+    """SUM суммы транзакций заданного типа в копейках (0, если транзакций нет).
+
+    ``source`` — Transaction (сырые транзакции) или MonthlyRollup.
+    """
+    amount = source.total_cents if source is MonthlyRollup else source.amount_cents
+    return func.coalesce(func.sum(
+        case((source.type == transaction_type, amount), else_=0)
+    ), 0)
+
+
+def rebuild_user_totals(conn, user_id=None):
+    """Пересчитывает UserTotals по таблице транзакций (для всех или одного пользователя)"""
+    clear = delete(UserTotals)
+    source = select(
+        Transaction.user_id,
+        sum_by_type('income'),
+        sum_by_type('expense'),
+        func.count(Transaction.id)
+    ).where(Transaction.user_id.is_not(None)).group_by(Transaction.user_id)
+
+    if user_id is not None:
+        clear = clear.where(UserTotals.user_id == user_id)
+        source = source.where(Transaction.user_id == user_id)
+
+    conn.execute(clear)
+    conn.execute(insert(UserTotals).from_select(
+        ['user_id', 'income_cents', 'expense_cents', 'transaction_count'], source
+    ))
+
+
+def rebuild_monthly_rollup(conn, user_id=None):
+    """Пересчитывает MonthlyRollup по таблице транзакций (для всех или одного пользователя)"""
+    category_id = func.coalesce(Transaction.category_id, 0)
+    month = func.date(Transaction.date, 'start of month')
+    clear = delete(MonthlyRollup)
+    source = select(
+        Transaction.user_id, category_id, month, Transaction.type,
+        func.sum(Transaction.amount_cents), func.count(Transaction.id)
+    ).where(Transaction.user_id.is_not(None)).group_by(
+        Transaction.user_id, category_id, month, Transaction.type
+    )
+
+    if user_id is not None:
+        clear = clear.where(MonthlyRollup.user_id == user_id)
+        source = source.where(Transaction.user_id == user_id)
+
+    conn.execute(clear)
+    conn.execute(insert(MonthlyRollup).from_select(
+        ['user_id', 'category_id', 'month', 'type', 'total_cents', 'count'], source
+    ))
+
+
+def rebuild_budgets(conn, user_id=None, stale_only=False):
+    """Переводит бюджеты на текущий период и пересчитывает их траты по таблице транзакций.
+
+    ``stale_only`` — только бюджеты, чей период закончился (или ещё не считался).
+    """
+    start, end = _budget_period_bounds(current_periods())
+    stmt = update(Budget).values(period_start=start, spent_cents=_budget_spent_between(start, end))
+    if user_id is not None:
+        stmt = stmt.where(Budget.user_id == user_id)
+    if stale_only:
+        stmt = stmt.where(Budget.period_start != start)
+    conn.execute(stmt)
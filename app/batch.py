@@ -0,0 +1,167 @@
+# batch.py
+"""Пакетные изменения транзакций и категорий.
+
+Все операции пакета применяются через ORM в одной транзакции БД, поэтому
+агрегаты обновляются тем же ``before_flush``, что и у одиночных
+маршрутов, а клиент платит за один запрос и один коммит. Транзакции и
+категории, упомянутые в пакете, загружаются заранее одним запросом на
+таблицу, а не по запросу на операцию. Ошибка любой операции отменяет
+весь пакет.
+"""
+from sqlalchemy import select
+from . import db
+from .models import Transaction, Category
+from .validation import (ValidationError, validate_transaction, parse_amount, parse_transaction_type,
+                         parse_id, parse_category_id, parse_description)
+
+# Наибольшее число операций в одном пакете
+MAX_BATCH_OPERATIONS = 1000
+
+OPERATIONS = ('create', 'update', 'delete')
+
+
+class BatchError(ValidationError):
+    """Операция пакета с номером ``index`` не может быть выполнена"""
+
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+
+
+class _Batch:
+    def __init__(self, user_id, operations):
+        self.user_id = user_id
+        ids = set()
+        for op in operations:
+            if op['entity'] == 'transaction':
+                try:
+                    ids.add(parse_id(op.get('id'), 'Транзакция не найдена'))
+                except ValidationError:
+                    # Ошибку вернёт сама операция с её номером
+                    pass
+        self.transactions = {
+            transaction.id: transaction for transaction in Transaction.query.filter(
+                Transaction.user_id == user_id, Transaction.id.in_(ids)
+            )
+        } if ids else {}
+        self.categories = {category.id: category for category in Category.query.filter_by(user_id=user_id)}
+        self.created_categories = []
+        self.deleted_categories = {}
+
+    def _transaction(self, op):
+        transaction = self.transactions.get(parse_id(op.get('id'), 'Транзакция не найдена'))
+        if transaction is None:
+            raise ValidationError('Транзакция не найдена')
+        return transaction
+
+    def _category(self, op):
+        category = self.categories.get(parse_id(op.get('id'), 'Категория не найдена'))
+        if category is None:
+            raise ValidationError('Категория не найдена')
+        return category
+
+    def _category_name(self, data, current=None):
+        name = (data.get('name') or '').strip()
+        if not name:
+            raise ValidationError('Название категории не может быть пустым')
+        if len(name) > Category.name.type.length:
+            raise ValidationError('Слишком длинное название категории')
+        categories = [*self.categories.values(), *self.created_categories]
+        if any(c.name == name and c is not current for c in categories):
+            raise ValidationError('Категория с таким названием уже существует')
+        return name
+
+    def create_transaction(self, op, data):
+        fields = validate_transaction(data, self.user_id, self.categories)
+        transaction = Transaction(user_id=self.user_id, **fields)
+        db.session.add(transaction)
+        return transaction
+
+    def update_transaction(self, op, data):
+        transaction = self._transaction(op)
+        if 'amount' in data:
+            transaction.amount_cents = parse_amount(data['amount'])
+        if 'type' in data:
+            transaction.type = parse_transaction_type(data['type'])
+        if 'category_id' in data:
+            transaction.category_id = parse_category_id(data['category_id'], self.user_id, self.categories)
+        if 'description' in data:
+            transaction.description = parse_description(data['description'])
+        return transaction
+
+    def delete_transaction(self, op, data):
+        transaction = self.transactions.pop(self._transaction(op).id)
+        db.session.delete(transaction)
+        return transaction
+
+    def create_category(self, op, data):
+        category = Category(name=self._category_name(data), user_id=self.user_id)
+        db.session.add(category)
+        self.created_categories.append(category)
+        return category
+
+    def update_category(self, op, data):
+        category = self._category(op)
+        category.name = self._category_name(data, current=category)
+        return category
+
+    def delete_category(self, op, data):
+        # Удаление откладывается до конца пакета: операции ниже могут
+        # перенести транзакции из этой категории
+        category = self.categories.pop(self._category(op).id)
+        self.deleted_categories[category.id] = op['index']
+        return category
+
+    def delete_pending_categories(self):
+        """Удаляет категории, отмеченные операциями delete, если в них не осталось транзакций"""
+        if not self.deleted_categories:
+            return
+        used = db.session.execute(
+            select(Transaction.category_id).where(
+                Transaction.user_id == self.user_id,
+                Transaction.category_id.in_(self.deleted_categories)
+            ).limit(1)
+        ).scalar()
+        if used is not None:
+            raise BatchError(self.deleted_categories[used],
+                             'Нельзя удалить категорию, с которой связаны транзакции')
+        for category_id in self.deleted_categories:
+            db.session.delete(db.session.get(Category, category_id))
+
+
+def apply_batch(user_id, operations):
+    """Применяет операции пакета в текущей транзакции БД и возвращает результаты.
+
+    Операция — словарь ``{"op": create|update|delete, "entity":
+    transaction|category, "id": ..., "data": {...}}``. При ошибке
+    бросает ``BatchError`` с номером операции; коммит и откат выполняет
+    вызывающий код.
+    """
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict):
+            raise BatchError(index, 'Операция должна быть объектом')
+        op['index'] = index
+        if op.get('entity') not in ('transaction', 'category') or op.get('op') not in OPERATIONS:
+            raise BatchError(index, 'Неизвестная операция')
+
+    batch = _Batch(user_id, operations)
+    objects = []
+    with db.session.no_autoflush:
+        for op in operations:
+            data = op.get('data') or {}
+            try:
+                if not isinstance(data, dict):
+                    raise ValidationError('Поле data должно быть объектом')
+                handler = getattr(batch, f"{op['op']}_{op['entity']}")
+                objects.append(handler(op, data))
+            except ValidationError as e:
+                raise BatchError(op['index'], str(e))
+
+    db.session.flush()
+    batch.delete_pending_categories()
+    db.session.flush()
+
+    return [
+        {'index': op['index'], 'op': op['op'], 'entity': op['entity'], 'id': obj.id}
+        for op, obj in zip(operations, objects)
+    ]
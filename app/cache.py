@@ -0,0 +1,149 @@
+# cache.py
+"""Серверный кэш ответов дашборда.
+
+Ключ записи содержит пользователя, его ``data_version`` и адрес запроса
+с параметрами. Любая запись транзакций или категорий увеличивает версию
+в той же транзакции БД, поэтому после коммита старые записи пользователя
+больше не находятся и вытесняются по LRU/TTL; ключи других
+пользователей не затрагиваются. Та же схема работает и с общим
+хранилищем на несколько процессов.
+
+Хранилище задаётся ``RESPONSE_CACHE_BACKEND``: ``'lru'`` (по умолчанию,
+в памяти процесса), ``'null'`` (кэш выключен) или класс, наследующий
+``CacheBackend``, либо строка импорта ``'package.module:Class'``.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from werkzeug.utils import import_string
+
+
+class CacheBackend:
+    """Интерфейс хранилища кэша"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def get(self, key):
+        """Значение по ключу или None"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+
+class NullCache(CacheBackend):
+    """Ничего не хранит"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    """Ограниченный по числу записей LRU-кэш в памяти процесса с TTL"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.max_entries = app.config['RESPONSE_CACHE_MAX_ENTRIES']
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+BACKENDS = {
+    'lru': LRUCache,
+    'null': NullCache,
+}
+
+
+class _CacheState:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+
+class ResponseCache:
+    """Кэш ответов со счётчиками попаданий; своё хранилище у каждого приложения"""
+
+    def init_app(self, app):
+        backend = app.config['RESPONSE_CACHE_BACKEND']
+        if isinstance(backend, str):
+            backend = BACKENDS.get(backend) or import_string(backend)
+        app.extensions['response_cache'] = _CacheState(backend(app))
+
+    @property
+    def _state(self):
+        return current_app.extensions['response_cache']
+
+    def get(self, key):
+        state = self._state
+        value = state.backend.get(key)
+        with state.lock:
+            if value is None:
+                state.misses += 1
+            else:
+                state.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._state.backend.set(key, value, current_app.config['RESPONSE_CACHE_TTL'])
+
+    def clear(self):
+        state = self._state
+        state.backend.clear()
+        with state.lock:
+            state.hits = state.misses = 0
+
+    def stats(self):
+        state = self._state
+        requests = state.hits + state.misses
+        return {
+            'backend': type(state.backend).__name__,
+            'entries': len(state.backend),
+            'hits': state.hits,
+            'misses': state.misses,
+            'hit_ratio': state.hits / requests if requests else None,
+        }
+
+
+cache = ResponseCache()
@@ -0,0 +1,66 @@
+# commands.py
+"""CLI-команды обслуживания БД (flask --app run <команда>)"""
+import click
+from . import db
+from .aggregates import rebuild_user_totals, rebuild_monthly_rollup, rebuild_budgets, bump_rebuilt_data_versions
+from .schema import upgrade_schema, get_schema_version
+from .search import rebuild_search_index
+
+
+@click.command('upgrade-schema')
+def upgrade_schema_command():
+    """Создаёт таблицы и применяет недостающие миграции схемы"""
+    upgrade_schema()
+    with db.engine.connect() as conn:
+        click.echo(f'Версия схемы: {get_schema_version(conn)}')
+
+
+@click.command('rebuild-totals')
+@click.option('--user-id', type=int, default=None, help='Пересчитать только для одного пользователя')
+def rebuild_totals_command(user_id):
+    """Пересчитывает балансы пользователей по таблице транзакций"""
+    conn = db.session.connection()
+    rebuild_user_totals(conn, user_id)
+    bump_rebuilt_data_versions(conn, user_id)
+    db.session.commit()
+    click.echo('Балансы пересчитаны')
+
+
+@click.command('rebuild-rollups')
+@click.option('--user-id', type=int, default=None, help='Пересчитать только для одного пользователя')
+def rebuild_rollups_command(user_id):
+    """Пересчитывает помесячные суммы по категориям по таблице транзакций"""
+    conn = db.session.connection()
+    rebuild_monthly_rollup(conn, user_id)
+    bump_rebuilt_data_versions(conn, user_id)
+    db.session.commit()
+    click.echo('Помесячные суммы пересчитаны')
+
+
+@click.command('rebuild-budgets')
+@click.option('--user-id', type=int, default=None, help='Пересчитать только для одного пользователя')
+def rebuild_budgets_command(user_id):
+    """Пересчитывает траты бюджетов за текущий период по таблице транзакций"""
+    conn = db.session.connection()
+    rebuild_budgets(conn, user_id)
+    bump_rebuilt_data_versions(conn, user_id)
+    db.session.commit()
+    click.echo('Траты бюджетов пересчитаны')
+
+
+@click.command('rebuild-search')
+def rebuild_search_command():
+    """Перестраивает индекс полнотекстового поиска по транзакциям"""
+    conn = db.session.connection()
+    rebuild_search_index(conn)
+    bump_rebuilt_data_versions(conn)
+    db.session.commit()
+    click.echo('Индекс поиска перестроен')
+
+
+def register_commands(app):
+    app.cli.add_command(upgrade_schema_command)
+    app.cli.add_command(rebuild_totals_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(rebuild_budgets_command)
+    app.cli.add_command(rebuild_search_command)
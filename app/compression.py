@@ -0,0 +1,55 @@
+# compression.py
+"""Сжатие крупных JSON-ответов gzip.
+
+Ответ сжимается, если клиент принимает gzip, тело не потоковое и не
+меньше ``COMPRESS_MIN_SIZE`` байт: на мелких ответах заголовки gzip и
+затраты CPU не окупаются. У сжатого варианта другой ETag (суффикс
+``-gzip``), как требует сильная проверка; ``etag_matches`` учитывает оба
+варианта.
+"""
+import gzip
+from flask import request
+
+COMPRESSIBLE_MIMETYPES = ('application/json',)
+
+GZIP_ETAG_SUFFIX = '-gzip'
+
+
+def etag_matches(etag):
+    """Совпадает ли If-None-Match запроса с ETag ответа или его сжатого варианта"""
+    return etag in request.if_none_match or etag + GZIP_ETAG_SUFFIX in request.if_none_match
+
+
+def compress_response(response, min_size, level):
+    if response.status_code == 304:
+        # Клиент перепроверяет сжатый вариант: подтверждаем его ETag
+        etag, weak = response.get_etag()
+        if etag and etag + GZIP_ETAG_SUFFIX in request.if_none_match:
+            response.set_etag(etag + GZIP_ETAG_SUFFIX, weak=weak)
+        return response
+
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.accept_encodings):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=level))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + GZIP_ETAG_SUFFIX, weak=weak)
+    return response
+
+
+def init_app(app):
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, app.config['COMPRESS_MIN_SIZE'], app.config['COMPRESS_LEVEL'])
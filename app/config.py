@@ -0,0 +1,131 @@
+# config.py
+"""Профили конфигурации приложения.
+
+Профиль выбирается аргументом ``create_app`` или переменной окружения
+``FINANCE_CONFIG`` (development, testing, production). Поверх профиля
+читается необязательный файл ``instance/config.py``, затем переменные
+окружения с префиксом ``FINANCE_`` (например, ``FINANCE_SECRET_KEY``,
+``FINANCE_SQLALCHEMY_DATABASE_URI``) и, последним, словарь ``config``,
+переданный в ``create_app``.
+
+``SQLITE_PRAGMAS`` выполняются на каждом новом соединении SQLite, так
+что настройки действуют для всех соединений пула.
+"""
+import os
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+class Config:
+    SECRET_KEY = 'your-secret-key'
+    JWT_SECRET_KEY = 'your-jwt-secret-key'
+    # None — файл finance.db в каталоге instance
+    SQLALCHEMY_DATABASE_URI = None
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    # Ожидание блокировки записи вместо немедленной ошибки «database is locked»
+    SQLITE_PRAGMAS = {'busy_timeout': 5000}
+    # Кэш ответов дашборда (см. app/cache.py)
+    RESPONSE_CACHE_BACKEND = 'lru'
+    RESPONSE_CACHE_MAX_ENTRIES = 1024
+    RESPONSE_CACHE_TTL = 300
+    # Сжатие gzip JSON-ответов от этого размера (см. app/compression.py)
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_LEVEL = 6
+    # Стоимость bcrypt и пул хеширования паролей (см. app/passwords.py);
+    # None — по числу ядер
+    BCRYPT_LOG_ROUNDS = 12
+    PASSWORD_HASH_WORKERS = None
+    PASSWORD_HASH_QUEUE = 32
+    # Миграция схемы при создании приложения; без неё — flask upgrade-schema
+    AUTO_UPGRADE_SCHEMA = True
+    # Учёт SQL-запросов на HTTP-запрос (см. app/instrumentation.py)
+    SQL_SERVER_TIMING = True
+    SLOW_REQUEST_QUERIES = 20
+    SLOW_REQUEST_DB_MS = 200
+    SQL_REPEATED_STATEMENT_THRESHOLD = 5
+    # Метрики Prometheus на /metrics (см. app/metrics.py); None — доступ с любых адресов
+    METRICS_ENABLED = True
+    METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+    # Профилирование запросов (см. app/profiling.py); None — instance/profiles
+    PROFILE_DIR = None
+    PROFILE_HEADER = 'X-Profile'
+    PROFILE_SAMPLE_RATE = 0.0
+    PROFILE_MIN_DURATION_MS = 500
+    PROFILE_MAX_FILES = 100
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    WTF_CSRF_ENABLED = False
+    # Общая in-memory БД процесса: схему один раз создают фикстуры тестов
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///file:finance_test?mode=memory&cache=shared&uri=true'
+    SQLALCHEMY_ENGINE_OPTIONS = {'poolclass': QueuePool}
+    AUTO_UPGRADE_SCHEMA = False
+    # Минимальная стоимость bcrypt, чтобы тесты не тратили время на хеширование
+    BCRYPT_LOG_ROUNDS = 4
+
+
+class ProductionConfig(Config):
+    # Секреты обязательно задаются через FINANCE_SECRET_KEY и FINANCE_JWT_SECRET_KEY
+    SECRET_KEY = None
+    JWT_SECRET_KEY = None
+    # Время БД в заголовках раскрывает детали реализации
+    SQL_SERVER_TIMING = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 10,
+        'pool_timeout': 10,
+    }
+    SQLITE_PRAGMAS = {
+        # WAL: читатели не блокируются писателем и наоборот
+        'journal_mode': 'WAL',
+        # В WAL-режиме fsync только при checkpoint; коммит остаётся атомарным
+        'synchronous': 'NORMAL',
+        # Кэш страниц 64 МБ на соединение (отрицательное значение — в КиБ)
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    }
+
+
+PROFILES = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
+def load_config(app, config_name=None, overrides=None):
+    """Заполняет app.config: профиль, instance/config.py, переменные FINANCE_*, overrides"""
+    config_name = config_name or os.environ.get('FINANCE_CONFIG', 'development')
+    if config_name not in PROFILES:
+        raise ValueError(f'Unknown config profile: {config_name}')
+
+    app.config.from_object(PROFILES[config_name])
+    app.config.from_pyfile('config.py', silent=True)
+    app.config.from_prefixed_env('FINANCE')
+    if overrides:
+        app.config.from_mapping(overrides)
+
+    if not app.config['SECRET_KEY'] or not app.config['JWT_SECRET_KEY']:
+        raise RuntimeError('FINANCE_SECRET_KEY and FINANCE_JWT_SECRET_KEY must be set')
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Выполняет PRAGMA на каждом новом соединении SQLite-движка"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
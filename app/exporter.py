@@ -0,0 +1,69 @@
+# exporter.py
+"""Потоковая выгрузка транзакций в CSV и NDJSON.
+
+Строки читаются из БД порциями (``yield_per``) и сразу отдаются
+клиенту, поэтому память не зависит от размера истории, а первые байты
+уходят до завершения запроса к БД. При необходимости поток сжимается
+gzip на лету.
+"""
+import csv
+import io
+import json
+import zlib
+from . import db
+from .money import from_cents
+from .queries import TRANSACTION_FIELDS, transaction_rows_query, transaction_dict
+
+# Строк в одной порции чтения из БД и записи в ответ
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _csv_chunks(partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(TRANSACTION_FIELDS)
+    yield buffer.getvalue()
+
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (id, f'{from_cents(amount_cents):.2f}', transaction_type, category or '', description or '', date)
+            for id, amount_cents, transaction_type, category, description, date, *_ in rows
+        )
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(partitions):
+    for rows in partitions:
+        yield ''.join(json.dumps(transaction_dict(row), ensure_ascii=False) + '\n' for row in rows)
+
+
+FORMATS = {
+    'csv': (_csv_chunks, 'text/csv'),
+    'ndjson': (_ndjson_chunks, 'application/x-ndjson'),
+}
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_transactions(user_id, filters, export_format, compress=False):
+    """Генератор байтов выгрузки транзакций пользователя в формате csv или ndjson"""
+    chunk_writer, _ = FORMATS[export_format]
+
+    def partitions():
+        result = db.session.connection().execute(
+            transaction_rows_query(user_id, filters).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        yield from result.partitions()
+
+    chunks = (chunk.encode('utf-8') for chunk in chunk_writer(partitions()))
+    return _gzip(chunks) if compress else chunks
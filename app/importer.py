@@ -0,0 +1,221 @@
+# importer.py
+"""Импорт банковских выписок (CSV и OFX).
+
+Файл читается построчно, каждая строка проверяется правилами
+``app.validation`` (как в add_transaction), а транзакции вставляются
+пачками через executemany в рамках одной транзакции БД. Повторно
+загруженные строки отбрасываются по хешу содержимого
+(уникальный индекс ``ux_transaction_user_import_hash``).
+"""
+import csv
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import insert, select
+from . import db
+from .aggregates import TransactionDelta, apply_deltas
+from .models import Transaction, Category
+from .validation import ValidationError, validate_transaction
+
+# Строк в одной пачке INSERT
+BATCH_SIZE = 1000
+
+# Сколько ошибок по строкам возвращается в отчёте
+MAX_REPORTED_ERRORS = 100
+
+DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d', '%d.%m.%Y %H:%M', '%d.%m.%Y')
+
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def _amount_and_type(amount, transaction_type):
+    """Если тип не указан, знак суммы задаёт тип: минус — расход, иначе доход"""
+    amount = amount.replace(' ', '').replace(',', '.')
+    if transaction_type:
+        return amount, transaction_type
+    if amount.startswith('-'):
+        return amount[1:], 'expense'
+    return amount.lstrip('+'), 'income'
+
+
+def read_csv(stream):
+    """CSV с колонками date, amount, type, category, description -> (номер строки, поля)"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        amount, transaction_type = _amount_and_type(
+            (row.get('amount') or '').strip(), (row.get('type') or '').strip()
+        )
+        yield reader.line_num, {
+            'date': (row.get('date') or '').strip(),
+            'amount': amount,
+            'type': transaction_type,
+            'category': (row.get('category') or '').strip(),
+            'description': (row.get('description') or '').strip(),
+            'external_id': None,
+        }
+
+
+def _ofx_fields(tags):
+    posted = tags.get('DTPOSTED', '')
+    date = f'{posted[0:4]}-{posted[4:6]}-{posted[6:8]}'
+    if len(posted) >= 14:
+        date += f' {posted[8:10]}:{posted[10:12]}:{posted[12:14]}'
+    amount, transaction_type = _amount_and_type(tags.get('TRNAMT', ''), '')
+    description = ' '.join(dict.fromkeys(v for v in (tags.get('NAME'), tags.get('MEMO')) if v))
+    return {
+        'date': date,
+        'amount': amount,
+        'type': transaction_type,
+        'category': '',
+        'description': description,
+        'external_id': tags.get('FITID'),
+    }
+
+
+def read_ofx(stream):
+    """Блоки <STMTTRN> из OFX (SGML 1.x или XML 2.x) -> (номер строки, поля)"""
+    tags = None
+    start_line = 0
+    for line_num, line in enumerate(stream, start=1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and tags is not None:
+                    yield start_line, _ofx_fields(tags)
+                    tags = None
+                elif not closing:
+                    tags, start_line = {}, line_num
+            elif tags is not None and not closing:
+                tags[tag] = value.strip()
+
+
+READERS = {
+    'csv': read_csv,
+    'ofx': read_ofx,
+}
+
+
+def _parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+    raise ValidationError('Неверный формат даты')
+
+
+def _prepare(user_id, fields):
+    """Поля строки выписки -> значения транзакции; ValidationError при ошибке"""
+    values = validate_transaction(fields, user_id)
+    values['date'] = _parse_date(fields['date'])
+    if len(fields['category']) > Category.name.type.length:
+        raise ValidationError('Слишком длинное название категории')
+    values['category'] = fields['category']
+    return values
+
+
+def _content_key(fields, values):
+    """Ключ дедупликации: идентификатор банка (FITID), а без него — содержимое строки"""
+    if fields['external_id']:
+        return f"id|{fields['external_id']}"
+    return '|'.join(str(v) for v in (
+        values['date'].isoformat(), values['amount_cents'], values['type'],
+        values['category'], values['description']
+    ))
+
+
+def _resolve_categories(user_id, batch, categories, report):
+    """Заполняет кэш «название -> id», создавая недостающие категории пользователя"""
+    names = {record['category'] for record in batch if record['category']} - categories.keys()
+    if not names:
+        return
+
+    categories.update(db.session.connection().execute(
+        select(Category.name, Category.id).where(Category.user_id == user_id, Category.name.in_(names))
+    ).all())
+
+    created = [Category(name=name, user_id=user_id) for name in names - categories.keys()]
+    if created:
+        db.session.add_all(created)
+        db.session.flush()
+        categories.update((category.name, category.id) for category in created)
+        report['categories_created'] += len(created)
+
+
+def _insert_batch(user_id, batch, categories, report):
+    conn = db.session.connection()
+    _resolve_categories(user_id, batch, categories, report)
+
+    hashes = [record['import_hash'] for record in batch]
+    existing = set(conn.execute(
+        select(Transaction.import_hash).where(
+            Transaction.user_id == user_id, Transaction.import_hash.in_(hashes)
+        )
+    ).scalars())
+
+    rows = [
+        {
+            'user_id': user_id,
+            'amount_cents': record['amount_cents'],
+            'type': record['type'],
+            'category_id': categories.get(record['category']),
+            'description': record['description'],
+            'date': record['date'],
+            'import_hash': record['import_hash'],
+        }
+        for record in batch if record['import_hash'] not in existing
+    ]
+    report['duplicates'] += len(batch) - len(rows)
+    if not rows:
+        return
+
+    # executemany в обход ORM: агрегаты обновляем явно и, как before_flush, до вставки
+    apply_deltas(conn, [
+        TransactionDelta(user_id, row['category_id'], row['type'], row['date'], row['amount_cents'], 1)
+        for row in rows
+    ])
+    conn.execute(insert(Transaction.__table__), rows)
+    report['accepted'] += len(rows)
+
+
+def import_transactions(user_id, rows):
+    """Импортирует строки выписки в текущую транзакцию БД и возвращает отчёт.
+
+    Коммит выполняет вызывающий код.
+    """
+    report = {'accepted': 0, 'duplicates': 0, 'rejected': 0, 'categories_created': 0, 'errors': []}
+    categories = {}
+    occurrences = Counter()
+    external_ids = set()
+    batch = []
+
+    for line, fields in rows:
+        try:
+            record = _prepare(user_id, fields)
+        except ValidationError as e:
+            report['rejected'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'line': line, 'error': str(e)})
+            continue
+
+        # FITID уникален в выписке: его повтор — та же операция, а не новая
+        if fields['external_id']:
+            if fields['external_id'] in external_ids:
+                report['duplicates'] += 1
+                continue
+            external_ids.add(fields['external_id'])
+
+        # Одинаковые строки в одном файле различаются порядковым номером
+        key = hashlib.sha256(_content_key(fields, record).encode()).digest()
+        occurrences[key] += 1
+        record['import_hash'] = hashlib.sha256(key + str(occurrences[key]).encode()).hexdigest()
+
+        batch.append(record)
+        if len(batch) >= BATCH_SIZE:
+            _insert_batch(user_id, batch, categories, report)
+            batch = []
+
+    if batch:
+        _insert_batch(user_id, batch, categories, report)
+    return report
@@ -0,0 +1,133 @@
+# instrumentation.py
+"""Учёт SQL-запросов и времени БД на каждый HTTP-запрос.
+
+Обработчики событий движка SQLAlchemy записывают каждое выполнение в
+активные сборщики ``QueryStats``: один открывается на время запроса,
+другие — ``count_queries`` в тестах и профилировании. Управляющие
+команды транзакций (SAVEPOINT, RELEASE, ROLLBACK TO) не считаются.
+
+По итогам запроса:
+
+* при ``SQL_SERVER_TIMING`` (выключено в production) в ответ добавляется
+  заголовок ``Server-Timing: db;dur=..;desc="N queries", app;dur=..``;
+* запрос логируется с уровнем WARNING, если число SQL-запросов больше
+  ``SLOW_REQUEST_QUERIES``, время БД больше ``SLOW_REQUEST_DB_MS`` или
+  один и тот же запрос выполнен ``SQL_REPEATED_STATEMENT_THRESHOLD`` раз
+  и больше (признак N+1).
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_TRANSACTION_CONTROL = ('SAVEPOINT', 'RELEASE', 'ROLLBACK')
+
+# Активные сборщики текущего контекста выполнения
+_collectors = ContextVar('sql_collectors', default=())
+
+
+class QueryStats:
+    """Число SQL-запросов, суммарное время и повторы одинаковых запросов"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.started = time.perf_counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold):
+        """Запросы, выполненные не меньше threshold раз: [(текст, число), ...]"""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self):
+        elapsed = time.perf_counter() - self.started
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries", app;dur={elapsed * 1000:.2f}'
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context.query_started
+    if statement.startswith(_TRANSACTION_CONTROL):
+        return
+    for stats in _collectors.get():
+        stats.record(statement, duration)
+
+
+def instrument_engine(engine):
+    event.listen(engine, 'before_cursor_execute', _before_execute)
+    event.listen(engine, 'after_cursor_execute', _after_execute)
+
+
+@contextmanager
+def count_queries():
+    """Собирает SQL-запросы, выполненные внутри блока (включая запросы тестового клиента)"""
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """Тестовая проверка: внутри блока выполнено не больше limit SQL-запросов"""
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        details = '\n'.join(f'{n} x {statement}' for statement, n in stats.statements.most_common())
+        raise AssertionError(f'{stats.count} SQL queries, expected at most {limit}:\n{details}')
+
+
+def _log_request(stats, config):
+    problems = []
+    if stats.count > config['SLOW_REQUEST_QUERIES']:
+        problems.append(f'{stats.count} queries')
+    if stats.duration * 1000 > config['SLOW_REQUEST_DB_MS']:
+        problems.append(f'{stats.duration * 1000:.1f} ms in DB')
+    for statement, n in stats.repeated(config['SQL_REPEATED_STATEMENT_THRESHOLD']):
+        problems.append(f'possible N+1: {n} x {" ".join(statement.split())[:200]}')
+    if problems:
+        logger.warning('%s %s: %s', request.method, request.full_path, '; '.join(problems))
+
+
+def init_app(app):
+    from . import db
+    with app.app_context():
+        instrument_engine(db.engine)
+
+    @app.before_request
+    def _start_collecting():
+        stats = QueryStats()
+        g.sql_stats = stats
+        g.sql_stats_token = _collectors.set(_collectors.get() + (stats,))
+
+    @app.after_request
+    def _report(response):
+        stats = g.get('sql_stats')
+        if stats is None:
+            return response
+        if app.config['SQL_SERVER_TIMING']:
+            response.headers['Server-Timing'] = stats.server_timing()
+        _log_request(stats, app.config)
+        return response
+
+    @app.teardown_request
+    def _stop_collecting(exc):
+        token = g.pop('sql_stats_token', None)
+        g.pop('sql_stats', None)
+        if token is not None:
+            _collectors.reset(token)
@@ -0,0 +1,248 @@
+# metrics.py
+"""Метрики в текстовом формате Prometheus (``GET /metrics``).
+
+Собираются:
+
+* ``finance_http_requests_total`` — запросы по blueprint, эндпоинту,
+  методу и коду ответа;
+* ``finance_http_request_duration_seconds`` — гистограмма времени
+  ответа по эндпоинтам;
+* ``finance_http_requests_in_flight`` — запросы в обработке;
+* ``finance_db_pool_*`` — выдачи и новые соединения пула SQLAlchemy,
+  а при сборе — размер пула, выданные и сверхлимитные соединения;
+* ``finance_password_hash_seconds`` — время bcrypt (с ожиданием в
+  очереди пула хеширования) и ``finance_password_hash_rejected_total``.
+
+На горячем пути нет блокировок: каждый поток пишет в свой набор
+счётчиков (shard), а эндпоинт ``/metrics`` суммирует их при сборе.
+Набор завершившегося потока вливается в общий набор ``retired``, так что
+счётчики не убывают, а число наборов не растёт с числом потоков.
+
+Метрики свои у каждого процесса и не суммируются между процессами: за
+pre-fork сервером (serve.py) на сбор отвечает тот рабочий процесс, который
+принял соединение, а перезапущенный процесс начинает счёт с нуля. Поэтому
+у каждой серии есть метка ``pid`` рабочего процесса; суммировать по
+процессам нужно в запросе Prometheus (``sum without (pid)``). Эндпоинт доступен только с адресов
+``METRICS_ALLOWED_IPS`` (по умолчанию локальных), для остальных — 404.
+"""
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+from flask import Response, abort, current_app, g, request
+
+# Границы гистограмм, секунды
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Имя -> (тип, описание, границы гистограммы)
+METRICS = {
+    'finance_http_requests_total': ('counter', 'HTTP requests by endpoint and status', None),
+    'finance_http_request_duration_seconds': ('histogram', 'HTTP request latency', LATENCY_BUCKETS),
+    'finance_http_requests_in_flight': ('gauge', 'HTTP requests being processed', None),
+    'finance_db_pool_checkouts_total': ('counter', 'Connections checked out from the pool', None),
+    'finance_db_pool_connects_total': ('counter', 'New DBAPI connections opened by the pool', None),
+    'finance_db_pool_size': ('gauge', 'Configured pool size', None),
+    'finance_db_pool_checked_out': ('gauge', 'Connections currently checked out', None),
+    'finance_db_pool_overflow': ('gauge', 'Connections opened above the pool size', None),
+    'finance_password_hash_seconds': ('histogram', 'bcrypt hash/check time including queueing', HASH_BUCKETS),
+    'finance_password_hash_rejected_total': ('counter', 'Password operations rejected by a full hashing pool', None),
+}
+
+
+class _Shard:
+    """Счётчики одного потока; пишет только этот поток"""
+
+    def __init__(self):
+        # (имя, метки) -> значение
+        self.counters = defaultdict(int)
+        # (имя, метки) -> [число в каждом интервале..., +Inf, сумма, количество]
+        self.histograms = {}
+
+
+class _ThreadOwner:
+    """Живёт в thread-local потока; его сборка означает, что поток завершился"""
+
+
+def _merge(counters, histograms, source):
+    """Прибавляет значения набора source к словарям counters и histograms"""
+    # Копия: поток может добавить ключ во время обхода
+    for key, value in list(source.counters.items()):
+        counters[key] += value
+    for key, data in list(source.histograms.items()):
+        total = histograms.setdefault(key, [0] * len(data))
+        for i, value in enumerate(list(data)):
+            total[i] += value
+
+
+class _MetricsState:
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = set()
+        # Сумма наборов завершившихся потоков
+        self.retired = _Shard()
+        # RLock: _retire может сработать при сборке мусора внутри collect
+        self.lock = threading.RLock()
+        self.engine = None
+
+    def shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = _Shard()
+            owner = self.local.owner = _ThreadOwner()
+            weakref.finalize(owner, self._retire, shard).atexit = False
+            with self.lock:
+                self.shards.add(shard)
+        return shard
+
+    def _retire(self, shard):
+        with self.lock:
+            self.shards.discard(shard)
+            _merge(self.retired.counters, self.retired.histograms, shard)
+
+
+def _labels(**labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class Metrics:
+    """Счётчики, датчики и гистограммы; своё хранилище у каждого приложения"""
+
+    def init_app(self, app):
+        app.extensions['metrics'] = _MetricsState()
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        from . import db
+        with app.app_context():
+            self._instrument_pool(app, db.engine)
+
+        @app.before_request
+        def _start_request():
+            if request.endpoint == 'metrics':
+                return
+            g.metrics_started = time.perf_counter()
+            self.inc('finance_http_requests_in_flight')
+
+        @app.after_request
+        def _record_request(response):
+            started = g.get('metrics_started')
+            if started is not None:
+                endpoint = request.endpoint or 'unmatched'
+                blueprint = request.blueprint or ''
+                self.inc('finance_http_requests_total', blueprint=blueprint, endpoint=endpoint,
+                         method=request.method, status=response.status_code)
+                self.observe('finance_http_request_duration_seconds', time.perf_counter() - started,
+                             blueprint=blueprint, endpoint=endpoint)
+            return response
+
+        @app.teardown_request
+        def _finish_request(exc):
+            if g.pop('metrics_started', None) is not None:
+                self.inc('finance_http_requests_in_flight', -1)
+
+        @app.route('/metrics')
+        def metrics():
+            allowed = current_app.config['METRICS_ALLOWED_IPS']
+            if allowed is not None and request.remote_addr not in allowed:
+                abort(404)
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def _instrument_pool(self, app, engine):
+        from sqlalchemy import event
+        state = app.extensions['metrics']
+        state.engine = engine
+
+        # События пула приходят и вне контекста приложения: пишем в state напрямую
+        @event.listens_for(engine, 'checkout')
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            state.shard().counters[('finance_db_pool_checkouts_total', ())] += 1
+
+        @event.listens_for(engine, 'connect')
+        def _connect(dbapi_connection, connection_record):
+            state.shard().counters[('finance_db_pool_connects_total', ())] += 1
+
+    @property
+    def _state(self):
+        return current_app.extensions['metrics']
+
+    def inc(self, name, value=1, **labels):
+        self._state.shard().counters[(name, _labels(**labels))] += value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels(**labels))
+        buckets = METRICS[name][2]
+        histograms = self._state.shard().histograms
+        data = histograms.get(key)
+        if data is None:
+            data = histograms[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+        data[bisect_left(buckets, value)] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    def collect(self):
+        """Сумма по всем потокам: (счётчики, гистограммы) с ключами (имя, метки)"""
+        state = self._state
+        counters = defaultdict(int)
+        histograms = {}
+        with state.lock:
+            shards = list(state.shards)
+            _merge(counters, histograms, state.retired)
+        for shard in shards:
+            _merge(counters, histograms, shard)
+
+        if state.engine is not None:
+            pool = state.engine.pool
+            for name, method in (('finance_db_pool_size', 'size'),
+                                 ('finance_db_pool_checked_out', 'checkedout'),
+                                 ('finance_db_pool_overflow', 'overflow')):
+                if hasattr(pool, method):
+                    counters[(name, ())] = getattr(pool, method)()
+        return counters, histograms
+
+    def render(self):
+        counters, histograms = self.collect()
+        worker = (('pid', os.getpid()),)
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            series = sorted(item for item in (histograms if kind == 'histogram' else counters).items()
+                            if item[0][0] == name)
+            if not series:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (_, labels), value in series:
+                labels = worker + labels
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), value):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", le)])} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(value[-2])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {value[-1]}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
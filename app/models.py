@@ -1,6 +1,8 @@
 # models.py
 from . import db
+from .money import to_cents, from_cents
 from datetime import datetime, timezone
+from sqlalchemy.ext.hybrid import hybrid_property
 
 class User(db.Model):
     __tablename__ = 'user'
@@ -10,6 +12,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), default='user')
+    # Растёт при каждом изменении транзакций, категорий или профиля; основа ETag
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     categories = db.relationship('Category', backref='user', lazy=True, cascade='all, delete-orphan')
     transactions = db.relationship('Transaction', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -18,17 +22,97 @@ class User(db.Model):
         return f'<User {self.username}>'
 
 class Category(db.Model):
+    __table_args__ = (
+        # Список категорий пользователя и проверка уникальности имени
+        db.Index('ix_category_user_name', 'user_id', 'name'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
     transactions = db.relationship('Transaction', backref='category', cascade="all, delete-orphan")
+    budgets = db.relationship('Budget', backref='category', cascade='all, delete-orphan')
 
 class Transaction(db.Model):
+    __table_args__ = (
+        # Лента транзакций пользователя (ORDER BY date DESC)
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+        # Суммы доходов/расходов для баланса
+        db.Index('ix_transaction_user_type', 'user_id', 'type'),
+        # Статистика по категориям и проверка перед удалением категории
+        db.Index('ix_transaction_user_category_type', 'user_id', 'category_id', 'type'),
+        # Каскадная загрузка Category.transactions
+        db.Index('ix_transaction_category', 'category_id'),
+        # Дедупликация импортированных выписок
+        db.Index('ux_transaction_user_import_hash', 'user_id', 'import_hash', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    amount = db.Column(db.Float, nullable=False)
+    amount_cents = db.Column(db.Integer, nullable=False)  # сумма в копейках
     type = db.Column(db.String(10), nullable=False)  # income/expense
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
     description = db.Column(db.String(200))
     date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    # Хеш содержимого строки выписки для импортированных транзакций
+    import_hash = db.Column(db.String(64))
+
+    @hybrid_property
+    def amount(self):
+        """Сумма в рублях"""
+        return from_cents(self.amount_cents)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = to_cents(value)
+
+    @amount.expression
+    def amount(cls):
+        return cls.amount_cents / 100.0
+
+class UserTotals(db.Model):
+    """Суммы доходов/расходов и число транзакций пользователя (см. app.aggregates)"""
+    __tablename__ = 'user_totals'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    income_cents = db.Column(db.Integer, nullable=False, default=0)
+    expense_cents = db.Column(db.Integer, nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def balance_cents(self):
+        return self.income_cents - self.expense_cents
+
+class MonthlyRollup(db.Model):
+    """Суммы и количество транзакций по (пользователь, категория, месяц, тип) (см. app.aggregates)"""
+    __tablename__ = 'monthly_rollup'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    # 0 — транзакции без категории
+    category_id = db.Column(db.Integer, primary_key=True)
+    # Первый день месяца, ГГГГ-ММ-01
+    month = db.Column(db.String(10), primary_key=True)
+    type = db.Column(db.String(10), primary_key=True)
+    total_cents = db.Column(db.Integer, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class Budget(db.Model):
+    """Лимит расходов по категории за период и траты текущего периода (см. app.aggregates)"""
+    __tablename__ = 'budget'
+    __table_args__ = (
+        # Все бюджеты пользователя одним чтением и один бюджет на категорию и период
+        db.Index('ux_budget_user_category_period', 'user_id', 'category_id', 'period', unique=True),
+        # Каскадная загрузка Category.budgets
+        db.Index('ix_budget_category', 'category_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # week/month
+    limit_cents = db.Column(db.Integer, nullable=False)
+    # Начало периода, к которому относится spent_cents, ГГГГ-ММ-ДД
+    period_start = db.Column(db.String(10), nullable=False, default='')
+    # Расходы по категории за период period_start, в копейках
+    spent_cents = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,34 @@
+# money.py
+"""Денежные суммы хранятся в БД целым числом копеек.
+
+Перевод в рубли и обратно выполняется только на границе JSON: при
+разборе входных данных (``to_cents``) и при формировании ответа
+(``from_cents``). Суммирование в SQL идёт по целым числам и не
+накапливает ошибку округления.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Предел суммы одной транзакции: 100 млрд, чтобы SUM по истории оставался в пределах INTEGER SQLite
+MAX_AMOUNT_CENTS = 10 ** 13
+
+
+def to_cents(value):
+    """Сумма в рублях (число или строка) -> целое число копеек; ValueError при неверном значении.
+
+    Суммы по модулю больше MAX_AMOUNT_CENTS копеек отклоняются до округления:
+    иначе quantize выходит за точность Decimal, а копейки — за INTEGER SQLite.
+    """
+    if isinstance(value, bool):
+        raise ValueError('invalid amount')
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError('invalid amount')
+    if not amount.is_finite() or abs(amount) > Decimal(MAX_AMOUNT_CENTS) / 100:
+        raise ValueError('invalid amount')
+    return int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Целое число копеек -> сумма в рублях для JSON"""
+    return cents / 100
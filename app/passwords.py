@@ -0,0 +1,80 @@
+# passwords.py
+"""Хеширование и проверка паролей в ограниченном пуле потоков.
+
+bcrypt намеренно дорог по CPU. Вычисления выполняются в пуле из
+``PASSWORD_HASH_WORKERS`` потоков (по умолчанию — по числу ядер;
+bcrypt отпускает GIL), поэтому всплеск входов занимает не больше этих
+потоков, а остальные запросы продолжают обслуживаться. Сверх пула в
+очереди ждут не больше ``PASSWORD_HASH_QUEUE`` задач; дальше
+``PasswordHasherBusy``, и маршрут отвечает 503 вместо накопления
+ожидающих запросов.
+
+Стоимость задаётся ``BCRYPT_LOG_ROUNDS``; хеши с другой стоимостью
+пересчитываются при успешном входе (``needs_rehash``).
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from . import bcrypt
+from .metrics import metrics
+
+
+class PasswordHasherBusy(Exception):
+    """Пул хеширования и очередь заполнены"""
+
+
+class _HasherPool:
+    def __init__(self, workers, queue_size):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+
+class PasswordHasher:
+    def init_app(self, app):
+        workers = app.config['PASSWORD_HASH_WORKERS'] or os.cpu_count() or 1
+        app.extensions['password_hasher'] = _HasherPool(workers, app.config['PASSWORD_HASH_QUEUE'])
+
+    @property
+    def _pool(self):
+        return current_app.extensions['password_hasher']
+
+    def _run(self, operation, fn, *args):
+        started = time.perf_counter()
+        try:
+            result = self._pool.run(fn, *args)
+        except PasswordHasherBusy:
+            metrics.inc('finance_password_hash_rejected_total', operation=operation)
+            raise
+        metrics.observe('finance_password_hash_seconds', time.perf_counter() - started, operation=operation)
+        return result
+
+    def hash_password(self, password):
+        """Хеш bcrypt пароля с текущей стоимостью BCRYPT_LOG_ROUNDS"""
+        return self._run('hash', bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def check_password(self, password_hash, password):
+        return self._run('check', bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Стоимость хеша ($2b$<rounds>$...) отличается от настроенной"""
+        try:
+            rounds = int(password_hash.split('$')[2])
+        except (IndexError, ValueError):
+            return True
+        return rounds != current_app.config['BCRYPT_LOG_ROUNDS']
+
+
+hasher = PasswordHasher()
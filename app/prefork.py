@@ -0,0 +1,189 @@
+# prefork.py
+"""Pre-fork HTTP-сервер для продакшена (только POSIX).
+
+Главный процесс создаёт приложение (``preload``), открывает слушающий
+сокет и запускает ``workers`` дочерних процессов через fork; все они
+принимают соединения с общего сокета и обслуживают по одному запросу за
+раз. Главный процесс следит за ними:
+
+* упавший или завершившийся рабочий процесс заменяется новым;
+* после ``max_requests`` запросов процесс завершается сам и заменяется
+  (защита от утечек памяти);
+* SIGHUP — плавная перезагрузка: приложение создаётся заново (перечитываются
+  профиль, instance/config.py и переменные окружения), запускаются новые
+  процессы, а старые дообслуживают текущий запрос и выходят;
+* SIGTERM / SIGINT — плавная остановка; процессы, не успевшие за
+  ``graceful_timeout`` секунд, завершаются SIGKILL.
+"""
+import logging
+import os
+import signal
+import socket
+import time
+from werkzeug.serving import BaseWSGIServer
+from . import db
+
+logger = logging.getLogger(__name__)
+
+# Как часто рабочий процесс проверяет флаг остановки, пока нет соединений
+ACCEPT_TIMEOUT = 1.0
+
+
+class PreforkServer:
+    def __init__(self, app_factory, host='127.0.0.1', port=8000, workers=None,
+                 max_requests=0, graceful_timeout=30, backlog=128):
+        self.app_factory = app_factory
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+
+        self.app = None
+        self.socket = None
+        self.generation = 0
+        # pid -> поколение, в котором процесс запущен
+        self.children = {}
+        self._stopping = False
+        self._reload = False
+
+    # Главный процесс
+
+    def _load_app(self):
+        app = self.app_factory()
+        # Соединения, открытые при создании приложения (миграция схемы),
+        # не должны наследоваться дочерними процессами
+        with app.app_context():
+            db.engine.dispose()
+        return app
+
+    def _listen(self):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        # Неблокирующий accept: процесс, проигравший гонку за соединение,
+        # не зависает в accept и продолжает проверять флаг остановки
+        sock.setblocking(False)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def run(self):
+        self.app = self._load_app()
+        self.socket = self._listen()
+        logger.info('Listening on http://%s:%d with %d workers (pid %d)',
+                    self.host, self.port, self.workers, os.getpid())
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        while not self._stopping:
+            self._reap()
+            if self._reload:
+                self._reload = False
+                self._reload_workers()
+            self._spawn_missing()
+            time.sleep(0.2)
+
+        self._stop_workers(list(self.children))
+        self.socket.close()
+        logger.info('Stopped')
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload = True
+
+    def _reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self.children.pop(pid, None) == self.generation and not self._stopping:
+                logger.info('Worker %d exited with status %d', pid, os.waitstatus_to_exitcode(status))
+
+    def _spawn_missing(self):
+        current = sum(1 for generation in self.children.values() if generation == self.generation)
+        for _ in range(self.workers - current):
+            self._spawn()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                self._worker_main()
+            except BaseException:
+                logger.exception('Worker %d failed', os.getpid())
+                status = 1
+            finally:
+                os._exit(status)
+        self.children[pid] = self.generation
+        logger.info('Worker %d started', pid)
+
+    def _reload_workers(self):
+        logger.info('Reloading')
+        try:
+            app = self._load_app()
+        except Exception:
+            logger.exception('Reload failed, keeping current workers')
+            return
+        old = [pid for pid, generation in self.children.items() if generation == self.generation]
+        self.app = app
+        self.generation += 1
+        self._spawn_missing()
+        for pid in old:
+            self._signal(pid, signal.SIGTERM)
+
+    def _stop_workers(self, pids):
+        for pid in pids:
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            self._signal(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.children.pop(pid)
+
+    def _signal(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    # Рабочий процесс
+
+    def _worker_main(self):
+        stopping = False
+
+        def _stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, _stop)
+        # Ctrl+C и SIGHUP обрабатывает главный процесс
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+        handled = 0
+        app = self.app
+
+        def counting_app(environ, start_response):
+            nonlocal handled
+            handled += 1
+            return app(environ, start_response)
+
+        server = BaseWSGIServer(self.host, self.port, counting_app, fd=self.socket.fileno())
+        server.timeout = ACCEPT_TIMEOUT
+        while not stopping and not (self.max_requests and handled >= self.max_requests):
+            server.handle_request()
+        server.server_close()
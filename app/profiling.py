@@ -0,0 +1,139 @@
+# profiling.py
+"""Профилирование отдельных запросов по требованию.
+
+Запрос профилируется cProfile, если:
+
+* в нём есть заголовок ``PROFILE_HEADER`` (по умолчанию ``X-Profile``)
+  и токен администратора — профиль сохраняется всегда, его имя
+  возвращается в заголовке ``X-Profile-Id``;
+* он попал в выборку ``PROFILE_SAMPLE_RATE`` (доля запросов, по
+  умолчанию 0) — профиль сохраняется, только если запрос длился не
+  меньше ``PROFILE_MIN_DURATION_MS``.
+
+Профили пишутся в формате pstats (``.prof``) в ``PROFILE_DIR`` (по
+умолчанию ``instance/profiles``) с именем ``<время>_<эндпоинт>_<мс>ms.prof``;
+хранятся последние ``PROFILE_MAX_FILES``. Файл открывается ``pstats``,
+snakeviz или переводится во flamegraph (flameprof). Список и скачивание —
+``/api/admin/profiles``.
+
+Одновременно профилируется только один запрос: с Python 3.12 cProfile
+работает через sys.monitoring и второй ``enable()`` в процессе падает с
+ValueError. Запрос, пришедший во время чужого профилирования, выполняется
+без профиля.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+PROFILE_NAME = re.compile(r'^(\d{8}T\d{12})_([\w.]+)_(\d+)ms\.prof$')
+_active = threading.Lock()
+
+
+def _is_admin():
+    from . import db
+    from .models import User
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    identity = get_jwt_identity()
+    if identity is None:
+        return False
+    user = db.session.get(User, identity)
+    return user is not None and user.role == 'admin'
+
+
+class Profiler:
+    def init_app(self, app):
+        @app.before_request
+        def _start_profile():
+            forced = app.config['PROFILE_HEADER'] in request.headers and _is_admin()
+            if not forced and random.random() >= app.config['PROFILE_SAMPLE_RATE']:
+                return
+            if not _active.acquire(blocking=False):
+                return
+            g.profile = cProfile.Profile()
+            g.profile_forced = forced
+            g.profile_started = time.perf_counter()
+            g.profile.enable()
+
+        @app.after_request
+        def _save_profile(response):
+            profile = g.pop('profile', None)
+            if profile is None:
+                return response
+            profile.disable()
+            _active.release()
+            duration_ms = (time.perf_counter() - g.pop('profile_started')) * 1000
+            forced = g.pop('profile_forced')
+            if forced or duration_ms >= app.config['PROFILE_MIN_DURATION_MS']:
+                name = self._store(profile, request.endpoint or 'unmatched', duration_ms)
+                if forced:
+                    response.headers['X-Profile-Id'] = name
+            return response
+
+        @app.teardown_request
+        def _discard_profile(exc):
+            # Необработанное исключение: after_request не вызывался
+            profile = g.pop('profile', None)
+            if profile is not None:
+                profile.disable()
+                _active.release()
+
+    def directory(self):
+        return current_app.config['PROFILE_DIR'] or os.path.join(current_app.instance_path, 'profiles')
+
+    def _store(self, profile, endpoint, duration_ms):
+        directory = self.directory()
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        name = f'{stamp}_{endpoint}_{int(duration_ms)}ms.prof'
+        profile.dump_stats(os.path.join(directory, name))
+        for old in self.list()[current_app.config['PROFILE_MAX_FILES']:]:
+            os.remove(os.path.join(directory, old['name']))
+        return name
+
+    def list(self):
+        """Сохранённые профили, новые первыми"""
+        directory = self.directory()
+        if not os.path.isdir(directory):
+            return []
+        profiles = []
+        for name in os.listdir(directory):
+            match = PROFILE_NAME.match(name)
+            if not match:
+                continue
+            stamp, endpoint, duration_ms = match.groups()
+            profiles.append({
+                'name': name,
+                'endpoint': endpoint,
+                'created': datetime.strptime(stamp, '%Y%m%dT%H%M%S%f').replace(tzinfo=timezone.utc).isoformat(),
+                'duration_ms': int(duration_ms),
+                'size': os.path.getsize(os.path.join(directory, name)),
+            })
+        profiles.sort(key=lambda profile: profile['name'], reverse=True)
+        return profiles
+
+    def path(self, name):
+        """Путь к профилю или None, если имени нет или оно не из PROFILE_NAME"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory(), name)
+        return path if os.path.isfile(path) else None
+
+    def summary(self, path, limit=50):
+        """Текстовый отчёт pstats: функции по накопленному времени"""
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+
+profiler = Profiler()
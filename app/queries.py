@@ -0,0 +1,85 @@
+# queries.py
+"""Проекции транзакций для списков и выгрузки.
+
+Запросы выбирают только нужные колонки и выполняются на уровне Core,
+без создания ORM-объектов; строки превращаются в JSON через
+``transaction_dict`` (массив объектов) или ``transaction_columns``
+(колоночный формат: по массиву на поле, категории по id).
+"""
+from sqlalchemy import func, select
+from .models import Transaction, Category
+from .money import from_cents
+
+# Поля транзакции в ответе API, в порядке колонок transaction_rows_query
+TRANSACTION_FIELDS = ('id', 'amount', 'type', 'category', 'description', 'date')
+
+# Значение поля ответа из строки transaction_rows_query
+_FIELD_VALUES = {
+    'id': lambda row: row.id,
+    'amount': lambda row: from_cents(row.amount_cents),
+    'type': lambda row: row.type,
+    'category': lambda row: row.category,
+    'description': lambda row: row.description,
+    'date': lambda row: row.formatted_date,
+}
+
+
+def transaction_rows_query(user_id, filters=()):
+    """SELECT транзакций пользователя с названием категории и датой, отформатированной в SQLite.
+
+    Колонки date (исходная дата для курсора пагинации) и category_id
+    (для колоночного формата) в ответ напрямую не попадают.
+    Порядок (date, id) по убыванию совпадает с индексом ix_transaction_user_date.
+    """
+    return select(
+        Transaction.id,
+        Transaction.amount_cents,
+        Transaction.type,
+        Category.name.label('category'),
+        Transaction.description,
+        func.strftime('%Y-%m-%d %H:%M', Transaction.date).label('formatted_date'),
+        Transaction.date,
+        Transaction.category_id
+    ).outerjoin(
+        Category, Category.id == Transaction.category_id
+    ).where(
+        Transaction.user_id == user_id,
+        *filters
+    ).order_by(Transaction.date.desc(), Transaction.id.desc())
+
+
+def parse_fields(value):
+    """Параметр fields=a,b,c -> кортеж полей в порядке TRANSACTION_FIELDS; ValueError при неизвестном поле"""
+    if not value:
+        return TRANSACTION_FIELDS
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = requested - set(TRANSACTION_FIELDS)
+    if unknown or not requested:
+        raise ValueError(', '.join(sorted(unknown)))
+    return tuple(field for field in TRANSACTION_FIELDS if field in requested)
+
+
+def transaction_dict(row, fields=TRANSACTION_FIELDS):
+    """Строка transaction_rows_query -> JSON-объект транзакции (сумма в рублях)"""
+    return {field: _FIELD_VALUES[field](row) for field in fields}
+
+
+def transaction_columns(rows, fields=TRANSACTION_FIELDS):
+    """Строки transaction_rows_query -> колоночный JSON: по массиву на поле.
+
+    Вместо названия категории в каждой строке передаётся category_id;
+    названия отдаются один раз словарём (см. ``category_names``).
+    """
+    columns = {}
+    for field in fields:
+        if field == 'category':
+            columns['category_id'] = [row.category_id for row in rows]
+        else:
+            value = _FIELD_VALUES[field]
+            columns[field] = [value(row) for row in rows]
+    return columns
+
+
+def category_names(rows):
+    """Словарь id -> название для категорий, встречающихся в строках"""
+    return {row.category_id: row.category for row in rows if row.category_id is not None}
@@ -1,11 +1,34 @@
-from flask import Blueprint, request, jsonify
+from functools import wraps
+from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Transaction, Category
+from app.models import Transaction, Category, User
+from app.batch import apply_batch, BatchError, MAX_BATCH_OPERATIONS
+from app.cache import cache
+from app.profiling import profiler
 from app import db
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+def admin_required(view):
+    """Access only for users with role 'admin' (after jwt_required)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user = db.session.get(User, get_jwt_identity())
+        if user is None or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
 # Categories
+@api_bp.route('/categories', methods=['GET'])
+@jwt_required()
+def list_categories():
+    user_id = get_jwt_identity()
+    rows = db.session.execute(
+        db.select(Category.id, Category.name).where(Category.user_id == user_id).order_by(Category.id)
+    ).all()
+    return jsonify({'categories': [{'id': id, 'name': name} for id, name in rows]})
+
 @api_bp.route('/categories', methods=['POST'])
 @jwt_required()
 def add_category():
@@ -24,3 +47,56 @@ def delete_category(id):
     db.session.delete(category)
     db.session.commit()
     return jsonify({'message':'Category deleted'})
+
+# Batch: several transaction/category changes in one request and one commit
+@api_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch():
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({'error': f'At most {MAX_BATCH_OPERATIONS} operations per batch'}), 400
+
+    try:
+        results = apply_batch(user_id, operations)
+    except BatchError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'index': e.index}), 400
+
+    db.session.commit()
+    return jsonify({'message': 'Batch applied', 'results': results})
+
+# Admin: response cache hit/miss counters for tuning size and TTL
+@api_bp.route('/admin/cache', methods=['GET'])
+@jwt_required()
+@admin_required
+def cache_stats():
+    return jsonify(cache.stats())
+
+@api_bp.route('/admin/cache', methods=['DELETE'])
+@jwt_required()
+@admin_required
+def cache_clear():
+    cache.clear()
+    return jsonify({'message': 'Cache cleared'})
+
+# Admin: stored request profiles (see app/profiling.py)
+@api_bp.route('/admin/profiles', methods=['GET'])
+@jwt_required()
+@admin_required
+def profiles_list():
+    return jsonify({'profiles': profiler.list()})
+
+@api_bp.route('/admin/profiles/<name>', methods=['GET'])
+@jwt_required()
+@admin_required
+def profile_download(name):
+    path = profiler.path(name)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    if request.args.get('format') == 'text':
+        return profiler.summary(path), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=name)
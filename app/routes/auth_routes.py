@@ -1,11 +1,18 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for
-from app import db, bcrypt
+from app import db
 from app.models import User
+from app.passwords import hasher, PasswordHasherBusy
 from flask_jwt_extended import create_access_token
 from sqlalchemy.exc import IntegrityError
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+def _busy():
+    """Password hashing pool is saturated: ask the client to retry instead of queueing"""
+    response = jsonify({'error': 'Server is busy, please try again later'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # Страница login
 @auth_bp.route('/login', methods=['GET'])
 def login_page():
@@ -22,7 +29,11 @@ def login():
             return jsonify({'error': 'Email and password are required'}), 400
         
         user = User.query.filter_by(email=data['email']).first()
-        if user and bcrypt.check_password_hash(user.password, data['password']):
+        if user and hasher.check_password(user.password, data['password']):
+            # Хеш со старой стоимостью bcrypt пересчитываем, пока пароль известен
+            if hasher.needs_rehash(user.password):
+                user.password = hasher.hash_password(data['password'])
+                db.session.commit()
             token = create_access_token(identity=user.id)
             return jsonify({
                 'token': token,
@@ -34,6 +45,9 @@ def login():
             }), 200
         
         return jsonify({'error': 'Invalid credentials'}), 401
+
+    except PasswordHasherBusy:
+        return _busy()
         
     except Exception as e:
         return jsonify({'error': 'Login failed'}), 500
@@ -81,7 +95,7 @@ def register():
             else:
                 return jsonify({'error': 'Username already exists'}), 400
         
-        hashed_pw = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        hashed_pw = hasher.hash_password(data['password'])
         user = User(
             username=data['username'], 
             email=data['email'], 
@@ -110,6 +124,9 @@ def register():
             return jsonify({'error': 'Username already exists'}), 400
         else:
             return jsonify({'error': 'User already exists'}), 400
+
+    except PasswordHasherBusy:
+        return _busy()
             
     except Exception as e:
         db.session.rollback()
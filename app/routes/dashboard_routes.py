@@ -1,11 +1,362 @@
-from flask import Blueprint, render_template, jsonify, request
+from flask import Blueprint, render_template, jsonify, request, Response, stream_with_context, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Transaction, Category, User
+from app.models import Transaction, Category, User, UserTotals, MonthlyRollup, Budget
+from app.aggregates import sum_by_type, month_key, BUDGET_PERIODS, budget_status_columns, rebuild_budgets
+from app.cache import cache
+from app.compression import etag_matches
+from app.money import to_cents, from_cents
+from app.queries import transaction_rows_query, transaction_dict, transaction_columns, category_names, parse_fields
+from app.importer import READERS, import_transactions
+from app.exporter import FORMATS as EXPORT_FORMATS, export_transactions
+from app.validation import (ValidationError, TRANSACTION_TYPES, validate_transaction, parse_amount,
+                            parse_transaction_type, parse_category_id, parse_description)
+from app.search import search_query
 from app import db
-from sqlalchemy import func
+from sqlalchemy import func, and_, literal, select, true, tuple_
+from datetime import datetime, timedelta
+from functools import wraps
+import base64
+import csv
+import hashlib
+import io
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
+# Начало периода (строка ГГГГ-ММ-ДД) для группировки по дням, неделям (с понедельника) и месяцам
+PERIOD_BUCKETS = {
+    'day': lambda column: func.date(column),
+    'week': lambda column: func.date(column, '-6 days', 'weekday 1'),
+    'month': lambda column: func.date(column, 'start of month'),
+}
+
+# Размер страницы списка транзакций
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def _conditional(view):
+    """Условный GET и кэш ответа, пока версия данных пользователя не изменилась.
+
+    Ключ строится из пользователя, его версии данных и адреса с
+    параметрами запроса, поэтому проверка стоит одного запроса по
+    первичному ключу и выполняется до агрегирующих запросов: совпавший
+    If-None-Match получает 304, а найденное в кэше тело отдаётся без
+    обращения к данным.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = get_jwt_identity()
+        version = db.session.execute(select(User.data_version).where(User.id == user_id)).scalar()
+        if version is None:
+            return view(*args, **kwargs)
+
+        key = f'{user_id}|{version}|{request.full_path}'
+        etag = hashlib.sha256(key.encode()).hexdigest()[:32]
+        if etag_matches(etag):
+            response = Response(status=304)
+        elif (body := cache.get(key)) is not None:
+            response = Response(body, mimetype='application/json')
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            cache.set(key, response.get_data())
+        response.set_etag(etag)
+        # Ответ можно хранить только в браузере пользователя и лишь с перепроверкой
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
+
+def _encode_cursor(date, id):
+    return base64.urlsafe_b64encode(f'{date.isoformat()}|{id}'.encode()).decode()
+
+def _decode_cursor(cursor):
+    date, id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(date), int(id)
+
+def _page_query(user_id, filters, limit):
+    """Страница транзакций с одной лишней строкой — признаком следующей страницы"""
+    return transaction_rows_query(user_id, filters).limit(limit + 1)
+
+def _split_page(rows, limit):
+    """Строки _page_query -> строки страницы и курсор следующей страницы (None, если это последняя)"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].date, rows[-1].id)
+    return rows, next_cursor
+
+def _listing_shape(args):
+    """Параметры format (rows или columnar) и fields; ValueError с текстом ошибки при неверных значениях"""
+    listing_format = args.get('format', 'rows')
+    if listing_format not in ('rows', 'columnar'):
+        raise ValueError('Неверный формат, допустимо: rows, columnar')
+    try:
+        fields = parse_fields(args.get('fields'))
+    except ValueError as e:
+        raise ValueError(f'Неизвестные поля: {e}')
+    return listing_format == 'columnar', fields
+
+def _serialize_transactions(rows, columnar, fields):
+    if columnar:
+        return transaction_columns(rows, fields)
+    return [transaction_dict(row, fields) for row in rows]
+
+def _parse_page_size(value):
+    try:
+        limit = int(value) if value else PAGE_SIZE
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f'Размер страницы должен быть от 1 до {MAX_PAGE_SIZE}')
+    return limit
+
+def _listing_payload(rows, limit, columnar, fields):
+    rows, next_cursor = _split_page(rows, limit)
+    result = {
+        'transactions': _serialize_transactions(rows, columnar, fields),
+        'next_cursor': next_cursor
+    }
+    if columnar and 'category' in fields:
+        result['categories'] = category_names(rows)
+    return result
+
+def _dashboard_queries(user_id):
+    """Запросы дашборда: итоги, первая страница транзакций, категории"""
+    return (
+        # Баланс из инкрементально поддерживаемых агрегатов
+        select(UserTotals.income_cents, UserTotals.expense_cents, UserTotals.transaction_count).where(
+            UserTotals.user_id == user_id
+        ),
+        # Первая страница транзакций: только нужные колонки, без ORM-объектов
+        _page_query(user_id, [], PAGE_SIZE),
+        select(Category.id, Category.name).where(Category.user_id == user_id),
+    )
+
+def _dashboard_payload(totals, rows, categories, columnar, fields):
+    """Ответ дашборда из результатов _dashboard_queries"""
+    income, expense, transaction_count = totals[0] if totals else (0, 0, 0)
+    rows, next_cursor = _split_page(rows, PAGE_SIZE)
+    if columnar:
+        # Категории один раз словарём; транзакции ссылаются на них по category_id
+        categories_data = {id: name for id, name in categories}
+    else:
+        categories_data = [{'id': id, 'name': name} for id, name in categories]
+
+    return {
+        'balance': from_cents(income - expense),
+        'income': from_cents(income),
+        'expense': from_cents(expense),
+        'transaction_count': transaction_count,
+        'transactions': _serialize_transactions(rows, columnar, fields),
+        'next_cursor': next_cursor,
+        'categories': categories_data
+    }
+
+def _listing_filters(args):
+    """Условия выборки транзакций по параметрам запроса; ValueError с текстом ошибки при неверных значениях"""
+    try:
+        start, end = _parse_date_range(args.get('from'), args.get('to'))
+    except ValueError:
+        raise ValueError('Неверный формат даты, ожидается ГГГГ-ММ-ДД')
+    filters = _date_range_filters(Transaction, start, end)
+
+    transaction_type = args.get('type')
+    if transaction_type:
+        if transaction_type not in TRANSACTION_TYPES:
+            raise ValueError('Неверный тип транзакции')
+        filters.append(Transaction.type == transaction_type)
+
+    try:
+        if args.get('category_id'):
+            filters.append(Transaction.category_id == int(args['category_id']))
+        if args.get('min_amount'):
+            filters.append(Transaction.amount_cents >= to_cents(args['min_amount']))
+        if args.get('max_amount'):
+            filters.append(Transaction.amount_cents <= to_cents(args['max_amount']))
+    except ValueError:
+        raise ValueError('Неверный фильтр категории или суммы')
+
+    if args.get('cursor'):
+        try:
+            date, id = _decode_cursor(args['cursor'])
+        except ValueError:
+            raise ValueError('Неверный курсор')
+        filters.append(tuple_(Transaction.date, Transaction.id) < tuple_(date, id))
+
+    return filters
+
+def _parse_date_range(date_from, date_to):
+    """Параметры from/to (ГГГГ-ММ-ДД, обе границы включительно) -> (начало, конец не включительно)"""
+    start = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+    end = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None
+    return start, end
+
+def _is_month_aligned(start, end):
+    """Период состоит из целых месяцев и может быть посчитан по MonthlyRollup"""
+    return all(bound is None or bound.day == 1 for bound in (start, end))
+
+def _date_range_filters(source, start, end):
+    """Условия на дату транзакций (Transaction) или месяц (MonthlyRollup)"""
+    if source is MonthlyRollup:
+        column, start, end = source.month, start and month_key(start), end and month_key(end)
+    else:
+        column = source.date
+    filters = []
+    if start is not None:
+        filters.append(column >= start)
+    if end is not None:
+        filters.append(column < end)
+    return filters
+
+def _stats_params(args):
+    """Параметры from, to и granularity; ValueError с текстом ошибки при неверных значениях"""
+    try:
+        start, end = _parse_date_range(args.get('from'), args.get('to'))
+    except ValueError:
+        raise ValueError('Неверный формат даты, ожидается ГГГГ-ММ-ДД')
+
+    granularity = args.get('granularity')
+    if granularity is not None and granularity not in PERIOD_BUCKETS:
+        raise ValueError('Неверная детализация, допустимо: day, week, month')
+    return start, end, granularity
+
+def _stats_queries(user_id, start, end, granularity):
+    """Запросы статистики: суммы по категориям и, если задана детализация, динамика по периодам"""
+    # Период из целых месяцев считаем по помесячным агрегатам, иначе по транзакциям
+    source = MonthlyRollup if _is_month_aligned(start, end) else Transaction
+    date_filters = _date_range_filters(source, start, end)
+
+    # Доходы и расходы по всем категориям одним агрегирующим запросом
+    queries = [select(
+        Category.name, sum_by_type('income', source), sum_by_type('expense', source)
+    ).outerjoin(
+        source,
+        and_(
+            source.category_id == Category.id,
+            source.user_id == user_id,
+            *date_filters
+        )
+    ).where(
+        Category.user_id == user_id
+    ).group_by(Category.id).order_by(Category.id)]
+
+    # Динамика доходов и расходов по периодам
+    if granularity:
+        if granularity != 'month':
+            source = Transaction
+            date_filters = _date_range_filters(source, start, end)
+        if source is MonthlyRollup:
+            period = MonthlyRollup.month.label('period')
+        else:
+            period = PERIOD_BUCKETS[granularity](Transaction.date).label('period')
+
+        queries.append(select(
+            period, sum_by_type('income', source), sum_by_type('expense', source)
+        ).where(
+            source.user_id == user_id,
+            *date_filters
+        ).group_by(period).order_by(period))
+
+    return queries
+
+def _stats_payload(granularity, rows, series=None):
+    """Ответ статистики из результатов _stats_queries"""
+    result = {
+        'labels': [name for name, _, _ in rows],
+        'income': [from_cents(income) for _, income, _ in rows],
+        'expense': [from_cents(expense) for _, _, expense in rows]
+    }
+    if granularity:
+        result['series'] = {
+            'granularity': granularity,
+            'periods': [p for p, _, _ in series],
+            'income': [from_cents(income) for _, income, _ in series],
+            'expense': [from_cents(expense) for _, _, expense in series]
+        }
+    return result
+
+def _opening_balance(user_id, start):
+    """Баланс на начало периода в копейках: целые месяцы по MonthlyRollup, начало месяца по транзакциям"""
+    if start is None:
+        return literal(0)
+    balance = select(
+        sum_by_type('income', MonthlyRollup) - sum_by_type('expense', MonthlyRollup)
+    ).where(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.month < month_key(start)
+    ).scalar_subquery()
+    if start.day != 1:
+        balance = balance + select(
+            sum_by_type('income') - sum_by_type('expense')
+        ).where(
+            Transaction.user_id == user_id,
+            Transaction.date >= start.replace(day=1),
+            Transaction.date < start
+        ).scalar_subquery()
+    return balance
+
+def _cashflow_query(user_id, start, end, granularity):
+    """Приход, расход и баланс на конец каждого периода одним запросом.
+
+    Баланс — нарастающая сумма (оконная функция) поверх баланса на начало
+    периода; строки до начала периода не читаются. Периоды без
+    транзакций в ответ не попадают. Если транзакций в периоде нет,
+    возвращается одна строка с period = NULL и балансом на начало.
+    """
+    period = PERIOD_BUCKETS[granularity](Transaction.date).label('period')
+    flows = select(
+        period, sum_by_type('income').label('inflow'), sum_by_type('expense').label('outflow')
+    ).where(
+        Transaction.user_id == user_id,
+        *_date_range_filters(Transaction, start, end)
+    ).group_by(period).subquery()
+    opening = select(_opening_balance(user_id, start).label('opening')).subquery()
+
+    balance = opening.c.opening + func.sum(flows.c.inflow - flows.c.outflow).over(order_by=flows.c.period)
+    return select(
+        opening.c.opening, flows.c.period, flows.c.inflow, flows.c.outflow, balance.label('balance')
+    ).select_from(
+        opening.outerjoin(flows, true())
+    ).order_by(flows.c.period)
+
+def _cashflow_payload(granularity, rows):
+    """Ответ движения денег из результата _cashflow_query"""
+    opening = rows[0].opening if rows else 0
+    rows = [row for row in rows if row.period is not None]
+    return {
+        'granularity': granularity,
+        'opening_balance': from_cents(opening),
+        'closing_balance': from_cents(rows[-1].balance if rows else opening),
+        'periods': [row.period for row in rows],
+        'inflow': [from_cents(row.inflow) for row in rows],
+        'outflow': [from_cents(row.outflow) for row in rows],
+        'balance': [from_cents(row.balance) for row in rows]
+    }
+
+def _budgets_query(user_id):
+    """Бюджеты пользователя с названиями категорий и тратами текущего периода
+    (по индексу ux_budget_user_category_period)"""
+    return select(
+        Budget.id, Budget.category_id, Category.name.label('category'), Budget.period,
+        Budget.limit_cents, *budget_status_columns()
+    ).join(Category, Category.id == Budget.category_id).where(
+        Budget.user_id == user_id
+    ).order_by(Budget.category_id, Budget.period)
+
+def _budget_dict(row):
+    remaining = row.limit_cents - row.spent_cents
+    return {
+        'id': row.id,
+        'category_id': row.category_id,
+        'category': row.category,
+        'period': row.period,
+        'period_start': row.period_start,
+        'limit': from_cents(row.limit_cents),
+        'spent': from_cents(row.spent_cents),
+        'remaining': from_cents(remaining),
+        'exceeded': remaining < 0,
+    }
+
 # Главная панель (рендеринг)
 @dashboard_bp.route('/')
 def dashboard_home():
@@ -27,47 +378,70 @@ def stats_page():
 # API: получить данные для Dashboard
 @dashboard_bp.route('/data')
 @jwt_required()
+@_conditional
 def dashboard_data():
     user_id = get_jwt_identity()
-    
-    # Расчет баланса
-    income_sum = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == user_id, 
-        Transaction.type == 'income'
-    ).scalar() or 0
-    
-    expense_sum = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == user_id, 
-        Transaction.type == 'expense'
-    ).scalar() or 0
-    
-    balance = income_sum - expense_sum
-    
-    # Получение транзакций
-    transactions = Transaction.query.filter_by(user_id=user_id).order_by(Transaction.date.desc()).all()
-    categories = Category.query.filter_by(user_id=user_id).all()
-
-    transactions_list = [
-        {
-            'id': t.id,
-            'amount': t.amount,
-            'type': t.type,
-            'category': t.category.name if t.category else None,
-            'description': t.description,
-            'date': t.date.strftime('%Y-%m-%d %H:%M')
-        }
-        for t in transactions
-    ]
 
-    categories_list = [
-        {'id': c.id, 'name': c.name} for c in categories
-    ]
+    try:
+        columnar, fields = _listing_shape(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify({
-        'balance': balance,
-        'transactions': transactions_list,
-        'categories': categories_list
-    })
+    conn = db.session.connection()
+    totals, rows, categories = (conn.execute(query).all() for query in _dashboard_queries(user_id))
+    return jsonify(_dashboard_payload(totals, rows, categories, columnar, fields))
+
+# API: список транзакций с фильтрами и постраничной выдачей по курсору
+@dashboard_bp.route('/transactions_data')
+@jwt_required()
+def transactions_data():
+    user_id = get_jwt_identity()
+
+    try:
+        limit = _parse_page_size(request.args.get('limit'))
+        filters = _listing_filters(request.args)
+        columnar, fields = _listing_shape(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = db.session.connection().execute(_page_query(user_id, filters, limit)).all()
+    return jsonify(_listing_payload(rows, limit, columnar, fields))
+
+# API: полнотекстовый поиск по описаниям и категориям
+@dashboard_bp.route('/search')
+@jwt_required()
+@_conditional
+def search_transactions():
+    user_id = get_jwt_identity()
+
+    try:
+        limit = _parse_page_size(request.args.get('limit'))
+        columnar, fields = _listing_shape(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        page = int(request.args.get('page', 1))
+    except ValueError:
+        page = 0
+    if page < 1:
+        return jsonify({'error': 'Неверный номер страницы'}), 400
+
+    try:
+        query = search_query(user_id, request.args.get('q'), limit, (page - 1) * limit)
+    except ValueError:
+        return jsonify({'error': 'Пустой поисковый запрос'}), 400
+
+    rows = db.session.connection().execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    result = {
+        'transactions': _serialize_transactions(rows, columnar, fields),
+        'page': page,
+        'has_more': has_more
+    }
+    if columnar and 'category' in fields:
+        result['categories'] = category_names(rows)
+    return jsonify(result)
 
 # API: добавить транзакцию
 @dashboard_bp.route('/add_transaction', methods=['POST'])
@@ -77,20 +451,67 @@ def add_transaction():
     data = request.get_json()
     
     # Валидация данных
-    if not data.get('amount') or float(data['amount']) <= 0:
-        return jsonify({'error': 'Неверная сумма'}), 400
+    try:
+        fields = validate_transaction(data, user_id)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     
-    transaction = Transaction(
-        amount=float(data['amount']),
-        type=data['type'],
-        category_id=data.get('category_id'),
-        description=data.get('description', ''),
-        user_id=user_id
-    )
+    transaction = Transaction(user_id=user_id, **fields)
     db.session.add(transaction)
     db.session.commit()
     return jsonify({'message': 'Транзакция добавлена успешно'})
 
+# API: потоковая выгрузка транзакций (CSV или NDJSON)
+@dashboard_bp.route('/export')
+@jwt_required()
+def export_data():
+    user_id = get_jwt_identity()
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Поддерживаются форматы csv и ndjson'}), 400
+
+    try:
+        filters = _listing_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    compress = request.args.get('gzip') in ('1', 'true')
+    mimetype = EXPORT_FORMATS[export_format][1]
+    filename = f'transactions.{export_format}'
+    if compress:
+        mimetype, filename = 'application/gzip', filename + '.gz'
+
+    return Response(
+        stream_with_context(export_transactions(user_id, filters, export_format, compress)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+# API: импорт выписки (CSV или OFX)
+@dashboard_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_statement():
+    user_id = get_jwt_identity()
+    upload = request.files.get('file')
+    if not upload:
+        return jsonify({'error': 'Файл не загружен'}), 400
+
+    file_format = (request.form.get('format') or upload.filename.rsplit('.', 1)[-1]).lower()
+    if file_format not in READERS:
+        return jsonify({'error': 'Поддерживаются только файлы CSV и OFX'}), 400
+
+    try:
+        # Файл читается потоково, строка за строкой; неизвестная кодировка — LookupError
+        stream = io.TextIOWrapper(upload.stream, encoding=request.form.get('encoding', 'utf-8-sig'), newline='')
+        report = import_transactions(user_id, READERS[file_format](stream))
+        db.session.commit()
+    except (UnicodeDecodeError, LookupError, csv.Error):
+        db.session.rollback()
+        return jsonify({'error': 'Не удалось прочитать файл'}), 400
+
+    return jsonify(report)
+
 # API: редактировать транзакцию
 @dashboard_bp.route('/edit_transaction/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -99,13 +520,18 @@ def edit_transaction(id):
     transaction = Transaction.query.filter_by(id=id, user_id=user_id).first_or_404()
     data = request.get_json()
     
-    if 'amount' in data and float(data['amount']) <= 0:
-        return jsonify({'error': 'Неверная сумма'}), 400
+    try:
+        if 'amount' in data:
+            transaction.amount_cents = parse_amount(data['amount'])
+        if 'type' in data:
+            transaction.type = parse_transaction_type(data['type'])
+        if 'category_id' in data:
+            transaction.category_id = parse_category_id(data['category_id'], user_id)
+        if 'description' in data:
+            transaction.description = parse_description(data['description'])
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
         
-    transaction.amount = float(data.get('amount', transaction.amount))
-    transaction.type = data.get('type', transaction.type)
-    transaction.category_id = data.get('category_id', transaction.category_id)
-    transaction.description = data.get('description', transaction.description)
     db.session.commit()
     return jsonify({'message': 'Транзакция обновлена успешно'})
 
@@ -155,42 +581,104 @@ def delete_category(id):
     db.session.commit()
     return jsonify({'message': 'Категория удалена успешно'})
 
+# API: состояние всех бюджетов пользователя
+@dashboard_bp.route('/budgets')
+@jwt_required()
+def budgets():
+    user_id = get_jwt_identity()
+    rows = db.session.connection().execute(_budgets_query(user_id)).all()
+    return jsonify({'budgets': [_budget_dict(row) for row in rows]})
+
+# API: добавить бюджет
+@dashboard_bp.route('/add_budget', methods=['POST'])
+@jwt_required()
+def add_budget():
+    user_id = get_jwt_identity()
+    data = request.get_json()
+
+    category = Category.query.filter_by(id=data.get('category_id'), user_id=user_id).first()
+    if category is None:
+        return jsonify({'error': 'Категория не найдена'}), 400
+    period = data.get('period', 'month')
+    if period not in BUDGET_PERIODS:
+        return jsonify({'error': 'Неверный период бюджета, допустимо: week, month'}), 400
+    try:
+        limit_cents = parse_amount(data.get('limit'))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if Budget.query.filter_by(user_id=user_id, category_id=category.id, period=period).first():
+        return jsonify({'error': 'Бюджет для этой категории и периода уже существует'}), 400
+
+    budget = Budget(user_id=user_id, category_id=category.id, period=period, limit_cents=limit_cents)
+    db.session.add(budget)
+    db.session.flush()
+    # Траты текущего периода до появления бюджета
+    rebuild_budgets(db.session.connection(), user_id, stale_only=True)
+    db.session.commit()
+    return jsonify({'message': 'Бюджет добавлен успешно', 'id': budget.id})
+
+# API: изменить лимит бюджета
+@dashboard_bp.route('/edit_budget/<int:id>', methods=['PUT'])
+@jwt_required()
+def edit_budget(id):
+    user_id = get_jwt_identity()
+    budget = Budget.query.filter_by(id=id, user_id=user_id).first_or_404()
+    data = request.get_json()
+
+    try:
+        budget.limit_cents = parse_amount(data.get('limit'))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.commit()
+    return jsonify({'message': 'Бюджет обновлён успешно'})
+
+# API: удалить бюджет
+@dashboard_bp.route('/delete_budget/<int:id>', methods=['DELETE'])
+@jwt_required()
+def delete_budget(id):
+    user_id = get_jwt_identity()
+    budget = Budget.query.filter_by(id=id, user_id=user_id).first_or_404()
+    db.session.delete(budget)
+    db.session.commit()
+    return jsonify({'message': 'Бюджет удалён успешно'})
+
 # API: статистика по категориям
 @dashboard_bp.route('/stats_data')
 @jwt_required()
+@_conditional
 def dashboard_stats():
     user_id = get_jwt_identity()
-    categories = Category.query.filter_by(user_id=user_id).all()
-    
-    labels = [c.name for c in categories]
-    income = []
-    expense = []
-    
-    for category in categories:
-        category_income = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id, 
-            Transaction.category_id == category.id, 
-            Transaction.type == 'income'
-        ).scalar() or 0
-        
-        category_expense = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id, 
-            Transaction.category_id == category.id, 
-            Transaction.type == 'expense'
-        ).scalar() or 0
-        
-        income.append(float(category_income))
-        expense.append(float(category_expense))
-    
-    return jsonify({
-        'labels': labels, 
-        'income': income, 
-        'expense': expense
-    })
+
+    try:
+        start, end, granularity = _stats_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    conn = db.session.connection()
+    results = [conn.execute(query).all() for query in _stats_queries(user_id, start, end, granularity)]
+    return jsonify(_stats_payload(granularity, *results))
+
+# API: движение денег и баланс по периодам
+@dashboard_bp.route('/cashflow')
+@jwt_required()
+@_conditional
+def cashflow():
+    user_id = get_jwt_identity()
+
+    try:
+        start, end, granularity = _stats_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    granularity = granularity or 'day'
+
+    rows = db.session.connection().execute(_cashflow_query(user_id, start, end, granularity)).all()
+    return jsonify(_cashflow_payload(granularity, rows))
 
 # API: детали пользователя
 @dashboard_bp.route('/profile')
 @jwt_required()
+@_conditional
 def profile():
     user_id = get_jwt_identity()
     user = User.query.get_or_404(user_id)
@@ -0,0 +1,124 @@
+# schema.py
+"""Создание и миграция схемы БД.
+
+Версия схемы хранится в ``PRAGMA user_version`` файла SQLite. Новая БД
+создаётся сразу в актуальном виде через ``db.create_all()`` и помечается
+последней версией; для существующего файла (например, старого
+``instance/finance.db``) по порядку применяются недостающие шаги из
+``MIGRATIONS``, после чего создаются недостающие таблицы и индексы, а
+производные агрегаты пересчитываются по таблице транзакций.
+
+Шаги меняют только то, что не умеет ``create_all`` (колонки и данные
+существующих таблиц), и должны быть идемпотентны.
+"""
+from sqlalchemy import inspect, text
+from . import db
+from .aggregates import rebuild_user_totals, rebuild_monthly_rollup, rebuild_budgets, bump_rebuilt_data_versions
+from .models import UserTotals, MonthlyRollup
+from .search import create_search_index, rebuild_search_index
+
+
+def _create_missing_indexes(conn):
+    """Создаёт индексы моделей, отсутствующие в существующих таблицах"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _rebuild_aggregates(conn):
+    """Пересчитывает производные агрегаты по таблице транзакций"""
+    rebuild_user_totals(conn)
+    rebuild_monthly_rollup(conn)
+    rebuild_budgets(conn)
+    bump_rebuilt_data_versions(conn)
+
+
+def _derived_only(conn):
+    """Версия добавила только индексы или производные таблицы: их создаёт upgrade_schema"""
+
+
+def _amounts_to_cents(conn):
+    """Переводит Transaction.amount (REAL, рубли) в amount_cents (INTEGER, копейки)"""
+    columns = {column['name'] for column in inspect(conn).get_columns('transaction')}
+    if 'amount_cents' in columns:
+        return
+
+    # SQLite не меняет тип колонки: пересоздаём таблицу и копируем данные
+    for index in inspect(conn).get_indexes('transaction'):
+        conn.execute(text(f'DROP INDEX "{index["name"]}"'))
+    conn.execute(text('ALTER TABLE "transaction" RENAME TO transaction_old'))
+    db.metadata.tables['transaction'].create(conn)
+    conn.execute(text(
+        'INSERT INTO "transaction" (id, amount_cents, type, category_id, description, date, user_id) '
+        'SELECT id, CAST(ROUND(amount * 100) AS INTEGER), type, category_id, description, date, user_id '
+        'FROM transaction_old'
+    ))
+    conn.execute(text('DROP TABLE transaction_old'))
+
+    # Агрегаты в рублях пересоздаются в копейках и пересчитываются
+    UserTotals.__table__.drop(conn, checkfirst=True)
+    MonthlyRollup.__table__.drop(conn, checkfirst=True)
+
+
+def _add_import_hash(conn):
+    """Добавляет Transaction.import_hash для дедупликации импорта"""
+    columns = {column['name'] for column in inspect(conn).get_columns('transaction')}
+    if 'import_hash' not in columns:
+        conn.execute(text('ALTER TABLE "transaction" ADD COLUMN import_hash VARCHAR(64)'))
+
+
+def _add_user_data_version(conn):
+    """Добавляет User.data_version для условных GET-запросов"""
+    columns = {column['name'] for column in inspect(conn).get_columns('user')}
+    if 'data_version' not in columns:
+        conn.execute(text('ALTER TABLE "user" ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0'))
+
+
+def _add_transaction_search(conn):
+    """Создаёт индекс полнотекстового поиска FTS5 и заполняет его существующими транзакциями"""
+    create_search_index(conn)
+    rebuild_search_index(conn)
+
+
+# Шаги миграции: i-й элемент переводит схему из версии i в версию i + 1
+MIGRATIONS = [
+    _derived_only,       # 1: индексы транзакций и категорий
+    _derived_only,       # 2: user_totals
+    _derived_only,       # 3: monthly_rollup
+    _amounts_to_cents,   # 4: суммы в копейках
+    _add_import_hash,    # 5: хеш импортированных строк
+    _add_user_data_version,  # 6: версия данных пользователя
+    _add_transaction_search,  # 7: полнотекстовый поиск по описаниям
+    _derived_only,       # 8: бюджеты по категориям
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    return conn.execute(text('PRAGMA user_version')).scalar()
+
+
+def _set_schema_version(conn, version):
+    # PRAGMA не поддерживает параметры, значение всегда int
+    conn.execute(text(f'PRAGMA user_version = {int(version)}'))
+
+
+def upgrade_schema():
+    """Доводит схему БД до актуальной версии"""
+    with db.engine.begin() as conn:
+        if not inspect(conn).has_table('user'):
+            db.metadata.create_all(conn)
+            _set_schema_version(conn, SCHEMA_VERSION)
+            return
+
+        version = get_schema_version(conn)
+        pending = MIGRATIONS[version:]
+        for step_version, step in enumerate(pending, start=version):
+            step(conn)
+            _set_schema_version(conn, step_version + 1)
+
+        db.metadata.create_all(conn)
+        _create_missing_indexes(conn)
+        if pending:
+            _rebuild_aggregates(conn)
@@ -0,0 +1,100 @@
+# search.py
+"""Полнотекстовый поиск транзакций по описанию и названию категории.
+
+Виртуальная таблица FTS5 ``transaction_fts`` хранит для каждой
+транзакции (rowid = Transaction.id) описание, название категории и
+токен владельца ``u<user_id>``. Её синхронизируют триггеры SQLite на
+вставку, изменение и удаление транзакций и на переименование категорий,
+поэтому поиск видит любую запись, в том числе импорт и пакетные
+операции, в той же транзакции БД.
+
+Ограничение по владельцу — часть выражения MATCH: FTS5 пересекает
+списки документов токена пользователя и слов запроса, не читая чужие
+совпадения, и сортирует по bm25 (описание весит больше категории).
+"""
+import re
+from sqlalchemy import DDL, column, event, select, table, text
+from .models import Transaction
+from .queries import transaction_rows_query
+
+FTS_TABLE = 'transaction_fts'
+
+_fts = table(FTS_TABLE, column('rowid'), column('rank'))
+
+_SEARCH_DDL = [
+    # prefix: индексы префиксов из 2 и 3 символов для поиска по началу слова
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "description, category, owner, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    # Вес колонок в bm25: описание, категория, владелец
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 5.0, 0.0)')",
+    f'''CREATE TRIGGER IF NOT EXISTS transaction_fts_insert AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, description, category, owner) VALUES (
+            new.id, new.description, (SELECT name FROM category WHERE id = new.category_id), 'u' || new.user_id
+        );
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS transaction_fts_update
+    AFTER UPDATE OF description, category_id, user_id ON "transaction" BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE} (rowid, description, category, owner) VALUES (
+            new.id, new.description, (SELECT name FROM category WHERE id = new.category_id), 'u' || new.user_id
+        );
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS transaction_fts_delete AFTER DELETE ON "transaction" BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS category_fts_rename AFTER UPDATE OF name ON category BEGIN
+        UPDATE {FTS_TABLE} SET category = new.name
+        WHERE rowid IN (SELECT id FROM "transaction" WHERE category_id = new.id);
+    END''',
+]
+
+_WORD = re.compile(r'\w+')
+
+
+def create_search_index(conn):
+    """Создаёт таблицу FTS5 и триггеры, если их нет"""
+    for statement in _SEARCH_DDL:
+        conn.execute(text(statement))
+
+
+def rebuild_search_index(conn):
+    """Заполняет индекс поиска заново по таблицам транзакций и категорий"""
+    conn.execute(text(f'DELETE FROM {FTS_TABLE}'))
+    conn.execute(text(
+        f'INSERT INTO {FTS_TABLE} (rowid, description, category, owner) '
+        'SELECT t.id, t.description, c.name, \'u\' || t.user_id '
+        'FROM "transaction" t LEFT JOIN category c ON c.id = t.category_id'
+    ))
+
+
+# Новая БД (create_all) получает индекс вместе с таблицей транзакций
+for _statement in _SEARCH_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(_statement))
+
+
+def match_expression(user_id, query):
+    """Строка поиска -> выражение FTS5 MATCH; ValueError, если в строке нет слов.
+
+    Каждое слово ищется по началу (prefix) в описании и категории, все
+    слова должны встретиться; кавычки и операторы FTS5 во вводе игнорируются.
+    """
+    words = _WORD.findall(query or '')
+    if not words:
+        raise ValueError('empty query')
+    terms = ' AND '.join(f'{{description category}} : "{word}"*' for word in words)
+    return f'owner : "u{int(user_id)}" AND ({terms})'
+
+
+def search_query(user_id, query, limit, offset=0):
+    """SELECT транзакций пользователя, подходящих под запрос, по убыванию релевантности.
+
+    Колонки как у transaction_rows_query; выбирается limit + 1 строк —
+    лишняя строка означает, что есть следующая страница.
+    """
+    matches = select(_fts.c.rowid.label('id'), _fts.c.rank).where(
+        text(f'{FTS_TABLE} MATCH :match').bindparams(match=match_expression(user_id, query))
+    ).order_by(_fts.c.rank).limit(limit + 1).offset(offset).subquery()
+
+    return transaction_rows_query(user_id).join(
+        matches, matches.c.id == Transaction.id
+    ).order_by(None).order_by(matches.c.rank, Transaction.id.desc())
@@ -0,0 +1,29 @@
+// Условные GET-запросы к API дашборда.
+// Тело ответа с ETag сохраняется в sessionStorage; повторный запрос того же
+// адреса отправляет If-None-Match, и при 304 сервер не пересчитывает данные,
+// а страница получает сохранённое тело как обычный ответ 200.
+async function conditionalFetch(url, options = {}) {
+    const key = `etag:${url}`;
+    const cached = JSON.parse(sessionStorage.getItem(key) || 'null');
+    const headers = { ...(options.headers || {}) };
+    if (cached) headers['If-None-Match'] = cached.etag;
+
+    const response = await fetch(url, { ...options, headers });
+    if (response.status === 304 && cached) {
+        return new Response(cached.body, {
+            status: 200,
+            headers: { 'Content-Type': 'application/json', 'ETag': cached.etag }
+        });
+    }
+
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        try {
+            sessionStorage.setItem(key, JSON.stringify({ etag, body: await response.clone().text() }));
+        } catch (e) {
+            // Хранилище переполнено: просто не кэшируем
+            sessionStorage.removeItem(key);
+        }
+    }
+    return response;
+}
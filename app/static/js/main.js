@@ -2,7 +2,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const token = localStorage.getItem('token');
 
     async function loadDashboard() {
-        const response = await fetch('/dashboard/data', {
+        const response = await conditionalFetch('/dashboard/data', {
             headers: { 'Authorization': `Bearer ${token}` }
         });
         if (!response.ok) { alert('Ошибка загрузки данных'); return; }
@@ -0,0 +1,87 @@
+# validation.py
+"""Общие правила проверки входных данных транзакций.
+
+Используются одиночными маршрутами (add_transaction, edit_transaction),
+импортом выписок и пакетными операциями, чтобы все пути записи
+принимали одни и те же данные.
+"""
+from . import db
+from .models import Category, Transaction
+from .money import to_cents, MAX_AMOUNT_CENTS
+
+TRANSACTION_TYPES = ('income', 'expense')
+
+
+class ValidationError(ValueError):
+    """Неверные входные данные; текст ошибки возвращается клиенту"""
+
+
+def parse_amount(value):
+    """Сумма транзакции -> копейки; сумма должна быть положительной и не больше MAX_AMOUNT_CENTS"""
+    try:
+        cents = to_cents(value)
+    except ValueError:
+        raise ValidationError('Неверная сумма')
+    if not 0 < cents <= MAX_AMOUNT_CENTS:
+        raise ValidationError('Неверная сумма')
+    return cents
+
+
+def parse_transaction_type(value):
+    if value not in TRANSACTION_TYPES:
+        raise ValidationError('Неверный тип транзакции')
+    return value
+
+
+def parse_description(value):
+    """Описание транзакции: строка без пробелов по краям, не длиннее колонки; None -> пустая строка"""
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ValidationError('Неверное описание')
+    value = value.strip()
+    if len(value) > Transaction.description.type.length:
+        raise ValidationError('Слишком длинное описание')
+    return value
+
+
+def parse_id(value, message):
+    """Идентификатор записи из запроса: целое число (не bool) или строка из цифр (значение
+    поля формы), иначе ValidationError(message)"""
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValidationError(message)
+    return value
+
+
+def parse_category_id(value, user_id, categories=None):
+    """category_id транзакции -> id категории пользователя или None для пустого значения.
+
+    ``categories`` — уже загруженные id категорий пользователя; без них
+    принадлежность проверяется запросом по первичному ключу.
+    """
+    if value is None or value == '' or value == 0:
+        return None
+    category_id = parse_id(value, 'Категория не найдена')
+    if categories is None:
+        # Проверка не должна сбрасывать в БД уже изменённые поля транзакции: их запишет один flush при коммите
+        with db.session.no_autoflush:
+            found = db.session.execute(db.select(Category.id).where(
+                Category.id == category_id, Category.user_id == user_id
+            )).scalar()
+    else:
+        found = category_id in categories
+    if not found:
+        raise ValidationError('Категория не найдена')
+    return category_id
+
+
+def validate_transaction(data, user_id, categories=None):
+    """Поля новой транзакции пользователя из словаря запроса (amount, type, category_id, description)"""
+    return {
+        'amount_cents': parse_amount(data.get('amount')),
+        'type': parse_transaction_type(data.get('type')),
+        'category_id': parse_category_id(data.get('category_id'), user_id, categories),
+        'description': parse_description(data.get('description')),
+    }
@@ -0,0 +1,14 @@
+"""Микробенчмарки эндпоинтов дашборда и входа.
+
+Синтетический набор данных генерируется детерминированно (одинаковые
+параметры и ``seed`` дают одинаковую БД) в отдельный файл SQLite::
+
+    python -m benchmarks generate bench.db --transactions 1M --users 100
+    python -m benchmarks run bench.db --save baseline.json
+    python -m benchmarks run bench.db --baseline baseline.json
+
+``run`` измеряет эндпоинты целиком, а также отдельно их SQL-запросы и
+сериализацию ответа; результат — перцентили времени в миллисекундах.
+С ``--baseline`` медианы сравниваются с сохранёнными, и при замедлении
+больше допуска команда завершается с кодом 1.
+"""
@@ -0,0 +1,68 @@
+"""python -m benchmarks generate|run (см. benchmarks/__init__.py)"""
+import argparse
+import sys
+from .dataset import generate, parse_scale
+from .runner import DEFAULT_TOLERANCE, compare, load_report, run, save_report
+
+
+def _generate(args):
+    info = generate(args.path, transactions=args.transactions, users=args.users,
+                    categories=args.categories, seed=args.seed)
+    print(f"{args.path}: {info['transactions']} транзакций, {info['users']} пользователей")
+    return 0
+
+
+def _run(args):
+    report = run(args.path, repeat=args.repeat, warmup=args.warmup, only=args.only)
+    dataset = report['dataset']
+    print(f"{dataset['transactions']} транзакций, {dataset['users']} пользователей, {report['repeat']} повторов")
+    print(f"{'случай':<34}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (мс)")
+    for name, stats in report['results'].items():
+        print(f"{name:<34}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['p99']:>10.2f}{stats['max']:>10.2f}")
+
+    if args.save:
+        save_report(report, args.save)
+
+    if args.baseline:
+        baseline = load_report(args.baseline)
+        if baseline['dataset'] != dataset:
+            print(f"Внимание: базовая линия снята на другом наборе данных: {baseline['dataset']}")
+        regressions = compare(report, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f'РЕГРЕССИЯ {name}: p50 {before:.2f} -> {after:.2f} мс')
+        if regressions:
+            return 1
+        print('Регрессий нет')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Микробенчмарки приложения')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('generate', help='Создать синтетическую БД')
+    gen.add_argument('path', help='Файл SQLite (новый)')
+    gen.add_argument('--transactions', type=parse_scale, default=parse_scale('10k'),
+                     help='Число транзакций: 1000, 10k, 1M... (по умолчанию 10k)')
+    gen.add_argument('--users', type=int, default=10)
+    gen.add_argument('--categories', type=int, default=8, help='Категорий на пользователя (до 12)')
+    gen.add_argument('--seed', type=int, default=0)
+    gen.set_defaults(handler=_generate)
+
+    bench = commands.add_parser('run', help='Выполнить замеры')
+    bench.add_argument('path', help='БД, созданная generate')
+    bench.add_argument('--repeat', type=int, default=50)
+    bench.add_argument('--warmup', type=int, default=5)
+    bench.add_argument('--only', action='append', help='Только случаи с этим префиксом (можно несколько раз)')
+    bench.add_argument('--save', help='Сохранить отчёт в JSON (базовая линия)')
+    bench.add_argument('--baseline', help='Сравнить с сохранённым отчётом')
+    bench.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                       help='Допустимый рост медианы, доля (по умолчанию 0.2)')
+    bench.set_defaults(handler=_run)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# dataset.py
+"""Генератор синтетических пользователей, категорий и транзакций.
+
+Строки вставляются пачками через Core (executemany) без ORM и без
+хука агрегатов; ``UserTotals`` и ``MonthlyRollup`` затем пересчитываются
+целиком, как после миграции.
+"""
+import random
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+from app import create_app, db, bcrypt
+from app.aggregates import rebuild_user_totals, rebuild_monthly_rollup
+from app.config import Config, ProductionConfig
+from app.models import User, Category, Transaction
+
+PASSWORD = 'benchmark'
+CATEGORY_NAMES = ('Продукты', 'Транспорт', 'Жильё', 'Связь', 'Здоровье', 'Развлечения',
+                  'Одежда', 'Образование', 'Подарки', 'Зарплата', 'Фриланс', 'Прочее')
+DESCRIPTIONS = ('Магазин', 'Кафе', 'Такси', 'Аптека', 'Перевод', 'Подписка', 'Аренда', None)
+# Транзакции распределяются по двум годам до этой даты
+END_DATE = datetime(2025, 1, 1)
+PERIOD = timedelta(days=730)
+
+_SCALE = re.compile(r'^(\d+(?:\.\d+)?)([kKmM]?)$')
+
+
+def parse_scale(value):
+    """'1000', '10k', '1.5M' -> число строк; ValueError при неверном формате"""
+    match = _SCALE.match(value.strip())
+    if not match:
+        raise ValueError(f'invalid scale: {value}')
+    number, suffix = match.groups()
+    return int(float(number) * {'': 1, 'k': 10 ** 3, 'm': 10 ** 6}[suffix.lower()])
+
+
+def user_email(n):
+    return f'user{n}@bench.local'
+
+
+def bench_app(path, config=None):
+    """Приложение на файле БД бенчмарка: production-настройки SQLite, кэш ответов выключен.
+
+    config — дополнительные настройки; generate и run должны получать
+    одинаковый BCRYPT_LOG_ROUNDS, иначе вход пересчитывает хеш.
+    """
+    return create_app('testing', {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'AUTO_UPGRADE_SCHEMA': True,
+        'SQLITE_PRAGMAS': ProductionConfig.SQLITE_PRAGMAS,
+        'BCRYPT_LOG_ROUNDS': Config.BCRYPT_LOG_ROUNDS,
+        'RESPONSE_CACHE_BACKEND': 'null',
+        **(config or {}),
+    })
+
+
+def _transaction_rows(rng, count, users, categories, batch_size):
+    """Пачки строк транзакций; пользователи по кругу, категории пользователя случайно"""
+    batch = []
+    period = int(PERIOD.total_seconds())
+    for n in range(count):
+        user_id = n % users + 1
+        income = rng.random() < 0.2
+        user_categories = categories[user_id]
+        batch.append({
+            'user_id': user_id,
+            'type': 'income' if income else 'expense',
+            'amount_cents': rng.randint(10000, 30000000) if income else rng.randint(100, 2000000),
+            'category_id': rng.choice(user_categories) if user_categories and rng.random() < 0.95 else None,
+            'description': rng.choice(DESCRIPTIONS),
+            'date': END_DATE - timedelta(seconds=rng.randrange(period)),
+        })
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(path, transactions=10_000, users=10, categories=8, seed=0, batch_size=10_000, config=None):
+    """Создаёт БД бенчмарка в файле path (существующий файл должен быть пустым или отсутствовать).
+
+    Возвращает описание набора данных для отчёта.
+    """
+    rng = random.Random(seed)
+    app = bench_app(path, config)
+    with app.app_context():
+        password = bcrypt.generate_password_hash(PASSWORD).decode('utf-8')
+        with db.engine.begin() as conn:
+            # Генерация — одноразовая запись: журнал и fsync не нужны
+            conn.execute(text('PRAGMA synchronous = OFF'))
+            if conn.execute(text('SELECT count(*) FROM user')).scalar():
+                raise RuntimeError(f'{path} already contains data')
+
+            conn.execute(insert(User), [
+                {'id': n, 'username': f'user{n}', 'email': user_email(n), 'password': password, 'role': 'user'}
+                for n in range(1, users + 1)
+            ])
+
+            names = CATEGORY_NAMES[:categories]
+            category_ids = {}
+            rows = []
+            for user_id in range(1, users + 1):
+                category_ids[user_id] = []
+                for name in names:
+                    rows.append({'id': len(rows) + 1, 'user_id': user_id, 'name': name})
+                    category_ids[user_id].append(len(rows))
+            if rows:
+                conn.execute(insert(Category), rows)
+
+            for batch in _transaction_rows(rng, transactions, users, category_ids, batch_size):
+                conn.execute(insert(Transaction), batch)
+
+            rebuild_user_totals(conn)
+            rebuild_monthly_rollup(conn)
+        db.engine.dispose()
+
+    return {'transactions': transactions, 'users': users, 'categories': categories, 'seed': seed}
@@ -0,0 +1,149 @@
+# runner.py
+"""Замеры: эндпоинты целиком, их SQL-запросы и сериализация по отдельности.
+
+Каждый случай сначала выполняется ``warmup`` раз без замера (прогрев
+кэша страниц SQLite и интерпретатора), затем ``repeat`` раз с замером
+``time.perf_counter``.
+"""
+import json
+import statistics
+import time
+from sqlalchemy import func, select
+from app import db
+from app.models import Transaction, User
+from app.routes.dashboard_routes import (
+    PAGE_SIZE, _dashboard_queries, _dashboard_payload, _stats_queries, _stats_payload
+)
+from app.queries import TRANSACTION_FIELDS
+from .dataset import PASSWORD, bench_app, user_email
+
+# Допустимое замедление медианы относительно базовой линии
+DEFAULT_TOLERANCE = 0.2
+
+
+def summarize(samples):
+    """Секунды -> статистика в миллисекундах"""
+    ms = sorted(sample * 1000 for sample in samples)
+    if len(ms) > 1:
+        percentiles = statistics.quantiles(ms, n=100, method='inclusive')
+        p95, p99 = percentiles[94], percentiles[98]
+    else:
+        p95 = p99 = ms[0]
+    return {
+        'count': len(ms),
+        'min': ms[0],
+        'mean': statistics.fmean(ms),
+        'p50': statistics.median(ms),
+        'p95': p95,
+        'p99': p99,
+        'max': ms[-1],
+    }
+
+
+def measure(fn, repeat=50, warmup=5):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def _execute(queries):
+    conn = db.session.connection()
+    return [conn.execute(query).all() for query in queries]
+
+
+def _cases(app, client, user_id, headers):
+    """Имя случая -> функция без аргументов"""
+    credentials = {'email': user_email(user_id), 'password': PASSWORD}
+    user_transactions = db.session.scalar(
+        select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id)
+    )
+
+    def get(url, rows=None):
+        """rows — ожидаемое число транзакций в ответе: неверный параметр не исказит замер молча"""
+        def request():
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, response.status_code
+            if rows is not None:
+                returned = len(response.get_json()['transactions'])
+                assert returned == rows, f'{url}: {returned} rows, expected {rows}'
+        return request
+
+    def login():
+        assert client.post('/auth/login', json=credentials).status_code == 200
+
+    dashboard_results = _execute(_dashboard_queries(user_id))
+    stats_results = _execute(_stats_queries(user_id, None, None, 'month'))
+
+    return {
+        'endpoint.dashboard_data': get('/dashboard/data', rows=min(PAGE_SIZE, user_transactions)),
+        'endpoint.transactions_data': get('/dashboard/transactions_data?limit=500',
+                                          rows=min(500, user_transactions)),
+        'endpoint.dashboard_stats': get('/dashboard/stats_data'),
+        'endpoint.dashboard_stats_monthly': get('/dashboard/stats_data?granularity=month'),
+        'endpoint.login': login,
+        'query.dashboard': lambda: _execute(_dashboard_queries(user_id)),
+        'query.stats_monthly': lambda: _execute(_stats_queries(user_id, None, None, 'month')),
+        'serialize.dashboard': lambda: app.json.dumps(
+            _dashboard_payload(*dashboard_results, False, TRANSACTION_FIELDS)
+        ),
+        'serialize.stats_monthly': lambda: app.json.dumps(_stats_payload('month', *stats_results)),
+    }
+
+
+def run(path, repeat=50, warmup=5, only=None, config=None):
+    """Выполняет случаи на БД path; only — префиксы имён случаев.
+
+    Все запросы идут от пользователя с наибольшим числом транзакций.
+    """
+    app = bench_app(path, config)
+    client = app.test_client()
+    with app.app_context():
+        transactions = db.session.scalar(select(func.count()).select_from(Transaction))
+        users = db.session.scalar(select(func.count()).select_from(User))
+        user_id = db.session.scalar(
+            select(Transaction.user_id).group_by(Transaction.user_id).order_by(func.count().desc()).limit(1)
+        )
+        if user_id is None:
+            raise RuntimeError(f'{path} has no transactions, run "generate" first')
+
+        token = client.post('/auth/login', json={'email': user_email(user_id), 'password': PASSWORD}).get_json()['token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        results = {}
+        for name, fn in _cases(app, client, user_id, headers).items():
+            if only and not name.startswith(tuple(only)):
+                continue
+            results[name] = measure(fn, repeat, warmup)
+        db.session.remove()
+        db.engine.dispose()
+
+    return {
+        'dataset': {'transactions': transactions, 'users': users},
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Случаи, медиана которых выросла больше чем на tolerance: [(имя, было, стало), ...]"""
+    regressions = []
+    for name, stats in report['results'].items():
+        base = baseline['results'].get(name)
+        if base and stats['p50'] > base['p50'] * (1 + tolerance):
+            regressions.append((name, base['p50'], stats['p50']))
+    return regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
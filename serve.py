@@ -0,0 +1,39 @@
+"""Продакшен-запуск: pre-fork сервер с несколькими рабочими процессами.
+
+    FINANCE_SECRET_KEY=... FINANCE_JWT_SECRET_KEY=... python serve.py --bind 0.0.0.0:8000 --workers 4
+
+Плавная перезагрузка: kill -HUP <pid главного процесса>.
+"""
+import argparse
+import logging
+import os
+from app import create_app
+from app.prefork import PreforkServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-fork сервер приложения')
+    parser.add_argument('--bind', default='127.0.0.1:8000', help='Адрес host:port (по умолчанию 127.0.0.1:8000)')
+    parser.add_argument('--workers', type=int, default=None, help='Число рабочих процессов (по умолчанию — по числу ядер)')
+    parser.add_argument('--max-requests', type=int, default=1000,
+                        help='Перезапуск рабочего процесса после N запросов (0 — не перезапускать)')
+    parser.add_argument('--graceful-timeout', type=float, default=30,
+                        help='Сколько секунд ждать завершения запросов при остановке')
+    args = parser.parse_args()
+
+    host, _, port = args.bind.rpartition(':')
+    os.environ.setdefault('FINANCE_CONFIG', 'production')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(message)s')
+
+    PreforkServer(
+        create_app,
+        host=host.strip('[]') or '127.0.0.1',
+        port=int(port),
+        workers=args.workers,
+        max_requests=args.max_requests,
+        graceful_timeout=args.graceful_timeout,
+    ).run()
+
+
+if __name__ == '__main__':
+    main()
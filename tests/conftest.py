@@ -1,31 +1,70 @@
 import pytest
-import os
-import tempfile
-from app import create_app, db, bcrypt
-from app.models import User, Category, Transaction
+from flask.globals import app_ctx, request_ctx
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+from app import create_app, db
+from app.schema import upgrade_schema
+
+
+def _enable_savepoints(engine):
+    """pysqlite сам открывает транзакции и ломает SAVEPOINT: BEGIN выдаём явно"""
+    @event.listens_for(engine, 'connect')
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+
+def _session_scope():
+    if request_ctx:
+        return id(request_ctx._get_current_object())
+    return id(app_ctx._get_current_object())
+
+
+@pytest.fixture(scope='session')
+def schema():
+    """Схема в общей in-memory БД, один раз на запуск тестов"""
+    app = create_app('testing')
+    with app.app_context():
+        # БД в памяти живёт, пока открыто хотя бы одно соединение
+        keeper = db.engine.connect()
+        upgrade_schema()
+    yield
+    keeper.close()
+
 
 @pytest.fixture(scope='function')
-def app():
-    """Создание приложения для тестирования"""
-    # Создаем временную базу данных
-    db_fd, db_path = tempfile.mkstemp()
-    
-    app = create_app()
-    
-    # Конфигурация для тестирования
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
-    app.config['JWT_SECRET_KEY'] = 'test-jwt-secret-key'
-    app.config['SECRET_KEY'] = 'test-secret-key'
-    app.config['WTF_CSRF_ENABLED'] = False
-    
+def app(schema):
+    """Создание приложения для тестирования.
+
+    Тест выполняется в транзакции, которая откатывается в конце; коммиты
+    приложения освобождают только SAVEPOINT внутри неё.
+    """
+    app = create_app('testing')
+
     with app.app_context():
-        db.create_all()
-        yield app
-        db.drop_all()
-    
-    os.close(db_fd)
-    os.unlink(db_path)
+        _enable_savepoints(db.engine)
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        app_session = db.session
+        # Все сессии — на соединении теста. Запрос тестового клиента
+        # выполняется в уже открытом контексте приложения, поэтому сессия
+        # у него своя и закрывается в конце запроса
+        db.session = scoped_session(
+            sessionmaker(bind=connection, join_transaction_mode='create_savepoint'),
+            scopefunc=_session_scope
+        )
+        app.teardown_request(lambda exc: db.session.remove())
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.session = app_session
+            transaction.rollback()
+            connection.close()
+            db.engine.dispose()
 
 @pytest.fixture
 def client(app):
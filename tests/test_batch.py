@@ -0,0 +1,222 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import Category, Transaction, User, UserTotals
+
+
+class TestBatch:
+    """Тесты пакетных операций - TC-BATCH-001 до TC-BATCH-006"""
+
+    def _user_id(self):
+        return db.session.query(User).filter_by(email='test@example.com').first().id
+
+    def test_TC_BATCH_001_mixed_operations(self, client, app, auth_token, auth_headers):
+        """TC-BATCH-001: Создание, изменение и удаление в одном пакете с результатами по операциям"""
+        with app.app_context():
+            user_id = self._user_id()
+            category = Category(name='Food', user_id=user_id)
+            old = Transaction(amount=10.0, type='expense', user_id=user_id)
+            db.session.add_all([category, old])
+            db.session.commit()
+            category_id, old_id = category.id, old.id
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'create', 'entity': 'category', 'data': {'name': 'Travel'}},
+            {'op': 'create', 'entity': 'transaction',
+             'data': {'amount': 100.5, 'type': 'income', 'category_id': category_id}},
+            {'op': 'update', 'entity': 'transaction', 'id': old_id,
+             'data': {'amount': 25, 'category_id': category_id}},
+        ]}, headers=auth_headers(auth_token))
+
+        assert response.status_code == 200
+        results = response.get_json()['results']
+        assert [r['index'] for r in results] == [0, 1, 2]
+        assert results[2]['id'] == old_id
+
+        with app.app_context():
+            assert db.session.get(Category, results[0]['id']).name == 'Travel'
+            assert db.session.get(Transaction, old_id).amount_cents == 2500
+            assert db.session.get(Transaction, old_id).category_id == category_id
+            totals = db.session.get(UserTotals, user_id)
+            assert (totals.income_cents, totals.expense_cents, totals.transaction_count) == (10050, 2500, 2)
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'delete', 'entity': 'transaction', 'id': results[1]['id']},
+            {'op': 'delete', 'entity': 'category', 'id': results[0]['id']},
+        ]}, headers=auth_headers(auth_token))
+        assert response.status_code == 200
+
+        with app.app_context():
+            assert db.session.get(Category, results[0]['id']) is None
+            assert db.session.get(UserTotals, user_id).transaction_count == 1
+
+    def test_TC_BATCH_002_failed_operation_rolls_back(self, client, app, auth_token, auth_headers):
+        """TC-BATCH-002: Ошибка одной операции отменяет весь пакет"""
+        with app.app_context():
+            user_id = self._user_id()
+            transaction = Transaction(amount=10.0, type='expense', user_id=user_id)
+            db.session.add(transaction)
+            db.session.commit()
+            transaction_id = transaction.id
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'update', 'entity': 'transaction', 'id': transaction_id, 'data': {'amount': 99}},
+            {'op': 'create', 'entity': 'category', 'data': {'name': 'Food'}},
+            {'op': 'create', 'entity': 'transaction', 'data': {'amount': -5, 'type': 'income'}},
+        ]}, headers=auth_headers(auth_token))
+
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Неверная сумма', 'index': 2}
+        with app.app_context():
+            assert db.session.get(Transaction, transaction_id).amount_cents == 1000
+            assert Category.query.filter_by(user_id=user_id).count() == 0
+            assert db.session.get(UserTotals, user_id).expense_cents == 1000
+
+    def test_TC_BATCH_003_ownership_and_category_rules(self, client, app, auth_token, auth_headers):
+        """TC-BATCH-003: Чужие записи не найдены, категорию с транзакциями удалить нельзя"""
+        with app.app_context():
+            user_id = self._user_id()
+            other = User(username='other', email='other@example.com', password='x')
+            db.session.add(other)
+            db.session.commit()
+            foreign = Transaction(amount=10.0, type='expense', user_id=other.id)
+            category = Category(name='Food', user_id=user_id)
+            db.session.add_all([foreign, category])
+            db.session.commit()
+            db.session.add(Transaction(amount=5.0, type='expense', category_id=category.id, user_id=user_id))
+            db.session.commit()
+            foreign_id, category_id = foreign.id, category.id
+
+        headers = auth_headers(auth_token)
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'delete', 'entity': 'transaction', 'id': foreign_id},
+        ]}, headers=headers)
+        assert response.get_json() == {'error': 'Транзакция не найдена', 'index': 0}
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'create', 'entity': 'category', 'data': {'name': 'Food'}},
+        ]}, headers=headers)
+        assert response.get_json()['error'] == 'Категория с таким названием уже существует'
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'create', 'entity': 'transaction', 'data': {'amount': 1, 'type': 'income'}},
+            {'op': 'delete', 'entity': 'category', 'id': category_id},
+        ]}, headers=headers)
+        assert response.status_code == 400
+        assert response.get_json() == {
+            'error': 'Нельзя удалить категорию, с которой связаны транзакции', 'index': 1
+        }
+
+        response = client.post('/api/batch', json={'operations': []}, headers=headers)
+        assert response.status_code == 400
+        for body in ([{'op': 'create'}], 'operations', 42, None):
+            response = client.post('/api/batch', json=body, headers=headers)
+            assert response.status_code == 400
+            assert response.get_json() == {'error': 'operations must be a non-empty list'}
+        response = client.post('/api/batch', json={'operations': [{'op': 'merge', 'entity': 'category'}]},
+                               headers=headers)
+        assert response.get_json() == {'error': 'Неизвестная операция', 'index': 0}
+
+        with app.app_context():
+            assert db.session.get(Category, category_id) is not None
+            assert Transaction.query.filter_by(user_id=user_id).count() == 1
+
+    def test_TC_BATCH_004_recategorize_in_one_commit(self, client, app, auth_token, auth_headers):
+        """TC-BATCH-004: Перенос многих транзакций в другую категорию — один коммит, запросы не растут с пакетом"""
+        with app.app_context():
+            user_id = self._user_id()
+            old, new = Category(name='Old', user_id=user_id), Category(name='New', user_id=user_id)
+            db.session.add_all([old, new])
+            db.session.commit()
+            db.session.add_all([
+                Transaction(amount=1.0, type='expense', category_id=old.id, user_id=user_id) for _ in range(200)
+            ])
+            db.session.commit()
+            ids = [t.id for t in Transaction.query.filter_by(user_id=user_id)]
+            old_id, new_id = old.id, new.id
+            engine = db.engine
+
+        statements = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', _capture)
+        try:
+            response = client.post('/api/batch', json={'operations': [
+                {'op': 'update', 'entity': 'transaction', 'id': id, 'data': {'category_id': new_id}} for id in ids
+            ] + [{'op': 'delete', 'entity': 'category', 'id': old_id}]}, headers=auth_headers(auth_token))
+        finally:
+            event.remove(engine, 'before_cursor_execute', _capture)
+
+        assert response.status_code == 200
+        assert len(response.get_json()['results']) == 201
+        assert len(statements) < 10
+        with app.app_context():
+            assert Transaction.query.filter_by(category_id=new_id).count() == 200
+            assert db.session.get(Category, old_id) is None
+
+    def test_TC_BATCH_005_invalid_ids(self, client, app, auth_token, auth_headers):
+        """TC-BATCH-005: Идентификатор не целым числом — ошибка операции, а не 500"""
+        with app.app_context():
+            user_id = self._user_id()
+            transaction = Transaction(amount=1.0, type='expense', user_id=user_id)
+            db.session.add(transaction)
+            db.session.commit()
+            transaction_id = transaction.id
+
+        headers = auth_headers(auth_token)
+        for entity, error in (('transaction', 'Транзакция не найдена'), ('category', 'Категория не найдена')):
+            for bad_id in ([transaction_id], {'id': transaction_id}, True, None, 'abc'):
+                response = client.post('/api/batch', json={'operations': [
+                    {'op': 'create', 'entity': 'category', 'data': {'name': 'Food'}},
+                    {'op': 'delete', 'entity': entity, 'id': bad_id},
+                ]}, headers=headers)
+                assert response.status_code == 400
+                assert response.get_json() == {'error': error, 'index': 1}, bad_id
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'update', 'entity': 'transaction', 'id': str(transaction_id), 'data': {'amount': 2}},
+        ]}, headers=headers)
+        assert response.status_code == 200
+        with app.app_context():
+            assert db.session.get(Transaction, transaction_id).amount == 2
+            assert Category.query.filter_by(user_id=user_id).count() == 0
+
+    def test_TC_BATCH_006_invalid_description(self, client, app, auth_token, auth_headers):
+        """TC-BATCH-006: Описание не строкой или длиннее 200 символов — ошибка операции с её номером"""
+        with app.app_context():
+            user_id = self._user_id()
+            transaction = Transaction(amount=1.0, type='expense', user_id=user_id, description='old')
+            db.session.add(transaction)
+            db.session.commit()
+            transaction_id = transaction.id
+
+        headers = auth_headers(auth_token)
+        for description, error in ((['a'], 'Неверное описание'), ({'a': 1}, 'Неверное описание'),
+                                   (5, 'Неверное описание'), ('x' * 201, 'Слишком длинное описание')):
+            response = client.post('/api/batch', json={'operations': [
+                {'op': 'create', 'entity': 'transaction', 'data': {'amount': 1, 'type': 'income'}},
+                {'op': 'create', 'entity': 'transaction',
+                 'data': {'amount': 1, 'type': 'income', 'description': description}},
+            ]}, headers=headers)
+            assert response.status_code == 400
+            assert response.get_json() == {'error': error, 'index': 1}
+
+            response = client.post('/api/batch', json={'operations': [
+                {'op': 'update', 'entity': 'transaction', 'id': transaction_id, 'data': {'description': description}},
+            ]}, headers=headers)
+            assert response.get_json() == {'error': error, 'index': 0}
+
+            response = client.put(f'/dashboard/edit_transaction/{transaction_id}',
+                                  json={'description': description}, headers=headers)
+            assert response.status_code == 400
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'update', 'entity': 'transaction', 'id': transaction_id, 'data': {'description': '  new  '}},
+        ]}, headers=headers)
+        assert response.status_code == 200
+        with app.app_context():
+            assert db.session.get(Transaction, transaction_id).description == 'new'
+            assert Transaction.query.filter_by(user_id=user_id).count() == 1
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import func, select
+from app import db
+from app.models import Transaction, UserTotals
+from benchmarks.dataset import bench_app, generate, parse_scale
+from benchmarks.runner import compare, run
+
+# Минимальная стоимость bcrypt, как в профиле testing
+FAST_HASH = {'BCRYPT_LOG_ROUNDS': 4}
+
+
+class TestBenchmarks:
+    """Тесты набора бенчмарков - TC-BENCH-001 до TC-BENCH-002"""
+
+    def test_TC_BENCH_001_dataset_is_deterministic(self, tmp_path):
+        """TC-BENCH-001: Одинаковые параметры дают одинаковые данные с пересчитанными агрегатами"""
+        assert parse_scale('10k') == 10_000
+        assert parse_scale('1.5M') == 1_500_000
+        with pytest.raises(ValueError):
+            parse_scale('ten')
+
+        snapshots = []
+        for name in ('a.db', 'b.db'):
+            path = tmp_path / name
+            generate(path, transactions=300, users=3, categories=4, seed=7, config=FAST_HASH)
+            app = bench_app(path, FAST_HASH)
+            with app.app_context():
+                rows = db.session.execute(
+                    select(Transaction.user_id, Transaction.amount_cents, Transaction.date).order_by(Transaction.id)
+                ).all()
+                totals = db.session.get(UserTotals, 1)
+                expense = db.session.scalar(select(func.sum(Transaction.amount_cents)).where(
+                    Transaction.user_id == 1, Transaction.type == 'expense'
+                ))
+                assert (totals.transaction_count, totals.expense_cents) == (100, expense)
+                db.engine.dispose()
+            snapshots.append(rows)
+
+        assert len(snapshots[0]) == 300
+        assert snapshots[0] == snapshots[1]
+
+    def test_TC_BENCH_002_run_and_compare_with_baseline(self, tmp_path):
+        """TC-BENCH-002: Замеры возвращают перцентили, рост медианы сверх допуска — регрессия"""
+        path = tmp_path / 'bench.db'
+        generate(path, transactions=200, users=2, seed=1, config=FAST_HASH)
+
+        report = run(path, repeat=3, warmup=1, only=['endpoint.dashboard', 'endpoint.transactions', 'query.', 'serialize.'],
+                     config=FAST_HASH)
+        assert report['dataset'] == {'transactions': 200, 'users': 2}
+        assert 'endpoint.login' not in report['results']
+        stats = report['results']['endpoint.dashboard_data']
+        assert stats['count'] == 3
+        assert stats['min'] <= stats['p50'] <= stats['p95'] <= stats['max']
+
+        assert compare(report, report) == []
+        faster = {'results': {name: {**stats, 'p50': stats['p50'] / 2} for name, stats in report['results'].items()}}
+        regressions = compare(report, faster, tolerance=0.2)
+        assert {name for name, _, _ in regressions} == set(report['results'])
@@ -0,0 +1,152 @@
+import io
+from datetime import datetime, timezone
+from app import db
+from app.aggregates import current_periods
+from app.instrumentation import count_queries
+from app.models import Budget, Category, Transaction, User
+from app.routes.dashboard_routes import _budgets_query
+
+
+class TestBudgets:
+    """Тесты бюджетов по категориям - TC-BUDGET-001 до TC-BUDGET-004"""
+
+    def _create_category(self, app, name='Food'):
+        with app.app_context():
+            user = User.query.filter_by(email='test@example.com').first()
+            category = Category(name=name, user_id=user.id)
+            db.session.add(category)
+            db.session.commit()
+            return user.id, category.id
+
+    def _statuses(self, client, headers):
+        response = client.get('/dashboard/budgets', headers=headers)
+        assert response.status_code == 200
+        return response.get_json()['budgets']
+
+    def test_TC_BUDGET_001_add_budget_counts_current_period(self, client, app, auth_token, auth_headers):
+        """TC-BUDGET-001: Новый бюджет учитывает расходы категории за текущий период"""
+        user_id, category_id = self._create_category(app)
+        with app.app_context():
+            db.session.add_all([
+                Transaction(amount=30.0, type='expense', category_id=category_id, user_id=user_id),
+                Transaction(amount=500.0, type='income', category_id=category_id, user_id=user_id),
+                Transaction(amount=70.0, type='expense', category_id=category_id, user_id=user_id,
+                            date=datetime(2020, 1, 15)),
+            ])
+            db.session.commit()
+        headers = auth_headers(auth_token)
+
+        response = client.post('/dashboard/add_budget',
+                               json={'category_id': category_id, 'period': 'month', 'limit': 100},
+                               headers=headers)
+        assert response.status_code == 200
+
+        status, = self._statuses(client, headers)
+        assert status['id'] == response.get_json()['id']
+        assert status['category'] == 'Food'
+        assert status['period_start'] == current_periods()['month']
+        assert (status['limit'], status['spent'], status['remaining']) == (100.0, 30.0, 70.0)
+        assert status['exceeded'] is False
+
+    def test_TC_BUDGET_002_spend_follows_transaction_writes(self, client, app, auth_token, auth_headers):
+        """TC-BUDGET-002: Траты бюджета меняются при добавлении, правке, удалении и импорте транзакций"""
+        user_id, category_id = self._create_category(app)
+        headers = auth_headers(auth_token)
+        client.post('/dashboard/add_budget', json={'category_id': category_id, 'period': 'week', 'limit': 50},
+                    headers=headers)
+        client.post('/dashboard/add_budget', json={'category_id': category_id, 'limit': 200}, headers=headers)
+
+        client.post('/dashboard/add_transaction',
+                    json={'amount': 40.0, 'type': 'expense', 'category_id': category_id}, headers=headers)
+        client.post('/dashboard/add_transaction',
+                    json={'amount': 99.0, 'type': 'income', 'category_id': category_id}, headers=headers)
+        assert [b['spent'] for b in self._statuses(client, headers)] == [40.0, 40.0]
+
+        with app.app_context():
+            transaction_id = db.session.query(Transaction.id).filter_by(
+                user_id=user_id, type='expense').scalar()
+        client.put(f'/dashboard/edit_transaction/{transaction_id}', json={'amount': 60.0}, headers=headers)
+        month, week = self._statuses(client, headers)
+        assert (week['period'], week['spent'], week['exceeded']) == ('week', 60.0, True)
+        assert (month['period'], month['spent'], month['exceeded']) == ('month', 60.0, False)
+
+        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        csv_data = f'date,amount,category\n{today},-15,Food\n2020-01-01,-5,Food\n'.encode()
+        client.post('/dashboard/import', data={'file': (io.BytesIO(csv_data), 'statement.csv')},
+                    headers={'Authorization': headers['Authorization']}, content_type='multipart/form-data')
+        assert [b['spent'] for b in self._statuses(client, headers)] == [75.0, 75.0]
+
+        client.delete(f'/dashboard/delete_transaction/{transaction_id}', headers=headers)
+        assert [b['spent'] for b in self._statuses(client, headers)] == [15.0, 15.0]
+
+    def test_TC_BUDGET_003_validation_and_period_rollover(self, client, app, auth_token, auth_headers):
+        """TC-BUDGET-003: Проверка данных бюджета и пересчёт после смены периода"""
+        user_id, category_id = self._create_category(app)
+        headers = auth_headers(auth_token)
+
+        for data in ({'category_id': 999, 'limit': 10},
+                     {'category_id': category_id, 'period': 'year', 'limit': 10},
+                     {'category_id': category_id, 'limit': -1}):
+            assert client.post('/dashboard/add_budget', json=data, headers=headers).status_code == 400
+        response = client.post('/dashboard/add_budget', json={'category_id': category_id, 'limit': 10},
+                               headers=headers)
+        budget_id = response.get_json()['id']
+        assert client.post('/dashboard/add_budget', json={'category_id': category_id, 'limit': 20},
+                           headers=headers).status_code == 400
+        assert client.put(f'/dashboard/edit_budget/{budget_id}', json={'limit': 25},
+                          headers=headers).status_code == 200
+
+        # Бюджет остался в прошлом периоде: чтение считает траты по транзакциям, ничего не записывая
+        with app.app_context():
+            transaction = Transaction(amount=5.0, type='expense', category_id=category_id, user_id=user_id)
+            db.session.add(transaction)
+            db.session.commit()
+            budget = db.session.get(Budget, budget_id)
+            budget.period_start, budget.spent_cents = '2020-01-01', 123456
+            db.session.commit()
+            version = db.session.get(User, user_id).data_version
+        etag = client.get('/dashboard/data', headers=headers).headers['ETag']
+        status, = self._statuses(client, headers)
+        assert (status['period_start'], status['limit'], status['spent']) == (current_periods()['month'], 25.0, 5.0)
+        with app.app_context():
+            db.session.expire_all()
+            assert db.session.get(Budget, budget_id).period_start == '2020-01-01'
+            assert db.session.get(User, user_id).data_version == version
+        response = client.get('/dashboard/data', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        # Первая запись расхода текущего периода переводит бюджет на него
+        client.post('/dashboard/add_transaction',
+                    json={'amount': 7.0, 'type': 'expense', 'category_id': category_id}, headers=headers)
+        with app.app_context():
+            db.session.expire_all()
+            budget = db.session.get(Budget, budget_id)
+            assert (budget.period_start, budget.spent_cents) == (current_periods()['month'], 1200)
+        assert self._statuses(client, headers)[0]['spent'] == 12.0
+
+        with app.app_context():
+            db.session.query(Transaction).filter_by(user_id=user_id).delete()
+            db.session.commit()
+        assert client.delete(f'/dashboard/delete_category/{category_id}', headers=headers).status_code == 200
+        assert self._statuses(client, headers) == []
+        assert client.delete(f'/dashboard/delete_budget/{budget_id}', headers=headers).status_code == 404
+
+    def test_TC_BUDGET_004_statuses_single_indexed_read(self, client, app, auth_token, auth_headers):
+        """TC-BUDGET-004: Состояние всех бюджетов читается одним запросом по индексу"""
+        headers = auth_headers(auth_token)
+        for name in ('Food', 'Travel', 'Rent'):
+            user_id, category_id = self._create_category(app, name)
+            for period in ('week', 'month'):
+                client.post('/dashboard/add_budget', json={'category_id': category_id, 'period': period,
+                                                           'limit': 100}, headers=headers)
+        self._statuses(client, headers)
+
+        with count_queries() as queries:
+            assert len(self._statuses(client, headers)) == 6
+        assert queries.count == 1
+
+        with app.app_context():
+            compiled = _budgets_query(user_id).compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}').fetchall()
+        details = [row[-1] for row in plan]
+        assert not any(detail.startswith('SCAN') or 'TEMP B-TREE' in detail for detail in details), details
@@ -0,0 +1,95 @@
+import pytest
+from app import db
+from app.cache import cache, CacheBackend, LRUCache
+from app.instrumentation import count_queries
+from app.models import User
+
+
+class DictBackend(CacheBackend):
+    """Хранилище для проверки подключаемого backend"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value, ttl):
+        self.entries[key] = value
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class TestResponseCache:
+    """Тесты кэша ответов - TC-CACHE-001 до TC-CACHE-004"""
+
+    def test_TC_CACHE_001_repeated_request_served_from_cache(self, client, app, auth_token, auth_headers):
+        """TC-CACHE-001: Повторный запрос отдаётся из кэша за один запрос версии"""
+        headers = auth_headers(auth_token)
+        first = client.get('/dashboard/stats_data?granularity=month', headers=headers)
+
+        with count_queries() as queries:
+            response = client.get('/dashboard/stats_data?granularity=month', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json() == first.get_json()
+        assert queries.count == 1
+
+        with app.app_context():
+            stats = cache.stats()
+        assert stats['backend'] == 'LRUCache'
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+    def test_TC_CACHE_002_writes_invalidate_only_own_entries(self, client, app, auth_token, auth_headers):
+        """TC-CACHE-002: Запись транзакции сбрасывает кэш своего пользователя"""
+        headers = auth_headers(auth_token)
+        assert client.get('/dashboard/data', headers=headers).get_json()['balance'] == 0
+
+        client.post('/dashboard/add_transaction', json={'amount': 15, 'type': 'income'}, headers=headers)
+        assert client.get('/dashboard/data', headers=headers).get_json()['balance'] == 15.0
+
+        client.post('/api/batch', json={'operations': [
+            {'op': 'create', 'entity': 'category', 'data': {'name': 'Food'}}
+        ]}, headers=headers)
+        assert client.get('/dashboard/data', headers=headers).get_json()['categories'][0]['name'] == 'Food'
+
+        with app.app_context():
+            assert cache.stats()['hits'] == 0
+
+    def test_TC_CACHE_003_lru_eviction_and_ttl(self, app):
+        """TC-CACHE-003: LRU вытесняет давние записи и не отдаёт просроченные"""
+        app.config['RESPONSE_CACHE_MAX_ENTRIES'] = 2
+        backend = LRUCache(app)
+        backend.set('a', b'1', ttl=60)
+        backend.set('b', b'2', ttl=60)
+        assert backend.get('a') == b'1'
+        backend.set('c', b'3', ttl=60)
+        assert backend.get('b') is None
+        assert len(backend) == 2
+
+        backend.set('d', b'4', ttl=-1)
+        assert backend.get('d') is None
+
+    def test_TC_CACHE_004_pluggable_backend_and_admin_stats(self, client, app, auth_token, auth_headers):
+        """TC-CACHE-004: Backend подключается из конфигурации, счётчики доступны администратору"""
+        app.config['RESPONSE_CACHE_BACKEND'] = DictBackend
+        cache.init_app(app)
+        headers = auth_headers(auth_token)
+
+        assert client.get('/api/admin/cache', headers=headers).status_code == 403
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            user.role = 'admin'
+            db.session.commit()
+
+        client.get('/dashboard/profile', headers=headers)
+        client.get('/dashboard/profile', headers=headers)
+        stats = client.get('/api/admin/cache', headers=headers).get_json()
+        assert stats == {'backend': 'DictBackend', 'entries': 1, 'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+        assert client.delete('/api/admin/cache', headers=headers).status_code == 200
+        assert client.get('/api/admin/cache', headers=headers).get_json()['entries'] == 0
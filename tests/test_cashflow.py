@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime
+from app import db
+from app.instrumentation import count_queries
+from app.models import Transaction, User
+from app.routes.dashboard_routes import _cashflow_query
+
+
+class TestCashflow:
+    """Тесты движения денег - TC-CASHFLOW-001 до TC-CASHFLOW-003"""
+
+    def _create_history(self, app):
+        with app.app_context():
+            user = User.query.filter_by(email='test@example.com').first()
+            for date, amount, type in [
+                (datetime(2024, 1, 5), 100.0, 'income'),
+                (datetime(2024, 1, 20), 30.0, 'expense'),
+                (datetime(2024, 2, 3), 50.0, 'expense'),
+                (datetime(2024, 2, 10), 20.0, 'income'),
+                (datetime(2024, 3, 1), 5.0, 'expense'),
+            ]:
+                db.session.add(Transaction(amount=amount, type=type, date=date, user_id=user.id))
+            db.session.commit()
+            return user.id
+
+    def test_TC_CASHFLOW_001_running_balance_by_period(self, client, app, auth_token, auth_headers):
+        """TC-CASHFLOW-001: Приход, расход и нарастающий баланс по дням и месяцам"""
+        self._create_history(app)
+        headers = auth_headers(auth_token)
+
+        data = client.get('/dashboard/cashflow', headers=headers).get_json()
+        assert data['granularity'] == 'day'
+        assert data['periods'] == ['2024-01-05', '2024-01-20', '2024-02-03', '2024-02-10', '2024-03-01']
+        assert data['balance'] == [100.0, 70.0, 20.0, 40.0, 35.0]
+        assert (data['opening_balance'], data['closing_balance']) == (0.0, 35.0)
+
+        data = client.get('/dashboard/cashflow?granularity=month', headers=headers).get_json()
+        assert data['periods'] == ['2024-01-01', '2024-02-01', '2024-03-01']
+        assert data['inflow'] == [100.0, 20.0, 0.0]
+        assert data['outflow'] == [30.0, 50.0, 5.0]
+        assert data['balance'] == [70.0, 40.0, 35.0]
+
+    def test_TC_CASHFLOW_002_window_starts_with_opening_balance(self, client, app, auth_token, auth_headers):
+        """TC-CASHFLOW-002: Баланс окна начинается с баланса на его начало, в том числе с середины месяца"""
+        self._create_history(app)
+        headers = auth_headers(auth_token)
+
+        data = client.get('/dashboard/cashflow?from=2024-02-01&to=2024-02-29&granularity=month',
+                          headers=headers).get_json()
+        assert data['opening_balance'] == 70.0
+        assert data['balance'] == [40.0]
+
+        data = client.get('/dashboard/cashflow?from=2024-02-05&granularity=week', headers=headers).get_json()
+        assert data['opening_balance'] == 20.0
+        assert data['periods'] == ['2024-02-05', '2024-02-26']
+        assert data['balance'] == [40.0, 35.0]
+
+        data = client.get('/dashboard/cashflow?from=2025-01-01', headers=headers).get_json()
+        assert data['periods'] == []
+        assert data['opening_balance'] == data['closing_balance'] == 35.0
+
+        assert client.get('/dashboard/cashflow?granularity=year', headers=headers).status_code == 400
+        assert client.get('/dashboard/cashflow?from=01.02.2024', headers=headers).status_code == 400
+
+    def test_TC_CASHFLOW_003_single_indexed_query(self, client, app, auth_token, auth_headers):
+        """TC-CASHFLOW-003: Ряд считается одним запросом без полного просмотра таблиц"""
+        user_id = self._create_history(app)
+
+        with count_queries() as queries:
+            response = client.get('/dashboard/cashflow?from=2024-02-05&granularity=week',
+                                  headers=auth_headers(auth_token))
+        assert response.status_code == 200
+        # Версия данных для ETag и сам ряд
+        assert queries.count == 2
+
+        with app.app_context():
+            query = _cashflow_query(user_id, datetime(2024, 2, 5), None, 'week')
+            compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}').fetchall()
+        details = [row[-1] for row in plan]
+        assert not any(detail.split()[:2] in (['SCAN', 'transaction'], ['SCAN', 'monthly_rollup'])
+                       for detail in details)
@@ -3,7 +3,7 @@ from app import db
 from app.models import Category, Transaction, User
 
 class TestCategories:
-    """Тесты управления категориями - TC-CAT-001 до TC-CAT-005"""
+    """Тесты управления категориями - TC-CAT-001 до TC-CAT-006"""
     
     def test_TC_CAT_001_create_category_valid(self, client, auth_token, auth_headers):
         """TC-CAT-001: Создание категории с валидным названием"""
@@ -101,4 +101,20 @@ class TestCategories:
         # Проверяем что категория не удалена из БД
         with app.app_context():
             category = db.session.get(Category, category_id)
-            assert category is not None
\ No newline at end of file
+            assert category is not None
+
+    def test_TC_CAT_006_list_categories(self, client, app, auth_token, auth_headers):
+        """TC-CAT-006: Список категорий пользователя без данных дашборда"""
+        headers = auth_headers(auth_token)
+        assert client.get('/api/categories', headers=headers).get_json() == {'categories': []}
+
+        food = client.post('/dashboard/add_category', json={'name': 'Food'}, headers=headers).get_json()['id']
+        travel = client.post('/dashboard/add_category', json={'name': 'Travel'}, headers=headers).get_json()['id']
+        with app.app_context():
+            db.session.add(Category(name='Other user', user_id=0))
+            db.session.commit()
+
+        response = client.get('/api/categories', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json() == {'categories': [{'id': food, 'name': 'Food'}, {'id': travel, 'name': 'Travel'}]}
+        assert client.get('/api/categories').status_code == 401
@@ -0,0 +1,89 @@
+import gzip
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models import Category, Transaction, User
+
+
+class TestCompactResponses:
+    """Тесты колоночного формата, проекции полей и сжатия - TC-COMPACT-001 до TC-COMPACT-004"""
+
+    def _create_transactions(self, app, count=3):
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            food = Category(name='Food', user_id=user.id)
+            db.session.add(food)
+            db.session.commit()
+            db.session.add_all([
+                Transaction(amount=10.0 + i, type='expense', category_id=food.id if i % 2 == 0 else None,
+                            description=f'item {i}', date=datetime(2024, 1, 1, 12, 0) + timedelta(days=i), user_id=user.id)
+                for i in range(count)
+            ])
+            db.session.commit()
+            return food.id
+
+    def test_TC_COMPACT_001_columnar_dashboard(self, client, app, auth_token, auth_headers):
+        """TC-COMPACT-001: Колоночный формат дашборда — массивы по полям и словарь категорий"""
+        food_id = self._create_transactions(app)
+        response = client.get('/dashboard/data?format=columnar', headers=auth_headers(auth_token))
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['categories'] == {str(food_id): 'Food'}
+        assert data['transactions'] == {
+            'id': data['transactions']['id'],
+            'amount': [12.0, 11.0, 10.0],
+            'type': ['expense'] * 3,
+            'category_id': [food_id, None, food_id],
+            'description': ['item 2', 'item 1', 'item 0'],
+            'date': ['2024-01-03 12:00', '2024-01-02 12:00', '2024-01-01 12:00'],
+        }
+
+    def test_TC_COMPACT_002_fields_projection(self, client, app, auth_token, auth_headers):
+        """TC-COMPACT-002: Параметр fields оставляет в ответе только запрошенные поля"""
+        food_id = self._create_transactions(app)
+        headers = auth_headers(auth_token)
+
+        data = client.get('/dashboard/transactions_data?fields=amount,id', headers=headers).get_json()
+        assert data['transactions'][0] == {'id': data['transactions'][0]['id'], 'amount': 12.0}
+
+        data = client.get('/dashboard/transactions_data?format=columnar&fields=category,amount&limit=2',
+                          headers=headers).get_json()
+        assert data['transactions'] == {'amount': [12.0, 11.0], 'category_id': [food_id, None]}
+        assert data['categories'] == {str(food_id): 'Food'}
+        assert data['next_cursor']
+
+        response = client.get('/dashboard/transactions_data?fields=amount,balance', headers=headers)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Неизвестные поля: balance'
+        response = client.get('/dashboard/data?format=xml', headers=headers)
+        assert response.status_code == 400
+
+    def test_TC_COMPACT_003_large_responses_gzipped(self, client, app, auth_token, auth_headers):
+        """TC-COMPACT-003: Крупные JSON-ответы сжимаются gzip, мелкие — нет"""
+        self._create_transactions(app, count=40)
+        headers = {**auth_headers(auth_token), 'Accept-Encoding': 'gzip'}
+
+        response = client.get('/dashboard/transactions_data', headers=headers)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        plain = client.get('/dashboard/transactions_data', headers=auth_headers(auth_token))
+        assert gzip.decompress(response.data) == plain.data
+        assert len(response.data) < len(plain.data)
+
+        response = client.get('/dashboard/profile', headers=headers)
+        assert 'Content-Encoding' not in response.headers
+
+    def test_TC_COMPACT_004_gzip_variant_etag(self, client, app, auth_token, auth_headers):
+        """TC-COMPACT-004: У сжатого варианта свой сильный ETag, и он тоже даёт 304"""
+        self._create_transactions(app, count=40)
+        headers = {**auth_headers(auth_token), 'Accept-Encoding': 'gzip'}
+
+        response = client.get('/dashboard/data', headers=headers)
+        etag = response.headers['ETag']
+        assert etag.endswith('-gzip"')
+        assert etag.replace('-gzip', '') == client.get('/dashboard/data', headers=auth_headers(auth_token)).headers['ETag']
+
+        response = client.get('/dashboard/data', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
@@ -0,0 +1,110 @@
+import io
+import pytest
+from app import db
+from app.instrumentation import count_queries
+from app.models import Category, Transaction, User, UserTotals
+
+
+class TestConditionalRequests:
+    """Тесты условных GET-запросов - TC-ETAG-001 до TC-ETAG-004"""
+
+    def test_TC_ETAG_001_not_modified_skips_queries(self, client, app, auth_token, auth_headers):
+        """TC-ETAG-001: Повторный запрос с If-None-Match получает 304 за один запрос к БД"""
+        headers = auth_headers(auth_token)
+        response = client.get('/dashboard/data', headers=headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert not etag.startswith('W/')
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+        with count_queries() as queries:
+            response = client.get('/dashboard/data', headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.data == b''
+        assert queries.count == 1
+
+    def test_TC_ETAG_002_writes_change_etag(self, client, app, auth_token, auth_headers):
+        """TC-ETAG-002: Изменение транзакций, категорий и импорт меняют ETag"""
+        headers = auth_headers(auth_token)
+
+        def etag(url='/dashboard/data'):
+            return client.get(url, headers=headers).headers['ETag']
+
+        etags = [etag()]
+        response = client.post('/dashboard/add_category', json={'name': 'Food'}, headers=headers)
+        category_id = response.get_json()['id']
+        etags.append(etag())
+
+        client.post('/dashboard/add_transaction', json={'amount': 10, 'type': 'expense'}, headers=headers)
+        etags.append(etag())
+
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            transaction_id = Transaction.query.filter_by(user_id=user.id).first().id
+        client.put(f'/dashboard/edit_transaction/{transaction_id}', json={'category_id': category_id},
+                   headers=headers)
+        etags.append(etag())
+
+        client.post('/dashboard/import',
+                    data={'file': (io.BytesIO(b'date,amount\n2024-01-01,-5\n'), 'statement.csv')},
+                    headers={'Authorization': headers['Authorization']}, content_type='multipart/form-data')
+        etags.append(etag())
+
+        client.delete(f'/dashboard/delete_transaction/{transaction_id}', headers=headers)
+        etags.append(etag())
+
+        assert len(set(etags)) == len(etags)
+
+        # Запросы без изменений данных ETag не меняют
+        client.get('/dashboard/transactions_data', headers=headers)
+        assert etag() == etags[-1]
+
+        # Разные параметры — разные представления
+        assert etag('/dashboard/stats_data?granularity=day') != etag('/dashboard/stats_data?granularity=month')
+
+    def test_TC_ETAG_003_etag_is_per_user(self, client, app, auth_token, auth_headers):
+        """TC-ETAG-003: ETag одного пользователя не подходит другому и меняется при правке профиля"""
+        headers = auth_headers(auth_token)
+        client.post('/auth/register', json={'username': 'other', 'email': 'other@example.com',
+                                            'password': 'password123'})
+        other_token = client.post('/auth/login', json={'email': 'other@example.com',
+                                                       'password': 'password123'}).get_json()['token']
+
+        etag = client.get('/dashboard/profile', headers=headers).headers['ETag']
+        response = client.get('/dashboard/profile', headers={**auth_headers(other_token), 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['email'] == 'other@example.com'
+
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            user.username = 'renamed'
+            db.session.commit()
+
+        response = client.get('/dashboard/profile', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['username'] == 'renamed'
+
+    @pytest.mark.parametrize('args', [['rebuild-totals'], ['rebuild-totals', '--user-id', '{user_id}'],
+                                      ['rebuild-rollups'], ['rebuild-budgets'], ['rebuild-search']])
+    def test_TC_ETAG_004_rebuild_commands_change_etag(self, client, app, auth_token, auth_headers, args):
+        """TC-ETAG-004: После команд пересчёта агрегатов кэшированный ответ не отдаётся"""
+        headers = auth_headers(auth_token)
+        client.post('/dashboard/add_transaction', json={'amount': 75.0, 'type': 'income'}, headers=headers)
+        with app.app_context():
+            user_id = db.session.query(User.id).filter_by(email='test@example.com').scalar()
+            # Испорченный баланс попадает в кэш ответа
+            db.session.get(UserTotals, user_id).income_cents = 999999
+            db.session.commit()
+        response = client.get('/dashboard/data', headers=headers)
+        assert response.get_json()['balance'] == 9999.99
+        etag = response.headers['ETag']
+
+        result = app.test_cli_runner().invoke(args=[arg.format(user_id=user_id) for arg in args])
+        assert result.exit_code == 0
+        response = client.get('/dashboard/data', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        if args[0] == 'rebuild-totals':
+            assert response.get_json()['balance'] == 75.0
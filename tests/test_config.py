@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+
+
+class TestConfig:
+    """Тесты профилей конфигурации - TC-CONFIG-001 до TC-CONFIG-003"""
+
+    def test_TC_CONFIG_001_production_sqlite_pragmas(self, monkeypatch, tmp_path):
+        """TC-CONFIG-001: Профиль production включает WAL и настройки SQLite на каждом соединении"""
+        monkeypatch.setenv('FINANCE_SECRET_KEY', 'prod-secret')
+        monkeypatch.setenv('FINANCE_JWT_SECRET_KEY', 'prod-jwt-secret')
+        monkeypatch.setenv('FINANCE_SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'prod.db'}")
+
+        app = create_app('production')
+        assert app.config['SECRET_KEY'] == 'prod-secret'
+        assert not app.debug
+
+        with app.app_context():
+            with db.engine.connect() as conn:
+                pragmas = {name: conn.execute(text(f'PRAGMA {name}')).scalar()
+                           for name in ('journal_mode', 'synchronous', 'cache_size', 'busy_timeout')}
+            db.engine.dispose()
+
+        assert pragmas == {'journal_mode': 'wal', 'synchronous': 1, 'cache_size': -64000, 'busy_timeout': 5000}
+
+    def test_TC_CONFIG_002_production_requires_secrets(self, monkeypatch, tmp_path):
+        """TC-CONFIG-002: Профиль production не запускается без секретов из окружения"""
+        monkeypatch.delenv('FINANCE_SECRET_KEY', raising=False)
+        monkeypatch.delenv('FINANCE_JWT_SECRET_KEY', raising=False)
+        monkeypatch.setenv('FINANCE_SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'prod.db'}")
+
+        with pytest.raises(RuntimeError):
+            create_app('production')
+
+    def test_TC_CONFIG_003_profile_from_environment(self, monkeypatch, tmp_path):
+        """TC-CONFIG-003: Профиль выбирается переменной FINANCE_CONFIG"""
+        monkeypatch.setenv('FINANCE_CONFIG', 'testing')
+        monkeypatch.setenv('FINANCE_SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+
+        app = create_app()
+        assert app.testing
+        assert app.config['JWT_SECRET_KEY'] == 'test-jwt-secret-key'
+
+        monkeypatch.setenv('FINANCE_CONFIG', 'staging')
+        with pytest.raises(ValueError):
+            create_app()
@@ -1,9 +1,11 @@
 import pytest
 from app import db
-from app.models import Transaction, Category, User
+from app.instrumentation import count_queries
+from datetime import datetime
+from app.models import Transaction, Category, User, MonthlyRollup
 
 class TestDashboardAndStats:
-    """Тесты дашборда и статистики - TC-STATS-001 до TC-STATS-002"""
+    """Тесты дашборда и статистики - TC-STATS-001 до TC-STATS-007"""
     
     def test_TC_STATS_001_get_dashboard_data(self, client, app, auth_token, auth_headers):
         """TC-STATS-001: Получение данных для дашборда"""
@@ -78,4 +80,129 @@ class TestDashboardAndStats:
         # Проверяем что данные есть
         assert len(data['labels']) >= 1
         assert len(data['income']) >= 1
-        assert len(data['expense']) >= 1
\ No newline at end of file
+        assert len(data['expense']) >= 1
+
+    def _create_history(self, app):
+        """Категории и транзакции за несколько месяцев для тестов статистики"""
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            food = Category(name='Food', user_id=user.id)
+            salary = Category(name='Salary', user_id=user.id)
+            db.session.add_all([food, salary])
+            db.session.commit()
+
+            db.session.add_all([
+                Transaction(amount=1000.0, type='income', category_id=salary.id, user_id=user.id,
+                            date=datetime(2024, 1, 10, 9, 0)),
+                Transaction(amount=30.0, type='expense', category_id=food.id, user_id=user.id,
+                            date=datetime(2024, 1, 15, 12, 0)),
+                Transaction(amount=20.0, type='expense', category_id=food.id, user_id=user.id,
+                            date=datetime(2024, 1, 16, 18, 30)),
+                Transaction(amount=50.0, type='expense', category_id=food.id, user_id=user.id,
+                            date=datetime(2024, 2, 3, 10, 0)),
+            ])
+            db.session.commit()
+
+    def test_TC_STATS_003_category_stats_date_range(self, client, app, auth_token, auth_headers):
+        """TC-STATS-003: Статистика по категориям за период и по месяцам"""
+        self._create_history(app)
+
+        headers = auth_headers(auth_token)
+        response = client.get('/dashboard/stats_data?from=2024-01-01&to=2024-01-31&granularity=month',
+                              headers=headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['labels'] == ['Food', 'Salary']
+        assert data['income'] == [0.0, 1000.0]
+        assert data['expense'] == [50.0, 0.0]
+        assert data['series'] == {
+            'granularity': 'month',
+            'periods': ['2024-01-01'],
+            'income': [1000.0],
+            'expense': [50.0]
+        }
+
+        response = client.get('/dashboard/stats_data?from=2024-01-15&granularity=week', headers=headers)
+        series = response.get_json()['series']
+        assert series['periods'] == ['2024-01-15', '2024-01-29']
+        assert series['expense'] == [50.0, 50.0]
+
+    def test_TC_STATS_004_category_stats_invalid_params(self, client, auth_token, auth_headers):
+        """TC-STATS-004: Статистика с невалидными параметрами"""
+        headers = auth_headers(auth_token)
+
+        response = client.get('/dashboard/stats_data?from=01.01.2024', headers=headers)
+        assert response.status_code == 400
+
+        response = client.get('/dashboard/stats_data?granularity=year', headers=headers)
+        assert response.status_code == 400
+
+    def test_TC_STATS_005_monthly_rollup_follows_changes(self, client, app, auth_token, auth_headers):
+        """TC-STATS-005: Помесячные суммы обновляются при изменении и удалении транзакций"""
+        self._create_history(app)
+
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            food = db.session.query(Category).filter_by(name='Food').first()
+            rows = db.session.query(MonthlyRollup).filter_by(user_id=user.id, category_id=food.id).all()
+            assert {(r.month, r.total_cents, r.count) for r in rows} == {
+                ('2024-01-01', 5000, 2), ('2024-02-01', 5000, 1)
+            }
+
+            february = db.session.query(Transaction).filter_by(amount=50.0).first()
+            february.date = datetime(2024, 1, 20)
+            db.session.commit()
+            rows = db.session.query(MonthlyRollup).filter_by(user_id=user.id, category_id=food.id).all()
+            assert {(r.month, r.total_cents, r.count) for r in rows} == {('2024-01-01', 10000, 3)}
+
+            db.session.delete(february)
+            db.session.commit()
+            row = db.session.get(MonthlyRollup, (user.id, food.id, '2024-01-01', 'expense'))
+            assert (row.total_cents, row.count) == (5000, 2)
+
+        headers = auth_headers(auth_token)
+        by_month = client.get('/dashboard/stats_data?from=2024-01-01&to=2024-01-31', headers=headers)
+        by_day = client.get('/dashboard/stats_data?from=2023-12-31&to=2024-01-31', headers=headers)
+        assert by_month.get_json() == by_day.get_json()
+        assert by_month.get_json()['expense'] == [50.0, 0.0]
+
+    def test_TC_STATS_006_rebuild_rollups_command(self, client, app, auth_token, auth_headers):
+        """TC-STATS-006: Команда rebuild-rollups восстанавливает помесячные суммы"""
+        self._create_history(app)
+
+        with app.app_context():
+            db.session.query(MonthlyRollup).delete()
+            db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['rebuild-rollups'])
+        assert result.exit_code == 0
+
+        headers = auth_headers(auth_token)
+        data = client.get('/dashboard/stats_data?granularity=month', headers=headers).get_json()
+        assert data['expense'] == [100.0, 0.0]
+        assert data['series']['periods'] == ['2024-01-01', '2024-02-01']
+        assert data['series']['expense'] == [50.0, 50.0]
+
+    def test_TC_STATS_007_dashboard_data_single_query_per_list(self, client, app, auth_token, auth_headers):
+        """TC-STATS-007: Число запросов дашборда не зависит от числа транзакций"""
+        self._create_history(app)
+
+        with count_queries() as queries:
+            response = client.get('/dashboard/data', headers=auth_headers(auth_token))
+
+        assert response.status_code == 200
+        # Версия данных для ETag, итоги, первая страница транзакций, категории
+        assert queries.count == 4
+        data = response.get_json()
+        assert data['transactions'][0] == {
+            'id': data['transactions'][0]['id'],
+            'amount': 50.0,
+            'type': 'expense',
+            'category': 'Food',
+            'description': None,
+            'date': '2024-02-03 10:00'
+        }
+        assert [t['date'] for t in data['transactions']] == sorted(
+            (t['date'] for t in data['transactions']), reverse=True
+        )
@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from datetime import datetime
+from app import db, exporter
+from app.models import Transaction, Category, User
+
+
+class TestExport:
+    """Тесты выгрузки транзакций - TC-EXPORT-001 до TC-EXPORT-003"""
+
+    def _create_transactions(self, app, count):
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            category = Category(name='Food', user_id=user.id)
+            db.session.add(category)
+            db.session.commit()
+            db.session.add_all([
+                Transaction(amount=i + 0.5, type='expense', category_id=category.id, user_id=user.id,
+                            description=f'Purchase {i}', date=datetime(2024, 1, 1 + i, 10, 0))
+                for i in range(count)
+            ])
+            db.session.commit()
+
+    def test_TC_EXPORT_001_export_csv_in_chunks(self, client, app, auth_token, auth_headers, monkeypatch):
+        """TC-EXPORT-001: Выгрузка CSV читается из БД порциями"""
+        self._create_transactions(app, 5)
+        monkeypatch.setattr(exporter, 'EXPORT_CHUNK_SIZE', 2)
+
+        response = client.get('/dashboard/export?format=csv', headers=auth_headers(auth_token))
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'transactions.csv' in response.headers['Content-Disposition']
+
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert len(rows) == 5
+        assert rows[0] == {
+            'id': rows[0]['id'], 'amount': '4.50', 'type': 'expense', 'category': 'Food',
+            'description': 'Purchase 4', 'date': '2024-01-05 10:00'
+        }
+
+    def test_TC_EXPORT_002_export_ndjson_gzip(self, client, app, auth_token, auth_headers):
+        """TC-EXPORT-002: Выгрузка NDJSON со сжатием gzip и фильтром по датам"""
+        self._create_transactions(app, 5)
+
+        response = client.get('/dashboard/export?format=ndjson&gzip=1&from=2024-01-02&to=2024-01-03',
+                              headers=auth_headers(auth_token))
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/gzip'
+        lines = gzip.decompress(response.get_data()).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r['amount'] for r in records] == [2.5, 1.5]
+
+    def test_TC_EXPORT_003_export_invalid_format(self, client, auth_token, auth_headers):
+        """TC-EXPORT-003: Выгрузка в неподдерживаемом формате"""
+        response = client.get('/dashboard/export?format=xml', headers=auth_headers(auth_token))
+        assert response.status_code == 400
@@ -0,0 +1,123 @@
+import io
+import pytest
+from app import db
+from app.models import Transaction, Category, User, MonthlyRollup
+
+CSV_STATEMENT = """date,amount,type,category,description
+2024-01-10,1000.00,income,Salary,January salary
+2024-01-11,250.50,expense,Food,Groceries
+2024-01-11,250.50,expense,Food,Groceries
+11.01.2024,-99.90,,Transport,Taxi
+2024-01-12,-5,income,Food,Negative amount
+not-a-date,10,expense,Food,Bad date
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240205120000
+<TRNAMT>-42.10
+<FITID>100001
+<NAME>Coffee shop
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240206<TRNAMT>500.00<FITID>100002<NAME>Refund</NAME></STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+
+def _upload(client, headers, content, filename):
+    headers = {'Authorization': headers['Authorization']}
+    return client.post('/dashboard/import',
+                       data={'file': (io.BytesIO(content.encode('utf-8')), filename)},
+                       headers=headers, content_type='multipart/form-data')
+
+
+class TestImport:
+    """Тесты импорта выписок - TC-IMPORT-001 до TC-IMPORT-005"""
+
+    def test_TC_IMPORT_001_import_csv(self, client, app, auth_token, auth_headers):
+        """TC-IMPORT-001: Импорт CSV с созданием категорий и отчётом по строкам"""
+        headers = auth_headers(auth_token)
+        response = _upload(client, headers, CSV_STATEMENT, 'statement.csv')
+
+        assert response.status_code == 200
+        report = response.get_json()
+        assert report['accepted'] == 4
+        assert report['duplicates'] == 0
+        assert report['rejected'] == 2
+        assert report['categories_created'] == 3
+        assert [e['line'] for e in report['errors']] == [6, 7]
+        assert report['errors'][0]['error'] == 'Неверная сумма'
+
+        data = client.get('/dashboard/data', headers=headers).get_json()
+        assert data['balance'] == 399.1
+        assert data['transaction_count'] == 4
+        assert sorted(c['name'] for c in data['categories']) == ['Food', 'Salary', 'Transport']
+
+        with app.app_context():
+            food = db.session.query(Category).filter_by(name='Food').first()
+            row = db.session.get(MonthlyRollup, (food.user_id, food.id, '2024-01-01', 'expense'))
+            assert (row.total_cents, row.count) == (50100, 2)
+
+    def test_TC_IMPORT_002_reimport_skips_duplicates(self, client, app, auth_token, auth_headers):
+        """TC-IMPORT-002: Повторный импорт того же файла не создаёт дубликатов"""
+        headers = auth_headers(auth_token)
+        _upload(client, headers, CSV_STATEMENT, 'statement.csv')
+
+        report = _upload(client, headers, CSV_STATEMENT, 'statement.csv').get_json()
+        assert report['accepted'] == 0
+        assert report['duplicates'] == 4
+        assert report['categories_created'] == 0
+
+        with app.app_context():
+            assert db.session.query(Transaction).count() == 4
+
+    def test_TC_IMPORT_003_import_ofx(self, client, auth_token, auth_headers):
+        """TC-IMPORT-003: Импорт OFX"""
+        headers = auth_headers(auth_token)
+        report = _upload(client, headers, OFX_STATEMENT, 'bank.ofx').get_json()
+        assert report['accepted'] == 2
+        assert report['rejected'] == 0
+
+        data = client.get('/dashboard/data', headers=headers).get_json()
+        assert data['income'] == 500.0
+        assert data['expense'] == 42.1
+        assert {(t['date'], t['description']) for t in data['transactions']} == {
+            ('2024-02-05 12:00', 'Coffee shop'), ('2024-02-06 00:00', 'Refund')
+        }
+
+        report = _upload(client, headers, OFX_STATEMENT, 'bank.ofx').get_json()
+        assert report['duplicates'] == 2
+
+        # Повтор FITID внутри одного файла — дубликат, а не вторая операция
+        repeated = OFX_STATEMENT.replace('</BANKTRANLIST>', (
+            '<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240207<TRNAMT>-3.00<FITID>100003<NAME>Bus</NAME></STMTTRN>' * 2
+        ) + '</BANKTRANLIST>')
+        report = _upload(client, headers, repeated, 'bank.ofx').get_json()
+        assert (report['accepted'], report['duplicates'], report['rejected']) == (1, 3, 0)
+        assert client.get('/dashboard/data', headers=headers).get_json()['expense'] == 45.1
+
+    def test_TC_IMPORT_004_import_invalid_file(self, client, auth_token, auth_headers):
+        """TC-IMPORT-004: Импорт без файла или в неподдерживаемом формате"""
+        headers = auth_headers(auth_token)
+        response = client.post('/dashboard/import', headers={'Authorization': headers['Authorization']})
+        assert response.status_code == 400
+
+        response = _upload(client, headers, 'data', 'statement.xlsx')
+        assert response.status_code == 400
+
+    def test_TC_IMPORT_005_import_unknown_encoding(self, client, auth_token, auth_headers):
+        """TC-IMPORT-005: Неизвестная кодировка файла — ошибка 400, а не 500"""
+        headers = auth_headers(auth_token)
+        response = client.post('/dashboard/import',
+                               data={'file': (io.BytesIO(CSV_STATEMENT.encode('utf-8')), 'statement.csv'),
+                                     'encoding': 'no-such-codec'},
+                               headers={'Authorization': headers['Authorization']},
+                               content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Не удалось прочитать файл'
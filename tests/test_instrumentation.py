@@ -0,0 +1,112 @@
+import io
+import logging
+import pytest
+from datetime import datetime, timezone
+from app import db
+from app.instrumentation import count_queries, assert_max_queries
+from app.models import Category, Transaction, User
+
+# Бюджет SQL-запросов эндпоинтов: не растёт с числом транзакций и категорий
+QUERY_BUDGETS = {
+    '/dashboard/data': 4,
+    '/dashboard/transactions_data': 1,
+    '/dashboard/stats_data?granularity=month': 3,
+    '/dashboard/profile': 2,
+}
+
+
+class TestInstrumentation:
+    """Тесты учёта SQL-запросов - TC-SQL-001 до TC-SQL-004"""
+
+    def _create_history(self, app, count=30):
+        with app.app_context():
+            user = User.query.filter_by(email='test@example.com').first()
+            categories = [Category(name=f'Category {i}', user_id=user.id) for i in range(5)]
+            db.session.add_all(categories)
+            db.session.flush()
+            db.session.add_all(
+                Transaction(amount=10.0, type='expense', category_id=categories[i % 5].id, user_id=user.id)
+                for i in range(count)
+            )
+            db.session.commit()
+
+    def test_TC_SQL_001_server_timing_header(self, client, app, auth_token, auth_headers):
+        """TC-SQL-001: Ответ содержит Server-Timing с числом запросов и временем БД"""
+        with count_queries() as queries:
+            response = client.get('/dashboard/data', headers=auth_headers(auth_token))
+
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('db;dur=')
+        assert f'desc="{queries.count} queries"' in timing
+        assert ', app;dur=' in timing
+
+        app.config['SQL_SERVER_TIMING'] = False
+        response = client.get('/dashboard/data', headers=auth_headers(auth_token))
+        assert 'Server-Timing' not in response.headers
+
+    def test_TC_SQL_002_endpoint_query_budgets(self, client, app, auth_token, auth_headers):
+        """TC-SQL-002: Эндпоинты укладываются в бюджет запросов при любом объёме данных"""
+        self._create_history(app)
+        headers = auth_headers(auth_token)
+        for url, limit in QUERY_BUDGETS.items():
+            with assert_max_queries(limit):
+                assert client.get(url, headers=headers).status_code == 200
+
+        with pytest.raises(AssertionError, match='expected at most 0'):
+            with assert_max_queries(0):
+                client.get('/dashboard/data', headers=headers)
+
+    def test_TC_SQL_003_slow_and_repeated_queries_logged(self, client, app, auth_token, auth_headers, caplog):
+        """TC-SQL-003: Превышение порогов и повторяющиеся запросы попадают в лог"""
+        headers = auth_headers(auth_token)
+        with caplog.at_level(logging.WARNING, logger='app.instrumentation'):
+            client.get('/dashboard/data', headers=headers)
+        assert not caplog.records
+
+        app.config['SLOW_REQUEST_QUERIES'] = 2
+        app.config['SQL_REPEATED_STATEMENT_THRESHOLD'] = 2
+        with caplog.at_level(logging.WARNING, logger='app.instrumentation'):
+            client.post('/api/batch', json={'operations': [
+                {'op': 'create', 'entity': 'category', 'data': {'name': f'Category {i}'}} for i in range(3)
+            ]}, headers=headers)
+        message = caplog.records[-1].getMessage()
+        assert message.startswith('POST /api/batch')
+        assert 'queries' in message
+        assert 'possible N+1: ' in message
+
+    def _statements(self, stats, prefix):
+        return sum(n for statement, n in stats.statements.items() if statement.startswith(prefix))
+
+    def test_TC_SQL_004_aggregate_writes_batched(self, client, app, auth_token, auth_headers):
+        """TC-SQL-004: Импорт и правка транзакции обновляют агрегаты одним запросом на таблицу"""
+        headers = auth_headers(auth_token)
+        for name in ('Food', 'Travel'):
+            category_id = client.post('/dashboard/add_category', json={'name': name}, headers=headers).get_json()['id']
+            for period in ('week', 'month'):
+                client.post('/dashboard/add_budget', json={'category_id': category_id, 'period': period, 'limit': 100},
+                            headers=headers)
+        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        statement = (f'date,amount,category\n2024-01-05,-1,Food\n{today},-2,Food\n'
+                     f'{today},-3,Travel\n2024-03-06,10,Salary\n').encode()
+        with count_queries() as stats:
+            response = client.post('/dashboard/import', data={'file': (io.BytesIO(statement), 'statement.csv')},
+                                   headers={'Authorization': headers['Authorization']},
+                                   content_type='multipart/form-data')
+        assert response.get_json()['accepted'] == 4
+        assert self._statements(stats, 'INSERT INTO monthly_rollup') == 1
+        assert self._statements(stats, 'UPDATE budget') == 1
+
+        transaction_id = db.session.query(Transaction.id).filter_by(amount_cents=200).scalar()
+        with count_queries() as stats:
+            client.put(f'/dashboard/edit_transaction/{transaction_id}', json={'amount': 7}, headers=headers)
+        assert self._statements(stats, 'INSERT INTO monthly_rollup') == 1
+
+        # Смена суммы и категории — один flush, агрегаты обновляются один раз
+        category_id = db.session.query(Category.id).filter_by(name='Travel').scalar()
+        with count_queries() as stats:
+            client.put(f'/dashboard/edit_transaction/{transaction_id}', json={'amount': 8, 'category_id': category_id},
+                       headers=headers)
+        assert self._statements(stats, 'INSERT INTO monthly_rollup') == 1
+        assert self._statements(stats, 'INSERT INTO user_totals') == 1
+        assert self._statements(stats, 'UPDATE budget') == 1
+        assert not stats.repeated(2)
@@ -0,0 +1,103 @@
+import os
+import threading
+import pytest
+from app.metrics import metrics
+
+
+def _samples(text):
+    """Строки метрик без комментариев: {'name{labels}': value}; метка pid проверяется и отбрасывается"""
+    worker = f'pid="{os.getpid()}"'
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        key, value = line.rsplit(' ', 1)
+        name, labels = key.split('{', 1)
+        assert labels.startswith(worker)
+        labels = labels[len(worker):].lstrip(',')
+        samples[name if labels == '}' else f'{name}{{{labels}'] = float(value)
+    return samples
+
+
+class TestMetrics:
+    """Тесты метрик Prometheus - TC-METRICS-001 до TC-METRICS-004"""
+
+    def test_TC_METRICS_001_requests_latency_and_status(self, client, app, auth_token, auth_headers):
+        """TC-METRICS-001: Запросы считаются по эндпоинту и коду, время попадает в гистограмму"""
+        headers = auth_headers(auth_token)
+        client.get('/dashboard/data', headers=headers)
+        client.get('/dashboard/data', headers=headers)
+        client.get('/dashboard/data')
+        client.get('/no-such-page')
+
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert '# TYPE finance_http_request_duration_seconds histogram' in response.text
+        samples = _samples(response.text)
+
+        labels = 'blueprint="dashboard",endpoint="dashboard.dashboard_data",method="GET"'
+        assert samples[f'finance_http_requests_total{{{labels},status="200"}}'] == 2
+        assert samples[f'finance_http_requests_total{{{labels},status="401"}}'] == 1
+        assert samples['finance_http_requests_total{blueprint="",endpoint="unmatched",method="GET",status="404"}'] == 1
+
+        latency = 'blueprint="dashboard",endpoint="dashboard.dashboard_data"'
+        assert samples[f'finance_http_request_duration_seconds_bucket{{{latency},le="+Inf"}}'] == 3
+        assert samples[f'finance_http_request_duration_seconds_count{{{latency}}}'] == 3
+        assert samples[f'finance_http_request_duration_seconds_sum{{{latency}}}'] > 0
+        buckets = [value for name, value in samples.items()
+                   if name.startswith(f'finance_http_request_duration_seconds_bucket{{{latency}')]
+        assert buckets == sorted(buckets)
+
+        # Сам сбор метрик не учитывается
+        assert not any('endpoint="metrics"' in name for name in samples)
+        assert samples['finance_http_requests_in_flight'] == 0
+
+    def test_TC_METRICS_002_pool_and_password_metrics(self, client, app, auth_token):
+        """TC-METRICS-002: Экспортируются статистика пула соединений и время bcrypt"""
+        samples = _samples(client.get('/metrics').text)
+
+        assert samples['finance_db_pool_checkouts_total'] >= 1
+        assert samples['finance_db_pool_connects_total'] >= 1
+        assert samples['finance_db_pool_checked_out'] >= 0
+        # Регистрация хеширует пароль, вход проверяет его
+        assert samples['finance_password_hash_seconds_count{operation="hash"}'] == 1
+        assert samples['finance_password_hash_seconds_count{operation="check"}'] == 1
+
+    def test_TC_METRICS_003_local_only_and_thread_shards(self, client, app):
+        """TC-METRICS-003: /metrics закрыт для внешних адресов; счётчики потоков суммируются"""
+        assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.5'}).status_code == 404
+
+        def work():
+            with app.app_context():
+                for _ in range(1000):
+                    metrics.inc('finance_password_hash_rejected_total', operation='hash')
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        samples = _samples(client.get('/metrics').text)
+        assert samples['finance_password_hash_rejected_total{operation="hash"}'] == 4000
+
+    def test_TC_METRICS_004_finished_threads_do_not_accumulate(self, client, app):
+        """TC-METRICS-004: Наборы завершившихся потоков сливаются, их число не растёт"""
+        state = app.extensions['metrics']
+
+        def work():
+            with app.app_context():
+                metrics.inc('finance_password_hash_rejected_total', operation='check')
+                metrics.observe('finance_password_hash_seconds', 0.02, operation='check')
+
+        for _ in range(200):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        assert len(state.shards) <= 2
+        samples = _samples(client.get('/metrics').text)
+        assert samples['finance_password_hash_rejected_total{operation="check"}'] == 200
+        assert samples['finance_password_hash_seconds_count{operation="check"}'] == 200
+        assert samples['finance_password_hash_seconds_bucket{operation="check",le="0.025"}'] == 200
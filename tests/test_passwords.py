@@ -0,0 +1,69 @@
+import threading
+import pytest
+from app import db, bcrypt
+from app.models import User
+from app.passwords import hasher
+
+
+class TestPasswordHashing:
+    """Тесты пула хеширования паролей - TC-PWD-001 до TC-PWD-003"""
+
+    def test_TC_PWD_001_rehash_on_login(self, client, app):
+        """TC-PWD-001: Хеш с другой стоимостью bcrypt пересчитывается при входе"""
+        with app.app_context():
+            old_hash = bcrypt.generate_password_hash('password123', rounds=5).decode('utf-8')
+            db.session.add(User(username='legacy', email='legacy@example.com', password=old_hash))
+            db.session.commit()
+
+        response = client.post('/auth/login', json={'email': 'legacy@example.com', 'password': 'password123'})
+        assert response.status_code == 200
+
+        with app.app_context():
+            new_hash = db.session.query(User).filter_by(email='legacy@example.com').first().password
+            assert new_hash.startswith('$2b$04$')
+            assert not hasher.needs_rehash(new_hash)
+            assert bcrypt.check_password_hash(new_hash, 'password123')
+
+        response = client.post('/auth/login', json={'email': 'legacy@example.com', 'password': 'password123'})
+        assert response.status_code == 200
+
+    def test_TC_PWD_002_saturated_pool_returns_503(self, client, app):
+        """TC-PWD-002: При заполненном пуле и очереди вход и регистрация получают 503"""
+        client.post('/auth/register', json={'username': 'user', 'email': 'user@example.com',
+                                            'password': 'password123'})
+        pool = app.extensions['password_hasher']
+        taken = 0
+        while pool.slots.acquire(blocking=False):
+            taken += 1
+        try:
+            response = client.post('/auth/login', json={'email': 'user@example.com', 'password': 'password123'})
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '1'
+            response = client.post('/auth/register', json={'username': 'other', 'email': 'other@example.com',
+                                                           'password': 'password123'})
+            assert response.status_code == 503
+        finally:
+            for _ in range(taken):
+                pool.slots.release()
+
+        response = client.post('/auth/login', json={'email': 'user@example.com', 'password': 'password123'})
+        assert response.status_code == 200
+
+    def test_TC_PWD_003_hashing_runs_in_bounded_pool(self, app):
+        """TC-PWD-003: Хеширование выполняется в потоках пула заданного размера"""
+        app.config['PASSWORD_HASH_WORKERS'] = 2
+        app.config['PASSWORD_HASH_QUEUE'] = 0
+        hasher.init_app(app)
+        pool = app.extensions['password_hasher']
+        assert pool.executor._max_workers == 2
+
+        threads = set()
+        original = pool.executor.submit
+
+        def _submit(fn, *args):
+            return original(lambda *a: (threads.add(threading.current_thread().name), fn(*a))[1], *args)
+
+        pool.executor.submit = _submit
+        password_hash = hasher.hash_password('secret')
+        assert hasher.check_password(password_hash, 'secret')
+        assert threads and all(name.startswith('bcrypt') for name in threads)
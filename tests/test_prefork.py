@@ -0,0 +1,63 @@
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='pre-fork сервер работает только на POSIX')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _wait_for(pattern, log_path, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with open(log_path) as log:
+            found = re.findall(pattern, log.read())
+        if found:
+            return found
+        time.sleep(0.1)
+    raise AssertionError(f'{pattern!r} не найден в журнале сервера')
+
+
+class TestPreforkServer:
+    """Тесты pre-fork сервера - TC-PREFORK-001"""
+
+    def test_TC_PREFORK_001_workers_recycle_reload_and_stop(self, tmp_path):
+        """TC-PREFORK-001: Рабочие процессы обслуживают запросы, перезапускаются, перезагружаются по SIGHUP и плавно останавливаются"""
+        log_path = tmp_path / 'server.log'
+        env = {**os.environ, 'FINANCE_CONFIG': 'testing',
+               'FINANCE_SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'serve.db'}"}
+        with open(log_path, 'w') as log:
+            server = subprocess.Popen(
+                [sys.executable, os.path.join(ROOT, 'serve.py'), '--bind', '127.0.0.1:0',
+                 '--workers', '2', '--max-requests', '2', '--graceful-timeout', '5'],
+                cwd=tmp_path, env=env, stdout=log, stderr=subprocess.STDOUT
+            )
+        try:
+            port = _wait_for(r'Listening on http://127\.0\.0\.1:(\d+)', log_path)[0]
+            _wait_for(r'Worker \d+ started', log_path)
+
+            for _ in range(6):
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/auth/login', timeout=5) as response:
+                    assert response.status == 200
+
+            # Каждый процесс выходит после двух запросов, и главный запускает замену
+            _wait_for(r'Worker \d+ exited with status 0', log_path)
+
+            server.send_signal(signal.SIGHUP)
+            _wait_for(r'Reloading', log_path)
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/auth/login', timeout=5) as response:
+                assert response.status == 200
+
+            server.send_signal(signal.SIGTERM)
+            assert server.wait(timeout=10) == 0
+            assert len(_wait_for(r'Worker (\d+) started', log_path)) > 2
+            _wait_for(r'Stopped', log_path)
+        finally:
+            if server.poll() is None:
+                server.kill()
+                server.wait()
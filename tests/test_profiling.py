@@ -0,0 +1,107 @@
+import pstats
+import threading
+import pytest
+from app import db
+from app.models import User
+
+
+class TestProfiling:
+    """Тесты профилирования запросов - TC-PROFILE-001 до TC-PROFILE-004"""
+
+    @pytest.fixture(autouse=True)
+    def profile_dir(self, app, tmp_path):
+        app.config['PROFILE_DIR'] = str(tmp_path)
+        return tmp_path
+
+    def _make_admin(self, app):
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            user.role = 'admin'
+            db.session.commit()
+
+    def test_TC_PROFILE_001_admin_header_stores_profile(self, client, app, auth_token, auth_headers, profile_dir):
+        """TC-PROFILE-001: Заголовок X-Profile от администратора сохраняет профиль в формате pstats"""
+        headers = {**auth_headers(auth_token), 'X-Profile': '1'}
+
+        # Обычному пользователю заголовок ничего не даёт
+        response = client.get('/dashboard/data', headers=headers)
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response.headers
+        assert list(profile_dir.iterdir()) == []
+
+        self._make_admin(app)
+        response = client.get('/dashboard/data', headers=headers)
+        assert response.status_code == 200
+        name = response.headers['X-Profile-Id']
+        assert name.endswith('.prof') and '_dashboard.dashboard_data_' in name
+        stats = pstats.Stats(str(profile_dir / name))
+        assert any(func[2] == 'dashboard_data' for func in stats.stats)
+
+    def test_TC_PROFILE_002_sampling_keeps_only_slow_requests(self, client, app, auth_token, auth_headers, profile_dir):
+        """TC-PROFILE-002: По выборке сохраняются только запросы дольше порога, старые профили удаляются"""
+        headers = auth_headers(auth_token)
+        app.config['PROFILE_SAMPLE_RATE'] = 1.0
+        client.get('/dashboard/data', headers=headers)
+        assert list(profile_dir.iterdir()) == []
+
+        app.config['PROFILE_MIN_DURATION_MS'] = 0
+        app.config['PROFILE_MAX_FILES'] = 2
+        for _ in range(3):
+            client.get('/dashboard/stats_data', headers=headers)
+        names = sorted(path.name for path in profile_dir.iterdir())
+        assert len(names) == 2
+        assert all('_dashboard.dashboard_stats_' in name for name in names)
+
+    def test_TC_PROFILE_003_admin_list_and_download(self, client, app, auth_token, auth_headers):
+        """TC-PROFILE-003: Администратор получает список профилей и скачивает их"""
+        headers = auth_headers(auth_token)
+        assert client.get('/api/admin/profiles', headers=headers).status_code == 403
+
+        self._make_admin(app)
+        name = client.get('/dashboard/data', headers={**headers, 'X-Profile': '1'}).headers['X-Profile-Id']
+
+        profiles = client.get('/api/admin/profiles', headers=headers).get_json()['profiles']
+        assert [p['name'] for p in profiles] == [name]
+        assert profiles[0]['endpoint'] == 'dashboard.dashboard_data'
+        assert profiles[0]['size'] > 0
+
+        response = client.get(f'/api/admin/profiles/{name}', headers=headers)
+        assert response.status_code == 200
+        assert len(response.data) == profiles[0]['size']
+        text = client.get(f'/api/admin/profiles/{name}?format=text', headers=headers)
+        assert 'cumulative' in text.text or 'cumtime' in text.text
+
+        assert client.get('/api/admin/profiles/..%2Fconfig.py', headers=headers).status_code == 404
+        assert client.get('/api/admin/profiles/missing.prof', headers=headers).status_code == 404
+
+    def test_TC_PROFILE_004_concurrent_requests_profile_one_at_a_time(self, app, profile_dir):
+        """TC-PROFILE-004: Пока профилируется один запрос, параллельный выполняется без профиля"""
+        app.config['PROFILE_SAMPLE_RATE'] = 1.0
+        app.config['PROFILE_MIN_DURATION_MS'] = 0
+        entered, release = threading.Event(), threading.Event()
+
+        def slow():
+            entered.set()
+            release.wait(5)
+            return 'slow'
+
+        app.add_url_rule('/_profile_slow', 'profile_slow', slow)
+        app.add_url_rule('/_profile_fast', 'profile_fast', lambda: 'fast')
+
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(app.test_client().get('/_profile_slow')))
+        thread.start()
+        assert entered.wait(5)
+        try:
+            assert app.test_client().get('/_profile_fast').status_code == 200
+        finally:
+            release.set()
+            thread.join()
+
+        assert responses[0].status_code == 200
+        names = [path.name for path in profile_dir.iterdir()]
+        assert len(names) == 1 and '_profile_slow_' in names[0]
+
+        # После завершения первого запроса профилирование снова доступно
+        assert app.test_client().get('/_profile_fast').status_code == 200
+        assert sum('_profile_fast_' in path.name for path in profile_dir.iterdir()) == 1
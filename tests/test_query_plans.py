@@ -0,0 +1,198 @@
+import io
+import re
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from app import db
+from app.models import Transaction, Category, User, Budget
+
+
+# Просмотр результатов подзапросов и поиск FTS5 по выражению MATCH (индекс не 0) — не чтение таблицы целиком
+_NOT_TABLE_SCAN = re.compile(r'^SCAN (anon_\d+|\(subquery-\d+\)|CONSTANT ROW)( |$)|VIRTUAL TABLE INDEX [1-9]')
+
+
+def _full_scans(statement, parameters):
+    """Возвращает строки плана запроса, в которых SQLite читает таблицу целиком"""
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    return [row[-1] for row in plan if row[-1].startswith('SCAN ') and not _NOT_TABLE_SCAN.search(row[-1])]
+
+
+@pytest.fixture
+def captured_queries(app):
+    """Собирает SQL-запросы, выполненные во время теста"""
+    queries = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            queries.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _capture)
+    yield queries
+    event.remove(engine, 'before_cursor_execute', _capture)
+
+
+class TestQueryPlans:
+    """Тесты планов запросов - TC-PERF-001 до TC-PERF-006"""
+
+    def _assert_no_full_scans(self, app, queries):
+        assert queries
+        with app.app_context():
+            for statement, parameters in queries:
+                scans = _full_scans(statement, parameters)
+                assert not scans, f'{statement} -> {scans}'
+
+    def test_TC_PERF_001_dashboard_queries_use_indexes(self, client, app, auth_token, auth_headers, captured_queries):
+        """TC-PERF-001: Запросы дашборда и статистики не сканируют таблицы целиком"""
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            category = Category(name='Food', user_id=user.id)
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+            db.session.add_all([
+                Transaction(amount=100.0, type='income', category_id=category.id, user_id=user.id),
+                Transaction(amount=40.0, type='expense', category_id=category.id, user_id=user.id),
+            ])
+            db.session.commit()
+        captured_queries.clear()
+
+        headers = auth_headers(auth_token)
+        assert client.get('/dashboard/data', headers=headers).status_code == 200
+        assert client.get('/dashboard/stats_data', headers=headers).status_code == 200
+        assert client.get('/dashboard/stats_data?from=2024-01-01&to=2030-12-31&granularity=month',
+                          headers=headers).status_code == 200
+        assert client.get('/dashboard/stats_data?from=2024-01-15&to=2030-12-20&granularity=week',
+                          headers=headers).status_code == 200
+        assert client.get('/dashboard/profile', headers=headers).status_code == 200
+
+        cursor = client.get('/dashboard/transactions_data?limit=1', headers=headers).get_json()['next_cursor']
+        assert client.get(f'/dashboard/transactions_data?limit=1&cursor={cursor}&from=2024-01-01'
+                          '&min_amount=1&max_amount=500', headers=headers).status_code == 200
+        assert client.get(f'/dashboard/transactions_data?type=expense&category_id={category_id}',
+                          headers=headers).status_code == 200
+
+        self._assert_no_full_scans(app, captured_queries)
+
+    def test_TC_PERF_002_write_queries_use_indexes(self, client, app, auth_token, auth_headers, captured_queries):
+        """TC-PERF-002: Запросы изменения транзакций и категорий не сканируют таблицы целиком"""
+        headers = auth_headers(auth_token)
+        captured_queries.clear()
+
+        response = client.post('/dashboard/add_category', json={'name': 'Food'}, headers=headers)
+        category_id = response.get_json()['id']
+        client.post('/dashboard/add_transaction',
+                    json={'amount': 10.0, 'type': 'expense', 'category_id': category_id},
+                    headers=headers)
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            transaction_id = db.session.query(Transaction.id).filter_by(user_id=user.id).scalar()
+
+        client.put(f'/dashboard/edit_transaction/{transaction_id}', json={'amount': 20.0}, headers=headers)
+        client.delete(f'/dashboard/delete_category/{category_id}', headers=headers)
+        client.delete(f'/dashboard/delete_transaction/{transaction_id}', headers=headers)
+        client.delete(f'/dashboard/delete_category/{category_id}', headers=headers)
+
+        client.post('/dashboard/import',
+                    data={'file': (io.BytesIO(b'date,amount,category\n2024-01-01,-5,Food\n'), 'statement.csv')},
+                    headers={'Authorization': headers['Authorization']}, content_type='multipart/form-data')
+
+        response = client.post('/api/categories', json={'name': 'Travel'}, headers=headers)
+        client.delete(f"/api/categories/{response.get_json()['id']}", headers=headers)
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'create', 'entity': 'transaction', 'data': {'amount': 1, 'type': 'income'}},
+            {'op': 'create', 'entity': 'category', 'data': {'name': 'Gifts'}},
+        ]}, headers=headers)
+        client.post('/api/batch', json={'operations': [
+            {'op': 'update', 'entity': 'transaction', 'id': response.get_json()['results'][0]['id'],
+             'data': {'amount': 2}},
+            {'op': 'delete', 'entity': 'category', 'id': response.get_json()['results'][1]['id']},
+        ]}, headers=headers)
+        client.post('/auth/login', json={'email': 'test@example.com', 'password': 'password123'})
+
+        self._assert_no_full_scans(app, captured_queries)
+
+    def test_TC_PERF_003_export_uses_indexes(self, client, app, auth_token, auth_headers, captured_queries):
+        """TC-PERF-003: Выгрузка транзакций с фильтрами и без читает их по индексу"""
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            category = Category(name='Food', user_id=user.id)
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+            db.session.add(Transaction(amount=40.0, type='expense', category_id=category.id, user_id=user.id))
+            db.session.commit()
+        captured_queries.clear()
+
+        headers = auth_headers(auth_token)
+        for query in ('', '?format=ndjson&gzip=1',
+                      f'?from=2024-01-01&to=2030-12-31&type=expense&category_id={category_id}&min_amount=1'):
+            response = client.get(f'/dashboard/export{query}', headers=headers)
+            assert response.status_code == 200
+            response.get_data()
+
+        self._assert_no_full_scans(app, captured_queries)
+
+    def test_TC_PERF_004_search_uses_fts_index(self, client, app, auth_token, auth_headers, captured_queries):
+        """TC-PERF-004: Поиск читает совпадения из индекса FTS5, а транзакции — по первичному ключу"""
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            category = Category(name='Food', user_id=user.id)
+            db.session.add(category)
+            db.session.commit()
+            db.session.add(Transaction(amount=5.0, type='expense', category_id=category.id, user_id=user.id,
+                                       description='Coffee beans'))
+            db.session.commit()
+        captured_queries.clear()
+
+        headers = auth_headers(auth_token)
+        for query in ('q=cof', 'q=food+beans&page=2&limit=1', 'q=coffee&format=columnar'):
+            assert client.get(f'/dashboard/search?{query}', headers=headers).status_code == 200
+
+        self._assert_no_full_scans(app, captured_queries)
+        assert _full_scans('SELECT rowid FROM transaction_fts', ())
+
+    def test_TC_PERF_005_cashflow_uses_indexes(self, client, app, auth_token, auth_headers, captured_queries):
+        """TC-PERF-005: Движение денег и начальный баланс читаются по индексам транзакций и помесячных сумм"""
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            db.session.add_all([
+                Transaction(amount=100.0, type='income', user_id=user.id, date=datetime(2024, 1, 5)),
+                Transaction(amount=40.0, type='expense', user_id=user.id, date=datetime(2024, 2, 10)),
+            ])
+            db.session.commit()
+        captured_queries.clear()
+
+        headers = auth_headers(auth_token)
+        for query in ('', '?granularity=month', '?from=2024-02-01&to=2024-02-29&granularity=month',
+                      '?from=2024-02-05&to=2030-12-31&granularity=week'):
+            assert client.get(f'/dashboard/cashflow{query}', headers=headers).status_code == 200
+
+        self._assert_no_full_scans(app, captured_queries)
+
+    def test_TC_PERF_006_budget_queries_use_indexes(self, client, app, auth_token, auth_headers, captured_queries):
+        """TC-PERF-006: Чтение, пересчёт и обновление трат бюджетов не сканируют таблицы целиком"""
+        headers = auth_headers(auth_token)
+        category_id = client.post('/dashboard/add_category', json={'name': 'Food'}, headers=headers).get_json()['id']
+        captured_queries.clear()
+
+        for period in ('week', 'month'):
+            client.post('/dashboard/add_budget', json={'category_id': category_id, 'period': period, 'limit': 100},
+                        headers=headers)
+        client.post('/dashboard/add_transaction',
+                    json={'amount': 10.0, 'type': 'expense', 'category_id': category_id}, headers=headers)
+        assert client.get('/dashboard/budgets', headers=headers).status_code == 200
+
+        # Период бюджетов закончился: чтение пересчитывает траты
+        with app.app_context():
+            db.session.query(Budget).filter_by(category_id=category_id).update({'period_start': '2020-01-01'})
+            db.session.commit()
+        assert [b['spent'] for b in client.get('/dashboard/budgets', headers=headers).get_json()['budgets']] \
+            == [10.0, 10.0]
+
+        budget_id = client.get('/dashboard/budgets', headers=headers).get_json()['budgets'][0]['id']
+        client.put(f'/dashboard/edit_budget/{budget_id}', json={'limit': 50}, headers=headers)
+        client.delete(f'/dashboard/delete_budget/{budget_id}', headers=headers)
+
+        self._assert_no_full_scans(app, captured_queries)
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import inspect, text
+from app import create_app, db
+from app.models import Transaction, Category, User, UserTotals
+from app.schema import upgrade_schema, get_schema_version, SCHEMA_VERSION
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """Приложение на отдельном файле БД: миграции коммитят изменения схемы"""
+    app = create_app('testing', {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'finance.db'}",
+        'AUTO_UPGRADE_SCHEMA': True,
+    })
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+class TestSchema:
+    """Тесты миграции схемы БД - TC-SCHEMA-001 до TC-SCHEMA-002"""
+
+    def test_TC_SCHEMA_001_upgrade_creates_missing_indexes(self, file_app):
+        """TC-SCHEMA-001: Миграция существующей БД создаёт недостающие индексы"""
+        with file_app.app_context():
+            with db.engine.begin() as conn:
+                for table in (Transaction.__table__, Category.__table__):
+                    for index in table.indexes:
+                        index.drop(conn)
+                conn.execute(text('PRAGMA user_version = 0'))
+
+            upgrade_schema()
+
+            with db.engine.connect() as conn:
+                assert get_schema_version(conn) == SCHEMA_VERSION
+                names = {index['name'] for index in inspect(conn).get_indexes('transaction')}
+            assert {index.name for index in Transaction.__table__.indexes} <= names
+
+    def test_TC_SCHEMA_002_upgrade_converts_amounts_to_cents(self, file_app):
+        """TC-SCHEMA-002: Миграция переводит суммы REAL в копейки и пересчитывает балансы"""
+        with file_app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(text("INSERT INTO user (id, username, email, password) VALUES (1, 'old', 'old@example.com', 'x')"))
+                conn.execute(text('DROP TABLE "transaction"'))
+                conn.execute(text(
+                    'CREATE TABLE "transaction" (id INTEGER PRIMARY KEY, amount FLOAT NOT NULL, '
+                    'type VARCHAR(10) NOT NULL, category_id INTEGER, description VARCHAR(200), '
+                    'date DATETIME, user_id INTEGER)'
+                ))
+                conn.execute(text(
+                    "INSERT INTO \"transaction\" (amount, type, date, user_id) VALUES "
+                    "(10.1, 'income', '2024-01-01 00:00:00.000000', 1), "
+                    "(0.29, 'expense', '2024-01-02 00:00:00.000000', 1)"
+                ))
+                conn.execute(text('PRAGMA user_version = 3'))
+
+            upgrade_schema()
+
+            cents = sorted(c for c, in db.session.query(Transaction.amount_cents))
+            assert cents == [29, 1010]
+            totals = db.session.get(UserTotals, 1)
+            assert (totals.income_cents, totals.expense_cents, totals.transaction_count) == (1010, 29, 2)
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import select
+from app import db
+from app.models import Category, Transaction, User
+from app.search import search_query
+
+
+class TestSearch:
+    """Тесты полнотекстового поиска - TC-SEARCH-001 до TC-SEARCH-003"""
+
+    def _create_data(self, app):
+        with app.app_context():
+            user = User.query.filter_by(email='test@example.com').first()
+            other = User(username='other', email='other@example.com', password='x')
+            db.session.add(other)
+            food = Category(name='Продукты', user_id=user.id)
+            db.session.add(food)
+            db.session.flush()
+            db.session.add_all([
+                Transaction(amount=10.0, type='expense', description='Кофе в кофейне у дома', user_id=user.id),
+                Transaction(amount=20.0, type='expense', description='Кофе', user_id=user.id),
+                Transaction(amount=30.0, type='expense', description='Супермаркет', category_id=food.id, user_id=user.id),
+                Transaction(amount=40.0, type='expense', description='Кофе чужой', user_id=other.id),
+            ])
+            db.session.commit()
+            return user.id, food.id
+
+    def _search(self, client, headers, **params):
+        return client.get('/dashboard/search', query_string=params, headers=headers)
+
+    def test_TC_SEARCH_001_ranked_search_scoped_to_user(self, client, app, auth_token, auth_headers):
+        """TC-SEARCH-001: Поиск по началу слова в описании и категории, только свои транзакции"""
+        self._create_data(app)
+        headers = auth_headers(auth_token)
+
+        data = self._search(client, headers, q='коф').get_json()
+        descriptions = [t['description'] for t in data['transactions']]
+        # Короткое описание релевантнее, чужая транзакция не найдена
+        assert descriptions == ['Кофе', 'Кофе в кофейне у дома']
+        assert data['page'] == 1 and data['has_more'] is False
+
+        data = self._search(client, headers, q='продукты').get_json()
+        assert [t['description'] for t in data['transactions']] == ['Супермаркет']
+        assert data['transactions'][0]['category'] == 'Продукты'
+
+        assert self._search(client, headers, q='кофе дома').get_json()['transactions'][0]['amount'] == 10.0
+        assert self._search(client, headers, q='чай').get_json()['transactions'] == []
+        # Операторы FTS5 во вводе не ломают запрос
+        assert self._search(client, headers, q='"кофе" OR NEAR(').status_code == 200
+
+        assert self._search(client, headers, q=' ,. ').status_code == 400
+        assert self._search(client, headers, q='кофе', page=0).status_code == 400
+
+    def test_TC_SEARCH_002_index_follows_writes(self, client, app, auth_token, auth_headers):
+        """TC-SEARCH-002: Изменение, удаление транзакций и переименование категорий видны в поиске"""
+        user_id, food_id = self._create_data(app)
+        headers = auth_headers(auth_token)
+
+        with app.app_context():
+            transaction = db.session.scalar(select(Transaction).where(Transaction.description == 'Супермаркет'))
+            transaction_id = transaction.id
+        response = client.put(f'/dashboard/edit_transaction/{transaction_id}', json={
+            'amount': 30.0, 'type': 'expense', 'description': 'Гипермаркет'
+        }, headers=headers)
+        assert response.status_code == 200
+        assert self._search(client, headers, q='супермаркет').get_json()['transactions'] == []
+        assert len(self._search(client, headers, q='гипермаркет').get_json()['transactions']) == 1
+
+        with app.app_context():
+            db.session.get(Category, food_id).name = 'Еда'
+            db.session.commit()
+        data = self._search(client, headers, q='еда').get_json()
+        assert [t['category'] for t in data['transactions']] == ['Еда']
+
+        client.delete(f'/dashboard/delete_transaction/{transaction_id}', headers=headers)
+        assert self._search(client, headers, q='гипермаркет').get_json()['transactions'] == []
+
+        # Постраничная выдача
+        first = self._search(client, headers, q='кофе', limit=1).get_json()
+        second = self._search(client, headers, q='кофе', limit=1, page=2).get_json()
+        assert first['has_more'] is True and second['has_more'] is False
+        assert first['transactions'][0]['id'] != second['transactions'][0]['id']
+
+    def test_TC_SEARCH_003_uses_fulltext_index(self, app, client, auth_token):
+        """TC-SEARCH-003: Поиск читает индекс FTS5 и транзакции по первичному ключу, без полного просмотра"""
+        user_id, _ = self._create_data(app)
+        with app.app_context():
+            compiled = search_query(user_id, 'кофе', 50).compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}').fetchall()
+        details = [row[-1] for row in plan]
+        assert any('transaction_fts VIRTUAL TABLE' in detail for detail in details)
+        assert any(detail.startswith('SEARCH transaction USING INTEGER PRIMARY KEY') for detail in details)
+        assert not any(detail.split()[:2] == ['SCAN', 'transaction'] for detail in details)
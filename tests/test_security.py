@@ -1,10 +1,11 @@
+import io
 import pytest
 from app import db, bcrypt
 from app.models import Transaction, Category, User
 from flask_jwt_extended import create_access_token
 
 class TestSecurity:
-    """Тесты безопасности - TC-SEC-001 до TC-SEC-004"""
+    """Тесты безопасности - TC-SEC-001 до TC-SEC-005"""
     
     def test_TC_SEC_001_access_without_token(self, client):
         """TC-SEC-001: Доступ к API без токена"""
@@ -150,4 +151,31 @@ class TestSecurity:
                              headers=headers)
         
         # Проверяем корректную обработку
-        assert response.status_code in [200, 400]
\ No newline at end of file
+        assert response.status_code in [200, 400]
+
+    @pytest.mark.parametrize('amount', [1e30, 1e300, '1e30', '-1e300'])
+    def test_TC_SEC_005_huge_amounts_rejected(self, client, app, auth_token, auth_headers, amount):
+        """TC-SEC-005: Огромные суммы отклоняются с 400 во всех путях ввода, а не роняют запрос"""
+        headers = auth_headers(auth_token)
+        response = client.post('/dashboard/add_transaction', json={'amount': amount, 'type': 'income'},
+                               headers=headers)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Неверная сумма'
+
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'create', 'entity': 'transaction', 'data': {'amount': amount, 'type': 'income'}},
+        ]}, headers=headers)
+        assert response.get_json() == {'error': 'Неверная сумма', 'index': 0}
+
+        for url in ('/dashboard/transactions_data', '/dashboard/export'):
+            assert client.get(f'{url}?min_amount={amount}', headers=headers).status_code == 400
+            assert client.get(f'{url}?max_amount={amount}', headers=headers).status_code == 400
+
+        csv_data = f'date,amount,type\n2024-01-01,{amount},income\n2024-01-02,10,income\n'.encode()
+        response = client.post('/dashboard/import', data={'file': (io.BytesIO(csv_data), 'statement.csv')},
+                               headers={'Authorization': headers['Authorization']},
+                               content_type='multipart/form-data')
+        assert response.status_code == 200
+        report = response.get_json()
+        assert (report['accepted'], report['rejected']) == (1, 1)
+        assert report['errors'] == [{'line': 2, 'error': 'Неверная сумма'}]
@@ -1,9 +1,10 @@
 import pytest
+from datetime import datetime
 from app import db
-from app.models import Transaction, Category, User
+from app.models import Transaction, Category, User, UserTotals
 
 class TestTransactions:
-    """Тесты управления транзакциями - TC-TRANS-001 до TC-TRANS-004"""
+    """Тесты управления транзакциями - TC-TRANS-001 до TC-TRANS-010"""
     
     def test_TC_TRANS_001_create_transaction_valid(self, client, app, auth_token, auth_headers):
         """TC-TRANS-001: Создание транзакции с валидными данными"""
@@ -122,4 +123,158 @@ class TestTransactions:
         # Проверяем удаление из БД (используем современный метод)
         with app.app_context():
             transaction = db.session.get(Transaction, transaction_id)
-            assert transaction is None
\ No newline at end of file
+            assert transaction is None
+
+    def test_TC_TRANS_005_balance_follows_changes(self, client, app, auth_token, auth_headers):
+        """TC-TRANS-005: Баланс обновляется при добавлении, изменении и удалении транзакций"""
+        headers = auth_headers(auth_token)
+        client.post('/dashboard/add_transaction', json={'amount': 500.0, 'type': 'income'}, headers=headers)
+        client.post('/dashboard/add_transaction', json={'amount': 120.5, 'type': 'expense'}, headers=headers)
+
+        data = client.get('/dashboard/data', headers=headers).get_json()
+        assert data['balance'] == 379.5
+        assert data['transaction_count'] == 2
+
+        expense_id = [t['id'] for t in data['transactions'] if t['type'] == 'expense'][0]
+        client.put(f'/dashboard/edit_transaction/{expense_id}',
+                   json={'amount': 200.0, 'type': 'income'}, headers=headers)
+        data = client.get('/dashboard/data', headers=headers).get_json()
+        assert data['income'] == 700.0
+        assert data['expense'] == 0
+        assert data['balance'] == 700.0
+
+        client.delete(f'/dashboard/delete_transaction/{expense_id}', headers=headers)
+        data = client.get('/dashboard/data', headers=headers).get_json()
+        assert data['balance'] == 500.0
+        assert data['transaction_count'] == 1
+
+    def test_TC_TRANS_006_rebuild_totals_command(self, client, app, auth_token, auth_headers):
+        """TC-TRANS-006: Команда rebuild-totals восстанавливает балансы"""
+        headers = auth_headers(auth_token)
+        client.post('/dashboard/add_transaction', json={'amount': 75.0, 'type': 'income'}, headers=headers)
+
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            user_id = user.id
+            totals = db.session.get(UserTotals, user_id)
+            totals.income_cents = 0
+            totals.transaction_count = 0
+            db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['rebuild-totals', '--user-id', str(user_id)])
+        assert result.exit_code == 0
+
+        with app.app_context():
+            totals = db.session.get(UserTotals, user_id)
+            assert totals.income_cents == 7500
+            assert totals.transaction_count == 1
+
+    def test_TC_TRANS_007_paginated_listing_with_filters(self, client, app, auth_token, auth_headers):
+        """TC-TRANS-007: Постраничный список транзакций с фильтрами"""
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            category = Category(name='Food', user_id=user.id)
+            db.session.add(category)
+            db.session.commit()
+            # Несколько транзакций с одинаковой датой проверяют сортировку по id внутри даты
+            db.session.add_all([
+                Transaction(amount=float(i + 1), type='expense' if i % 2 else 'income',
+                            category_id=category.id if i < 5 else None, user_id=user.id,
+                            date=datetime(2024, 3, 1 + i // 2, 12, 0))
+                for i in range(7)
+            ])
+            db.session.commit()
+            category_id = category.id
+
+        headers = auth_headers(auth_token)
+        seen = []
+        cursor = None
+        while True:
+            url = '/dashboard/transactions_data?limit=3' + (f'&cursor={cursor}' if cursor else '')
+            data = client.get(url, headers=headers).get_json()
+            seen.extend(t['amount'] for t in data['transactions'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        assert seen == [7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.0]
+
+        response = client.get(
+            f'/dashboard/transactions_data?type=expense&category_id={category_id}'
+            '&min_amount=2&max_amount=4&from=2024-03-01&to=2024-03-02',
+            headers=headers
+        )
+        data = response.get_json()
+        assert [t['amount'] for t in data['transactions']] == [4.0, 2.0]
+        assert data['next_cursor'] is None
+
+    def test_TC_TRANS_008_listing_invalid_params(self, client, auth_token, auth_headers):
+        """TC-TRANS-008: Список транзакций с невалидными параметрами"""
+        headers = auth_headers(auth_token)
+        for query in ('limit=0', 'limit=100000', 'type=transfer', 'min_amount=abc',
+                      'cursor=not-a-cursor', 'from=2024/01/01'):
+            response = client.get(f'/dashboard/transactions_data?{query}', headers=headers)
+            assert response.status_code == 400, query
+
+    def test_TC_TRANS_009_amounts_summed_exactly(self, client, app, auth_token, auth_headers):
+        """TC-TRANS-009: Суммы хранятся в копейках и складываются без ошибки округления"""
+        headers = auth_headers(auth_token)
+        for amount in (0.1, 0.2, '19.99'):
+            response = client.post('/dashboard/add_transaction',
+                                   json={'amount': amount, 'type': 'income'}, headers=headers)
+            assert response.status_code == 200
+
+        data = client.get('/dashboard/data', headers=headers).get_json()
+        assert data['balance'] == 20.29
+        assert sorted(t['amount'] for t in data['transactions']) == [0.1, 0.2, 19.99]
+
+        with app.app_context():
+            cents = sorted(c for c, in db.session.query(Transaction.amount_cents))
+            assert cents == [10, 20, 1999]
+
+        response = client.post('/dashboard/add_transaction',
+                               json={'amount': 'abc', 'type': 'income'}, headers=headers)
+        assert response.status_code == 400
+
+    def test_TC_TRANS_010_category_must_belong_to_user(self, client, app, auth_token, auth_headers):
+        """TC-TRANS-010: Транзакцию можно отнести только к своей категории во всех путях записи"""
+        with app.app_context():
+            user = db.session.query(User).filter_by(email='test@example.com').first()
+            other = User(username='other', email='other@example.com', password='x')
+            db.session.add(other)
+            db.session.commit()
+            own, foreign = Category(name='Food', user_id=user.id), Category(name='Food', user_id=other.id)
+            db.session.add_all([own, foreign])
+            db.session.commit()
+            own_id, foreign_id = own.id, foreign.id
+
+        headers = auth_headers(auth_token)
+        for category_id in ('abc', foreign_id, [own_id], {'id': own_id}, True, 1.5):
+            response = client.post('/dashboard/add_transaction',
+                                   json={'amount': 10, 'type': 'expense', 'category_id': category_id},
+                                   headers=headers)
+            assert response.status_code == 400, category_id
+            assert response.get_json()['error'] == 'Категория не найдена'
+
+            response = client.post('/api/batch', json={'operations': [
+                {'op': 'create', 'entity': 'transaction',
+                 'data': {'amount': 10, 'type': 'expense', 'category_id': category_id}},
+            ]}, headers=headers)
+            assert response.get_json() == {'error': 'Категория не найдена', 'index': 0}, category_id
+
+        # Значение поля формы приходит строкой
+        response = client.post('/dashboard/add_transaction',
+                               json={'amount': 10, 'type': 'expense', 'category_id': str(own_id)},
+                               headers=headers)
+        assert response.status_code == 200
+        with app.app_context():
+            transaction_id, category_id = db.session.query(Transaction.id, Transaction.category_id).one()
+        assert category_id == own_id
+
+        response = client.put(f'/dashboard/edit_transaction/{transaction_id}',
+                              json={'category_id': foreign_id}, headers=headers)
+        assert response.status_code == 400
+        response = client.put(f'/dashboard/edit_transaction/{transaction_id}',
+                              json={'category_id': None}, headers=headers)
+        assert response.status_code == 200
+        with app.app_context():
+            assert db.session.get(Transaction, transaction_id).category_id is None